@@ -0,0 +1,269 @@
+"""
+Caching of the data retrieved from remote services, such as the LMS and the Course Catalog Service.
+
+Values are read from the cache, and the missing ones are retrieved from the service, with
+protections against cache stampedes and retry storms:
+
+- A single caller retrieves a missing value, holding a lock key, while the other callers wait for
+  it to be cached.
+- Values are kept REMOTE_CACHE_STALE_TIMEOUT seconds past their timeout. During that time they are
+  served stale, while a single caller refreshes them in the background.
+- Timeouts are lengthened by a random fraction of up to REMOTE_CACHE_TTL_JITTER, so that values cached
+  at the same time by different callers do not all expire at once.
+- Failures to retrieve a value are cached for REMOTE_CACHE_ERROR_TIMEOUT seconds, during which they
+  are raised again without calling the service.
+
+Values are cached under their own key, so that they can still be read directly from the cache.
+Hits, misses, stale values and cached errors are counted per process, under the name of their call site.
+"""
+import logging
+import random
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from requests.exceptions import ConnectionError, Timeout
+from slumber.exceptions import SlumberBaseException
+from threadlocals.threadlocals import get_current_request, set_thread_variable
+
+logger = logging.getLogger(__name__)
+
+# Errors of the remote services which are cached.
+REMOTE_SERVICE_ERRORS = (ConnectionError, SlumberBaseException, Timeout)
+
+# Interval, in seconds, at which callers waiting for a value retrieved by another caller check the cache.
+LOCK_POLL_INTERVAL = 0.05
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _count(name, event, count=1):
+    if count:
+        with _stats_lock:
+            _stats['{}.{}'.format(name, event)] += count
+
+
+def get_cache_stats():
+    """
+    Returns the number of hits, misses, stale values and cached errors of each call site, in this process.
+
+    Returns:
+        dict: Map of `<name>.hit`, `<name>.miss`, `<name>.stale` and `<name>.error` to their count.
+    """
+    with _stats_lock:
+        return dict(_stats)
+
+
+def reset_cache_stats():
+    """ Resets the counts returned by `get_cache_stats`. """
+    with _stats_lock:
+        _stats.clear()
+
+
+def _fresh_key(key):
+    return '{}:fresh'.format(key)
+
+
+def _error_key(key):
+    return '{}:error'.format(key)
+
+
+def _lock_key(key):
+    return '{}:lock'.format(key)
+
+
+def cache_values(values, timeout):
+    """
+    Caches values retrieved from a remote service.
+
+    Arguments:
+        values (dict): Map of cache keys to values.
+        timeout (int): Number of seconds the values are fresh for, before jitter.
+    """
+    if not values:
+        return
+
+    timeout = int(timeout * (1 + random.uniform(0, settings.REMOTE_CACHE_TTL_JITTER)))
+    cache.set_many(values, timeout + settings.REMOTE_CACHE_STALE_TIMEOUT)
+    cache.set_many({_fresh_key(key): True for key in values}, timeout)
+
+
+def _cache_errors(errors):
+    try:
+        cache.set_many(
+            {_error_key(key): error for key, error in errors.items()},
+            settings.REMOTE_CACHE_ERROR_TIMEOUT
+        )
+    except Exception:  # pylint: disable=broad-except
+        # The error cannot be pickled. The next caller will call the service again.
+        logger.exception('Failed to cache the errors of [%d] values.', len(errors))
+
+
+def _fetch_and_cache(cache_keys, keys, fetch, timeout, errors):
+    """
+    Retrieves values from the remote service, caches them, and releases their locks.
+
+    Returns:
+        dict: Map of the cache keys to the values or errors retrieved for them.
+    """
+    try:
+        identifiers = [keys[key] for key in cache_keys]
+        try:
+            fetched = fetch(identifiers)
+        except errors as error:
+            fetched = {identifier: error for identifier in identifiers}
+
+        results = {}
+        for key in cache_keys:
+            if keys[key] in fetched:
+                results[key] = fetched[keys[key]]
+
+        values = {key: value for key, value in results.items() if not isinstance(value, Exception)}
+        cache_values(values, timeout)
+        _cache_errors({key: value for key, value in results.items() if isinstance(value, Exception)})
+        return results
+    finally:
+        cache.delete_many([_lock_key(key) for key in cache_keys])
+
+
+def _refresh(cache_keys, keys, fetch, timeout, errors, request):
+    # Retrieving values may depend on the current request, which is local to the thread that started the refresh.
+    set_thread_variable('request', request)
+    try:
+        _fetch_and_cache(cache_keys, keys, fetch, timeout, errors)
+    except Exception:  # pylint: disable=broad-except
+        logger.exception('Failed to refresh [%d] stale cached values.', len(cache_keys))
+    finally:
+        connections.close_all()
+
+
+def _refresh_in_background(cache_keys, keys, fetch, timeout, errors):
+    thread = threading.Thread(
+        target=_refresh, args=(cache_keys, keys, fetch, timeout, errors, get_current_request())
+    )
+    thread.daemon = True
+    thread.start()
+
+
+def _wait_for(cache_keys, name):
+    """
+    Waits for other callers to cache values, for at most REMOTE_CACHE_LOCK_TIMEOUT seconds.
+
+    Returns:
+        dict: Map of the cache keys to the values or errors cached for them. Keys which are still
+            missing when the wait is over are left out.
+    """
+    results = {}
+    pending = list(cache_keys)
+    deadline = time.time() + settings.REMOTE_CACHE_LOCK_TIMEOUT
+
+    while pending and time.time() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        cached = cache.get_many(pending + [_error_key(key) for key in pending])
+        for key in pending:
+            if key in cached:
+                results[key] = cached[key]
+            elif _error_key(key) in cached:
+                _count(name, 'error')
+                results[key] = cached[_error_key(key)]
+        pending = [key for key in pending if key not in results]
+
+    if pending:
+        logger.warning('Gave up waiting for [%d] values being retrieved by another caller.', len(pending))
+    return results
+
+
+def get_many_or_fetch(keys, fetch, timeout, name, errors=REMOTE_SERVICE_ERRORS):
+    """
+    Returns the values of several identifiers, from the cache or from a remote service.
+
+    Arguments:
+        keys (dict): Map of the cache keys to the identifiers of their values.
+        fetch (callable): Retrieves the values of a list of identifiers from the remote service. Returns a
+            dict mapping the identifiers to their value, or to the error raised while retrieving it. An error
+            raised by `fetch` is the error of all the identifiers. Identifiers left out are not cached.
+        timeout (int): Number of seconds values are fresh for.
+        name (str): Name the hits, misses, stale values and cached errors are counted under.
+        errors (tuple): Exception classes which are cached. Other exceptions are raised to the caller.
+
+    Returns:
+        dict: Map of the identifiers to their value.
+        dict: Map of the identifiers to the error raised while retrieving their value.
+    """
+    lookup = []
+    for key in keys:
+        lookup += [key, _fresh_key(key), _error_key(key)]
+    cached = cache.get_many(lookup)
+
+    results = {}
+    stale = []
+    missing = []
+    cached_errors = 0
+    for key in keys:
+        if key in cached:
+            results[key] = cached[key]
+            if _fresh_key(key) not in cached:
+                stale.append(key)
+        elif _error_key(key) in cached:
+            results[key] = cached[_error_key(key)]
+            cached_errors += 1
+        else:
+            missing.append(key)
+
+    _count(name, 'hit', len(results) - len(stale) - cached_errors)
+    _count(name, 'stale', len(stale))
+    _count(name, 'error', cached_errors)
+    _count(name, 'miss', len(missing))
+
+    refreshing = [key for key in stale if cache.add(_lock_key(key), True, settings.REMOTE_CACHE_LOCK_TIMEOUT)]
+    if refreshing:
+        _refresh_in_background(refreshing, keys, fetch, timeout, errors)
+
+    if missing:
+        locked = [key for key in missing if cache.add(_lock_key(key), True, settings.REMOTE_CACHE_LOCK_TIMEOUT)]
+        waiting = [key for key in missing if key not in locked]
+
+        if locked:
+            results.update(_fetch_and_cache(locked, keys, fetch, timeout, errors))
+        if waiting:
+            results.update(_wait_for(waiting, name))
+            # Values the other callers failed to cache in time are retrieved without waiting any longer.
+            given_up = [key for key in waiting if key not in results]
+            if given_up:
+                results.update(_fetch_and_cache(given_up, keys, fetch, timeout, errors))
+
+    values = {}
+    failures = {}
+    for key, result in results.items():
+        if isinstance(result, Exception):
+            failures[keys[key]] = result
+        else:
+            values[keys[key]] = result
+    return values, failures
+
+
+def get_or_fetch(key, fetch, timeout, name, errors=REMOTE_SERVICE_ERRORS):
+    """
+    Returns a value from the cache, or from a remote service.
+
+    Arguments:
+        key (str): Cache key of the value.
+        fetch (callable): Retrieves the value from the remote service, without arguments.
+        timeout (int): Number of seconds the value is fresh for.
+        name (str): Name the hits, misses, stale values and cached errors are counted under.
+        errors (tuple): Exception classes which are cached. Other exceptions are raised to the caller.
+
+    Returns:
+        The value.
+
+    Raises:
+        The error raised while retrieving the value, which may have been cached.
+    """
+    values, failures = get_many_or_fetch({key: key}, lambda identifiers: {key: fetch()}, timeout, name, errors)
+    if key in failures:
+        raise failures[key]
+    return values.get(key)
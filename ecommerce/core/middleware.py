@@ -0,0 +1,24 @@
+"""
+Middleware for the core app
+
+Note:
+    This middleware depends on "django_sites_extensions.middleware.CurrentSiteWithDefaultMiddleware" middleware
+    So it must be added after this middleware in django settings files.
+"""
+from ecommerce.core.site_cache import get_site_bundle
+
+
+class SiteConfigurationMiddleware(object):
+    """
+    Middleware that attaches the cached configuration of the current site to `request.site`, so that
+    `request.site.siteconfiguration` and its partner are read without querying the database.
+    """
+
+    def process_request(self, request):
+        site = getattr(request, 'site', None)
+        if site is None:
+            return
+
+        site_configuration = get_site_bundle(site).site_configuration
+        if site_configuration is not None:
+            site.siteconfiguration = site_configuration
@@ -13,6 +13,7 @@ from django.utils.functional import cached_property
 from django.utils.translation import ugettext_lazy as _
 from edx_rest_api_client.client import EdxRestApiClient
 from jsonfield.fields import JSONField
+import requests
 from requests.exceptions import ConnectionError, Timeout
 from slumber.exceptions import SlumberBaseException
 
@@ -116,12 +117,12 @@ class SiteConfiguration(models.Model):
                 )
                 raise ValidationError(exc.message)
 
-    def get_payment_processors(self):
+    def get_configured_payment_processors(self):
         """
-        Returns payment processor classes enabled for the corresponding Site
+        Returns payment processor classes configured for the corresponding Site, whether or not they are enabled
 
         Returns:
-            list[BasePaymentProcessor]: Returns payment processor classes enabled for the corresponding Site
+            list[BasePaymentProcessor]: Returns payment processor classes configured for the corresponding Site
         """
         all_processors = [get_processor_class(path) for path in settings.PAYMENT_PROCESSORS]
         all_processor_names = {processor.NAME for processor in all_processors}
@@ -133,10 +134,16 @@ class SiteConfiguration(models.Model):
                 'Unknown payment processors [%s] are configured for site %s', processor_config_repr, self.site.id
             )
 
-        return [
-            processor for processor in all_processors
-            if processor.NAME in self.payment_processors_set and processor.is_enabled()
-        ]
+        return [processor for processor in all_processors if processor.NAME in self.payment_processors_set]
+
+    def get_payment_processors(self):
+        """
+        Returns payment processor classes enabled for the corresponding Site
+
+        Returns:
+            list[BasePaymentProcessor]: Returns payment processor classes enabled for the corresponding Site
+        """
+        return [processor for processor in self.get_configured_payment_processors() if processor.is_enabled()]
 
     def get_from_email(self):
         """
@@ -247,6 +254,32 @@ class SiteConfiguration(models.Model):
 
         return EdxRestApiClient(settings.COURSE_CATALOG_API_URL, jwt=self.access_token)
 
+    @cached_property
+    def enrollment_api_client(self):
+        """
+        Returns an API client to access the Enrollment API of this site's LMS.
+
+        The client authenticates with the EDX_API_KEY setting rather than with the access token of a user,
+        so that the client, and its pool of up to ENROLLMENT_FULFILLMENT_POOL_SIZE connections, is shared
+        by all the users of the site.
+
+        Returns:
+            EdxRestApiClient: The client to access the Enrollment API.
+        """
+        pool_size = settings.ENROLLMENT_FULFILLMENT_POOL_SIZE
+        session = requests.Session()
+        session.headers['X-Edx-Api-Key'] = settings.EDX_API_KEY
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+
+        return EdxRestApiClient(
+            self.enrollment_api_url,
+            session=session,
+            timeout=settings.ENROLLMENT_FULFILLMENT_TIMEOUT,
+            append_slash=False
+        )
+
 
 class User(AbstractUser):
     """Custom user model for use with OIDC."""
@@ -269,11 +302,57 @@ class User(AbstractUser):
     def get_full_name(self):
         return self.full_name or super(User, self).get_full_name()
 
+    def _get_enrollments_cache_key(self, site):
+        return 'user_enrollments_{site_id}_{user_id}'.format(site_id=site.id, user_id=self.id)
+
+    def get_enrollments(self, site):
+        """
+        Returns the enrollments of the user in the courses of the given site's LMS.
+
+        All the enrollments of the user are retrieved with a single call to the LMS enrollment API,
+        and cached for ENROLLMENTS_CACHE_TIMEOUT seconds, or until the cache is cleared by
+        `invalidate_enrollments`.
+
+        Arguments:
+            site (Site): the site whose LMS enrollments are retrieved.
+
+        Returns:
+            dict: Map of course IDs to dicts holding the `mode` and `is_active` status of the enrollment.
+
+        Raises:
+            ConnectionError, SlumberBaseException and Timeout for failures in establishing a
+            connection with the LMS enrollment API endpoint.
+        """
+        key = self._get_enrollments_cache_key(site)
+        enrollments = cache.get(key)
+
+        if enrollments is None:
+            response = site.siteconfiguration.enrollment_api_client.enrollment.get(user=self.username)
+            enrollments = {
+                enrollment['course_details']['course_id']: {
+                    'mode': enrollment.get('mode'),
+                    'is_active': enrollment.get('is_active'),
+                }
+                for enrollment in response or []
+            }
+            cache.set(key, enrollments, settings.ENROLLMENTS_CACHE_TIMEOUT)
+
+        return enrollments
+
+    def invalidate_enrollments(self, site):
+        """
+        Clears the cached enrollments of the user, so that they are retrieved again on their next use.
+
+        Arguments:
+            site (Site): the site whose LMS enrollments were cached.
+        """
+        cache.delete(self._get_enrollments_cache_key(site))
+
     def is_user_already_enrolled(self, request, seat):
         """
         Check if a user is already enrolled in the course.
-        Calls the LMS enrollment API endpoint and sends the course ID and username query parameters
-        and returns the status of the user's enrollment in the course.
+        Looks up the enrollment of the user in the course among all their enrollments, which are
+        retrieved from the LMS enrollment API and cached by `get_enrollments`.
 
         Arguments:
             request (WSGIRequest): the request from which the LMS enrollment API endpoint is created.
@@ -288,12 +367,7 @@ class User(AbstractUser):
         """
         course_key = seat.attr.course_key
         try:
-            api = EdxRestApiClient(
-                request.site.siteconfiguration.build_lms_url('/api/enrollment/v1'),
-                oauth_access_token=self.access_token,
-                append_slash=False
-            )
-            status = api.enrollment(','.join([self.username, course_key])).get()
+            status = self.get_enrollments(request.site).get(course_key)
         except (ConnectionError, SlumberBaseException, Timeout) as ex:
             log.exception(
                 'Failed to retrieve enrollment details for [%s] in course [%s], Because of [%s]',
@@ -0,0 +1,19 @@
+from django.contrib.sites.models import Site
+from django.db.models.signals import post_delete, post_save
+from oscar.core.loading import get_model
+
+from ecommerce.core.models import SiteConfiguration
+from ecommerce.core.site_cache import invalidate_site_bundles
+from ecommerce.theming.models import SiteTheme
+
+Partner = get_model('partner', 'Partner')
+
+
+def invalidate_site_cache(*_args, **_kwargs):
+    """ Invalidate the cached site configuration bundles when a model they are built from changes. """
+    invalidate_site_bundles()
+
+
+for model in (Partner, Site, SiteConfiguration, SiteTheme):
+    post_save.connect(invalidate_site_cache, sender=model, dispatch_uid='invalidate_site_cache.{}'.format(model))
+    post_delete.connect(invalidate_site_cache, sender=model, dispatch_uid='invalidate_site_cache.{}'.format(model))
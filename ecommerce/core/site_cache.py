@@ -0,0 +1,103 @@
+"""
+Process-local cache of the configuration of each site.
+
+Nearly every request needs the SiteConfiguration, Partner, payment processors and theme of its site,
+which rarely change. They are resolved once per process and site, and kept until invalidated.
+
+Bundles are versioned by a number kept in the shared Django cache. Invalidating the bundles changes
+the number, and every process resolves its bundles again once it reads the new number.
+"""
+import threading
+import uuid
+from collections import namedtuple
+
+from django.apps import apps
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+
+SiteBundle = namedtuple('SiteBundle', ['site_configuration', 'partner', 'payment_processors', 'theme'])
+
+VERSION_CACHE_KEY = 'site_bundles_version'
+
+# Map of site ids to the version their bundle was resolved at, and the bundle.
+_bundles = {}
+_lock = threading.Lock()
+
+
+def _new_version():
+    return uuid.uuid4().hex
+
+
+def _get_version():
+    version = cache.get(VERSION_CACHE_KEY)
+
+    if version is None:
+        # The version was never set, or was evicted. Bundles resolved before cannot be trusted.
+        cache.add(VERSION_CACHE_KEY, _new_version(), None)
+        version = cache.get(VERSION_CACHE_KEY)
+
+    return version
+
+
+def invalidate_site_bundles():
+    """ Discard the bundles of all sites, in all processes, so that they are resolved again on their next use. """
+    cache.set(VERSION_CACHE_KEY, _new_version(), None)
+
+    with _lock:
+        _bundles.clear()
+
+
+def _build_site_bundle(site):
+    SiteConfiguration = apps.get_model('core', 'SiteConfiguration')
+    SiteTheme = apps.get_model('theming', 'SiteTheme')
+
+    try:
+        site_configuration = SiteConfiguration.objects.select_related('partner').get(site_id=site.id)
+    except ObjectDoesNotExist:
+        return SiteBundle(None, None, (), SiteTheme.get_theme(site))
+
+    return SiteBundle(
+        site_configuration,
+        site_configuration.partner,
+        tuple(site_configuration.get_configured_payment_processors()),
+        SiteTheme.get_theme(site)
+    )
+
+
+def get_site_bundle(site):
+    """
+    Returns the configuration bundle of the given site.
+
+    Arguments:
+        site (Site): Site whose configuration is requested.
+
+    Returns:
+        SiteBundle: The SiteConfiguration and Partner of the site, which are None for sites without
+            configuration, the payment processor classes configured for the site, whether or not they
+            are enabled, and the theme of the site.
+    """
+    version = _get_version()
+    cached = _bundles.get(site.id)
+
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    bundle = _build_site_bundle(site)
+
+    with _lock:
+        _bundles[site.id] = (version, bundle)
+
+    return bundle
+
+
+def get_payment_processors(site):
+    """
+    Returns the payment processor classes enabled for the given site.
+
+    Arguments:
+        site (Site): Site whose payment processors are requested.
+
+    Returns:
+        list[BasePaymentProcessor]: The enabled payment processor classes, in the order they are configured.
+    """
+    return [processor for processor in get_site_bundle(site).payment_processors if processor.is_enabled()]
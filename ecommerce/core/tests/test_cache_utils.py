@@ -0,0 +1,147 @@
+import json
+import threading
+import time
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+
+import mock
+from django.core.cache import cache
+from django.test import override_settings
+import requests
+from requests.exceptions import ConnectionError
+
+from ecommerce.core.cache_utils import (
+    cache_values, get_cache_stats, get_many_or_fetch, get_or_fetch, reset_cache_stats
+)
+from ecommerce.tests.testcases import TestCase
+
+
+class StubServiceHandler(BaseHTTPRequestHandler):
+    """ Answers every request with the path requested, after a delay, and counts the requests. """
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        self.server.request_count += 1
+        time.sleep(self.server.delay)
+        body = json.dumps({'path': self.path})
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class StubService(HTTPServer):
+    """ Local HTTP service, served by a background thread. """
+
+    def __init__(self, delay):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), StubServiceHandler)
+        self.delay = delay
+        self.request_count = 0
+        self.url = 'http://127.0.0.1:{}'.format(self.server_port)
+
+        thread = threading.Thread(target=self.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+
+class CacheUtilsTests(TestCase):
+    """ Tests for the caching of the data retrieved from remote services. """
+
+    def setUp(self):
+        super(CacheUtilsTests, self).setUp()
+        reset_cache_stats()
+        self.addCleanup(cache.clear)
+
+    def test_get_or_fetch(self):
+        """ Verify values are retrieved once, cached under their own key, and counted. """
+        fetch = mock.Mock(return_value='value')
+
+        self.assertEqual(get_or_fetch('key', fetch, 60, 'test'), 'value')
+        self.assertEqual(get_or_fetch('key', fetch, 60, 'test'), 'value')
+        self.assertEqual(fetch.call_count, 1)
+        self.assertEqual(cache.get('key'), 'value')
+        self.assertEqual(get_cache_stats(), {'test.miss': 1, 'test.hit': 1})
+
+    def test_get_many_or_fetch(self):
+        """ Verify only the missing values are retrieved, with a single call, and that errors are returned. """
+        cache_values({'key-a': 'a'}, 60)
+        error = ConnectionError()
+        fetch = mock.Mock(return_value={'b': 'b', 'c': error})
+
+        values, errors = get_many_or_fetch({'key-a': 'a', 'key-b': 'b', 'key-c': 'c'}, fetch, 60, 'test')
+        self.assertEqual(values, {'a': 'a', 'b': 'b'})
+        self.assertEqual(errors, {'c': error})
+        self.assertEqual(sorted(fetch.call_args[0][0]), ['b', 'c'])
+        self.assertEqual(get_cache_stats(), {'test.miss': 2, 'test.hit': 1})
+
+    def test_errors_cached(self):
+        """ Verify failures are cached for a short time, and raised again without calling the service. """
+        fetch = mock.Mock(side_effect=ConnectionError)
+
+        for __ in range(2):
+            with self.assertRaises(ConnectionError):
+                get_or_fetch('key', fetch, 60, 'test')
+        self.assertEqual(fetch.call_count, 1)
+        self.assertEqual(get_cache_stats(), {'test.miss': 1, 'test.error': 1})
+
+        # Other errors are not cached.
+        fetch = mock.Mock(side_effect=ValueError)
+        for __ in range(2):
+            with self.assertRaises(ValueError):
+                get_or_fetch('other-key', fetch, 60, 'test')
+        self.assertEqual(fetch.call_count, 2)
+
+    @override_settings(REMOTE_CACHE_TTL_JITTER=0.5, REMOTE_CACHE_STALE_TIMEOUT=300)
+    def test_jitter(self):
+        """ Verify timeouts are lengthened by a random fraction, and values are kept while stale. """
+        with mock.patch('ecommerce.core.cache_utils.random.uniform', return_value=0.5) as uniform:
+            with mock.patch.object(cache, 'set_many') as set_many:
+                cache_values({'key': 'value'}, 100)
+
+        uniform.assert_called_once_with(0, 0.5)
+        self.assertEqual(set_many.call_args_list, [
+            mock.call({'key': 'value'}, 450),
+            mock.call({'key:fresh': True}, 150),
+        ])
+
+    def test_stale(self):
+        """ Verify stale values are served while they are refreshed in the background. """
+        cache_values({'key': 'old'}, 60)
+        cache.delete('key:fresh')
+        refreshed = threading.Event()
+
+        def fetch():
+            refreshed.set()
+            return 'new'
+
+        self.assertEqual(get_or_fetch('key', fetch, 60, 'test'), 'old')
+        self.assertTrue(refreshed.wait(5))
+
+        # Wait for the refreshed value to be cached, after it has been retrieved.
+        deadline = time.time() + 5
+        while cache.get('key:fresh') is None and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(get_or_fetch('key', fetch, 60, 'test'), 'new')
+        self.assertEqual(get_cache_stats(), {'test.stale': 1, 'test.hit': 1})
+
+    def test_concurrent_misses(self):
+        """ Verify concurrent misses of a value are coalesced into a single call to the service. """
+        service = StubService(delay=0.2)
+        self.addCleanup(service.server_close)
+        self.addCleanup(service.shutdown)
+        url = '{}/courses/course-v1:test+test+test/'.format(service.url)
+        results = []
+
+        def get_course():
+            results.append(get_or_fetch('key', lambda: requests.get(url).json(), 60, 'test'))
+
+        threads = [threading.Thread(target=get_course) for __ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(service.request_count, 1)
+        self.assertEqual(results, [{'path': '/courses/course-v1:test+test+test/'}] * 10)
@@ -87,8 +87,30 @@ class UserTests(CourseCatalogTestMixin, LmsApiMockMixin, TestCase):
             course_id=course_id2, seat_type=mode, id_verification=id_verification
         )
         self.mock_enrollment_api(self.request, user, course_id2, is_active=False, mode=mode)
+        user.invalidate_enrollments(self.request.site)
         self.assertFalse(user.is_user_already_enrolled(self.request, not_enrolled_seat))
 
+    @httpretty.activate
+    def test_is_user_enrolled_cached(self):
+        """ Verify all the enrollments of a user are retrieved with one call, and cached until invalidated. """
+        user = self.create_user()
+        course_id = 'course-v1:test+test+test'
+        __, enrolled_seat = self.create_course_and_seat(course_id=course_id, seat_type='verified')
+        __, not_enrolled_seat = self.create_course_and_seat(course_id='course-v1:not+enrolled+here')
+        self.mock_enrollment_api(self.request, user, course_id, mode='verified')
+
+        self.assertTrue(user.is_user_already_enrolled(self.request, enrolled_seat))
+        self.assertFalse(user.is_user_already_enrolled(self.request, not_enrolled_seat))
+        self.assertTrue(user.is_user_already_enrolled(self.request, enrolled_seat))
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 1)
+        self.assertEqual(httpretty.last_request().querystring, {'user': [user.username]})
+        self.assertEqual(httpretty.last_request().headers['X-Edx-Api-Key'], settings.EDX_API_KEY)
+
+        user.invalidate_enrollments(self.request.site)
+        self.mock_enrollment_api(self.request, user, course_id, is_active=False, mode='verified')
+        self.assertFalse(user.is_user_already_enrolled(self.request, enrolled_seat))
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 2)
+
 
 class BusinessClientTests(TestCase):
     def test_str(self):
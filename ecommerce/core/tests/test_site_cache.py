@@ -0,0 +1,83 @@
+from django.core.cache import cache
+from django.test import RequestFactory
+
+from ecommerce.core.middleware import SiteConfigurationMiddleware
+from ecommerce.core.site_cache import (
+    VERSION_CACHE_KEY, get_payment_processors, get_site_bundle, invalidate_site_bundles
+)
+from ecommerce.extensions.payment.processors.paypal import Paypal
+from ecommerce.tests.factories import SiteConfigurationFactory
+from ecommerce.tests.testcases import TestCase
+from ecommerce.theming.models import SiteTheme
+
+
+class SiteCacheTests(TestCase):
+    """ Tests for the process-local cache of site configurations. """
+
+    def setUp(self):
+        super(SiteCacheTests, self).setUp()
+        invalidate_site_bundles()
+
+    def test_get_site_bundle(self):
+        """ Verify the bundle of a site is resolved once, and holds its configuration, partner and theme. """
+        SiteTheme.objects.create(site=self.site, theme_dir_name='test-theme')
+
+        bundle = get_site_bundle(self.site)
+        self.assertEqual(bundle.site_configuration, self.site.siteconfiguration)
+        self.assertEqual(bundle.partner, self.partner)
+        self.assertEqual(bundle.theme.theme_dir_name, 'test-theme')
+        self.assertEqual(
+            list(bundle.payment_processors), self.site.siteconfiguration.get_configured_payment_processors()
+        )
+
+        with self.assertNumQueries(0):
+            self.assertIs(get_site_bundle(self.site), bundle)
+
+    def test_invalidation(self):
+        """ Verify the bundles are resolved again after the configuration of a site or its theme changes. """
+        site_configuration = self.site.siteconfiguration
+        site_configuration.payment_processors = Paypal.NAME
+        site_configuration.save()
+        self.assertEqual(get_site_bundle(self.site).payment_processors, (Paypal,))
+
+        SiteTheme.objects.create(site=self.site, theme_dir_name='test-theme')
+        self.assertEqual(get_site_bundle(self.site).theme.theme_dir_name, 'test-theme')
+
+    def test_invalidation_by_other_process(self):
+        """ Verify the bundles are resolved again when another process changes, or the cache evicts, the version. """
+        bundle = get_site_bundle(self.site)
+
+        cache.set(VERSION_CACHE_KEY, 'other-version')
+        other_bundle = get_site_bundle(self.site)
+        self.assertIsNot(other_bundle, bundle)
+
+        cache.delete(VERSION_CACHE_KEY)
+        self.assertIsNot(get_site_bundle(self.site), other_bundle)
+
+    def test_get_payment_processors(self):
+        """ Verify the enabled payment processors of a site are read from its bundle. """
+        self.assertEqual(get_payment_processors(self.site), self.site.siteconfiguration.get_payment_processors())
+
+        with self.assertNumQueries(0):
+            get_payment_processors(self.site)
+
+    def test_middleware(self):
+        """ Verify the middleware attaches the cached configuration of the site to the request. """
+        bundle = get_site_bundle(self.site)
+        request = RequestFactory().get('/')
+        request.site = self.site
+
+        SiteConfigurationMiddleware().process_request(request)
+        with self.assertNumQueries(0):
+            self.assertIs(request.site.siteconfiguration, bundle.site_configuration)
+            self.assertEqual(request.site.siteconfiguration.partner, self.partner)
+
+    def test_site_without_configuration(self):
+        """ Verify sites without configuration have a bundle without configuration. """
+        site = SiteConfigurationFactory().site
+        site.siteconfiguration.delete()
+
+        bundle = get_site_bundle(site)
+        self.assertIsNone(bundle.site_configuration)
+        self.assertIsNone(bundle.partner)
+        self.assertEqual(bundle.payment_processors, ())
@@ -2,6 +2,7 @@ import datetime
 import json
 
 import httpretty
+import mock
 from django.conf import settings
 from django.test import RequestFactory
 from oscar.test import factories
@@ -67,6 +68,36 @@ class CourseCatalogMockMixin(object):
             content_type='application/json'
         )
 
+    def mock_catalog_contains_stub(self, contained_course_run_ids):
+        """ Serve the Course Catalog contains endpoint from a local stub for the rest of the test. """
+        stub = CourseCatalogContainsStub(contained_course_run_ids)
+        client = mock.Mock()
+        client.course_runs.contains = stub
+        patcher = mock.patch(
+            'ecommerce.core.models.SiteConfiguration.course_catalog_api_client',
+            mock.PropertyMock(return_value=client)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return stub
+
+
+class CourseCatalogContainsStub(object):
+    """ Local stub of the Course Catalog contains endpoint that records every call made to it. """
+
+    def __init__(self, contained_course_run_ids):
+        self.contained_course_run_ids = set(contained_course_run_ids)
+        self.calls = []
+
+    def get(self, query, course_run_ids):
+        course_run_ids = course_run_ids.split(',')
+        self.calls.append((query, course_run_ids))
+        return {
+            'course_runs': {
+                course_run_id: course_run_id in self.contained_course_run_ids for course_run_id in course_run_ids
+            }
+        }
+
 
 class CouponMixin(object):
     """ Mixin for preparing data for coupons and creating coupons. """
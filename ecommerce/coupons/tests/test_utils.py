@@ -1,8 +1,11 @@
+import json
+
 import httpretty
+from django.conf import settings
 
 from ecommerce.core.tests.decorators import mock_course_catalog_api_client
 from ecommerce.coupons.tests.mixins import CourseCatalogMockMixin, CouponMixin
-from ecommerce.coupons.utils import get_seats_from_query
+from ecommerce.coupons.utils import get_seats_from_query, iter_seats_from_query
 from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
 from ecommerce.tests.testcases import TestCase
 
@@ -29,3 +32,62 @@ class CouponUtilsTests(CouponMixin, CourseCatalogTestMixin, CourseCatalogMockMix
         self.mock_dynamic_catalog_course_runs_api(query=self.query, course_run=course)
         response = get_seats_from_query(self.site, self.query, self.seat_type)
         self.assertEqual(response, [])
+
+    def mock_paginated_course_runs_api(self, pages):
+        """ Register the course runs endpoint serving the given pages of course keys, and return a list recording
+        the query string of every request made to it. """
+        requests = []
+
+        def callback(request, uri, headers):  # pylint: disable=unused-argument
+            requests.append(request.querystring)
+            page = int(request.querystring.get('page', ['1'])[0])
+            body = {
+                'count': sum(len(course_keys) for course_keys in pages),
+                'next': '{}course_runs/?q={}&page={}'.format(
+                    settings.COURSE_CATALOG_API_URL, self.query, page + 1
+                ) if page < len(pages) else None,
+                'results': [{'key': course_key} for course_key in pages[page - 1]],
+            }
+            return 200, headers, json.dumps(body)
+
+        httpretty.register_uri(
+            httpretty.GET, '{}course_runs/'.format(settings.COURSE_CATALOG_API_URL),
+            body=callback, content_type='application/json'
+        )
+        return requests
+
+    def test_get_seats_from_query_query_count(self):
+        """ Verify the seats of all query results are retrieved with a fixed number of queries. """
+        seats = [
+            self.create_course_and_seat(course_id='course-v1:test+test+{}'.format(index))[1] for index in range(10)
+        ]
+        self.create_course_and_seat(seat_type='professional', course_id='course-v1:test+test+professional')
+        self.mock_paginated_course_runs_api([[seat.course_id for seat in seats] + ['course-v1:test+test+professional']])
+
+        with self.assertNumQueries(3):
+            response = get_seats_from_query(self.site, self.query, self.seat_type)
+        self.assertEqual(response, seats)
+
+        with self.assertNumQueries(0):
+            for seat in response:
+                self.assertEqual(seat.attr.certificate_type, self.seat_type)
+                self.assertEqual(len(seat.stockrecords.all()), 1)
+
+    def test_iter_seats_from_query_pagination(self):
+        """ Verify all pages of query results are followed, and only as seats are consumed. """
+        seats = [
+            self.create_course_and_seat(course_id='course-v1:test+test+{}'.format(index))[1] for index in range(4)
+        ]
+        requests = self.mock_paginated_course_runs_api([
+            [seats[0].course_id, seats[1].course_id],
+            [seats[2].course_id, seats[3].course_id],
+        ])
+
+        results = iter_seats_from_query(self.site, self.query, self.seat_type)
+        self.assertEqual(requests, [])
+        self.assertEqual([next(results), next(results)], seats[:2])
+        self.assertEqual(len(requests), 1)
+
+        self.assertEqual(list(results), seats[2:])
+        self.assertEqual(len(requests), 2)
+        self.assertEqual(requests[1]['page'], ['2'])
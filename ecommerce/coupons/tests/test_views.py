@@ -2,6 +2,7 @@ import datetime
 
 import ddt
 import httpretty
+import mock
 import pytz
 from django.conf import settings
 from django.core.urlresolvers import reverse
@@ -13,7 +14,7 @@ from oscar.test.factories import (
 )
 from oscar.test.utils import RequestFactory
 
-from ecommerce.core.url_utils import get_lms_url
+from ecommerce.core.url_utils import get_ecommerce_url, get_lms_url
 from ecommerce.coupons.tests.mixins import CouponMixin
 from ecommerce.coupons.views import get_voucher_and_products_from_code, voucher_is_valid
 from ecommerce.courses.tests.factories import CourseFactory
@@ -367,3 +368,26 @@ class EnrollmentCodeCsvViewTests(TestCase):
         response = self.client.get(reverse(self.path, args=[order.number]))
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response['content-type'], 'text/csv')
+
+    def test_csv_content(self):
+        """ Verify the CSV lists the codes of every order line, reading them in chunks. """
+        order = OrderFactory(user=self.user)
+        line = OrderLineFactory(order=order)
+        vouchers = [VoucherFactory(code='CODE{}'.format(i)) for i in range(3)]
+        order_line_vouchers = OrderLineVouchers.objects.create(line=line)
+        order_line_vouchers.vouchers.add(*vouchers)
+
+        with mock.patch('ecommerce.coupons.views.VOUCHER_BATCH_SIZE', 2):
+            response = self.client.get(reverse(self.path, args=[order.number]))
+        self.assertEqual(response.status_code, 200)
+
+        redeem_url = get_ecommerce_url(reverse('coupons:offer'))
+        expected = 'Order Number:,{number}\r\n\r\n{title}\r\nCode,Redemption URL\r\n{codes}\r\n'.format(
+            number=order.number,
+            title=line.product.title,
+            codes=''.join(
+                '{code},{url}?code={code}\r\n'.format(code=voucher.code, url=redeem_url)
+                for voucher in vouchers
+            )
+        )
+        self.assertEqual(b''.join(response.streaming_content), expected)
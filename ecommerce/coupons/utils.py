@@ -1,9 +1,85 @@
 """ Coupon related utility functions. """
+from urlparse import parse_qsl, urlparse
+
+from django.db.models import Prefetch
 from oscar.core.loading import get_model
 
 from ecommerce.core.constants import DEFAULT_CATALOG_PAGE_SIZE
+from ecommerce.extensions.catalogue.utils import initialize_product_attributes
 
 Product = get_model('catalogue', 'Product')
+ProductAttributeValue = get_model('catalogue', 'ProductAttributeValue')
+
+
+def _get_next_page_params(response):
+    """ Return the query parameters of the next page of a paginated API response, or None for the last page. """
+    next_url = response.get('next')
+    if not next_url:
+        return None
+    return dict(parse_qsl(urlparse(next_url).query))
+
+
+def _get_seats_for_course_keys(course_keys, seat_types):
+    """
+    Retrieve the seats of the given courses matching the seat types with a single query.
+
+    Attribute values and stock records are prefetched, and the product attributes are
+    initialised from the prefetched values, so that callers can read `seat.attr`,
+    `seat.attribute_values` and `seat.stockrecords` without further queries.
+
+    Arguments:
+        course_keys (list): course run keys
+        seat_types (list): accepted seat type names
+
+    Returns:
+        List of seat products.
+    """
+    seats = list(
+        Product.objects.filter(
+            course_id__in=course_keys,
+            seat_attributes__certificate_type__in=seat_types
+        ).select_related('parent__product_class').prefetch_related(
+            Prefetch('attribute_values', queryset=ProductAttributeValue.objects.select_related('attribute')),
+            'stockrecords'
+        )
+    )
+
+    initialize_product_attributes(seats)
+    return seats
+
+
+def iter_seats_from_query(site, query, seat_types):
+    """
+    Lazily retrieve seats from a course catalog query and matching seat types.
+
+    Pages of query results are only requested from the Course Catalog Service as the
+    seats are consumed, and the seats of each page are retrieved with a single query.
+
+    Arguments:
+        site (Site): current site
+        query (str): course catalog query
+        seat_types (str): a string with comma-separated accepted seat type names
+
+    Yields:
+        Seat products retrieved from the course catalog query, in the order of the query results.
+    """
+    course_runs_api = site.siteconfiguration.course_catalog_api_client.course_runs
+    seat_types = seat_types.split(',')
+    params = {'q': query, 'page_size': DEFAULT_CATALOG_PAGE_SIZE, 'limit': DEFAULT_CATALOG_PAGE_SIZE}
+
+    while params:
+        response = course_runs_api.get(**params)
+        course_keys = [result['key'] for result in response['results']]
+
+        seats_by_course_key = {}
+        for seat in _get_seats_for_course_keys(course_keys, seat_types):
+            seats_by_course_key.setdefault(seat.course_id, []).append(seat)
+
+        for course_key in course_keys:
+            for seat in seats_by_course_key.pop(course_key, []):
+                yield seat
+
+        params = _get_next_page_params(response)
 
 
 def get_seats_from_query(site, query, seat_types):
@@ -18,21 +94,7 @@ def get_seats_from_query(site, query, seat_types):
     Returns:
         List of seat products retrieved from the course catalog query.
     """
-    response = site.siteconfiguration.course_catalog_api_client.course_runs.get(q=query,
-                                                                                page_size=DEFAULT_CATALOG_PAGE_SIZE,
-                                                                                limit=DEFAULT_CATALOG_PAGE_SIZE)
-    query_products = []
-    for result in response['results']:
-        try:
-            product = Product.objects.get(
-                course_id=result['key'],
-                attributes__name='certificate_type',
-                attribute_values__value_text__in=seat_types.split(',')
-            )
-            query_products.append(product)
-        except Product.DoesNotExist:
-            pass
-    return query_products
+    return list(iter_seats_from_query(site, query, seat_types))
 
 
 def prepare_course_seat_types(course_seat_types):
@@ -6,7 +6,7 @@ import logging
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import PermissionDenied
 from django.core.urlresolvers import reverse
-from django.http import Http404, HttpResponse, HttpResponseRedirect
+from django.http import Http404, HttpResponseRedirect, StreamingHttpResponse
 from django.utils.decorators import method_decorator
 from django.utils.text import slugify
 from django.utils.translation import ugettext_lazy as _
@@ -21,6 +21,8 @@ from ecommerce.extensions.api import exceptions
 from ecommerce.extensions.api.constants import APIConstants as AC
 from ecommerce.extensions.basket.utils import prepare_basket
 from ecommerce.extensions.checkout.mixins import EdxOrderPlacementMixin
+from ecommerce.extensions.voucher.utils import VOUCHER_BATCH_SIZE, get_voucher_from_code
+from ecommerce.extensions.voucher.views import Echo
 
 Applicator = get_class('offer.utils', 'Applicator')
 Basket = get_model('basket', 'Basket')
@@ -49,7 +51,7 @@ def get_voucher_and_products_from_code(code):
         Voucher.DoesNotExist: When no vouchers with provided code exist.
         ProductNotFoundError: When no products are associated with the voucher.
     """
-    voucher = Voucher.objects.get(code=code)
+    voucher = get_voucher_from_code(code)
 
     products = voucher.offers.all()[0].benefit.range.all_products()
 
@@ -163,7 +165,7 @@ class CouponRedeemView(EdxOrderPlacementMixin, View):
             return render(request, template_name, {'error': _('SKU not provided.')})
 
         try:
-            voucher = Voucher.objects.get(code=code)
+            voucher = get_voucher_from_code(code)
         except Voucher.DoesNotExist:
             msg = 'No voucher found with code {code}'.format(code=code)
             return render(request, template_name, {'error': _(msg)})
@@ -216,7 +218,7 @@ class EnrollmentCodeCsvView(View):
             number (str): Number of the order
 
         Returns:
-            HttpResponse
+            StreamingHttpResponse
 
         Raises:
             Http404: When an order number for a non-existing order is passed.
@@ -234,26 +236,51 @@ class EnrollmentCodeCsvView(View):
         file_name = 'Enrollment code CSV order num {}'.format(order.number)
         file_name = '{filename}.csv'.format(filename=slugify(file_name))
 
-        response = HttpResponse(content_type='text/csv')
+        redeem_url = get_ecommerce_url(reverse('coupons:offer'))
+
+        response = StreamingHttpResponse(self._generate_csv_rows(order, redeem_url), content_type='text/csv')
         response['Content-Disposition'] = 'attachment; filename={filename}'.format(filename=file_name)
+        return response
 
-        redeem_url = get_ecommerce_url(reverse('coupons:offer'))
+    def _generate_csv_rows(self, order, redeem_url):
+        """
+        Lazily generate the lines of the CSV of the order.
+
+        The voucher codes are read in chunks of VOUCHER_BATCH_SIZE, so that the memory used does
+        not depend on the number of enrollment codes of the order.
+
+        Yields:
+            str: CSV lines.
+        """
         voucher_field_names = ('Code', 'Redemption URL')
-        voucher_writer = csv.DictWriter(response, fieldnames=voucher_field_names)
+        voucher_writer = csv.DictWriter(Echo(), fieldnames=voucher_field_names)
 
-        writer = csv.writer(response)
-        writer.writerow(('Order Number:', order.number))
-        writer.writerow([])
+        writer = csv.writer(Echo())
+        yield writer.writerow(('Order Number:', order.number))
+        yield writer.writerow([])
 
-        order_line_vouchers = OrderLineVouchers.objects.filter(line__order=order)
+        order_line_vouchers = OrderLineVouchers.objects.filter(line__order=order).select_related('line__product')
         for order_line_voucher in order_line_vouchers:
-            writer.writerow([order_line_voucher.line.product.title])
-            voucher_writer.writeheader()
+            yield writer.writerow([order_line_voucher.line.product.title])
+            yield voucher_writer.writerow(dict(zip(voucher_field_names, voucher_field_names)))
 
-            for voucher in order_line_voucher.vouchers.all():
-                voucher_writer.writerow({
-                    voucher_field_names[0]: voucher.code,
-                    voucher_field_names[1]: '{url}?code={code}'.format(url=redeem_url, code=voucher.code)
+            for code in self._iter_voucher_codes(order_line_voucher):
+                yield voucher_writer.writerow({
+                    voucher_field_names[0]: code,
+                    voucher_field_names[1]: '{url}?code={code}'.format(url=redeem_url, code=code)
                 })
-            writer.writerow([])
-        return response
+            yield writer.writerow([])
+
+    def _iter_voucher_codes(self, order_line_voucher):
+        """ Iterate over the codes of the vouchers of an order line, reading them by keyset pagination on their ID. """
+        vouchers = order_line_voucher.vouchers.order_by('id').values_list('id', 'code')
+        last_id = 0
+
+        while True:
+            chunk = list(vouchers.filter(id__gt=last_id)[:VOUCHER_BATCH_SIZE])
+            if not chunk:
+                return
+
+            for __, code in chunk:
+                yield code
+            last_id = chunk[-1][0]
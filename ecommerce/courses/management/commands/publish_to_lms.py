@@ -1,15 +1,32 @@
 """ This command publish the courses to LMS."""
 from __future__ import unicode_literals
+import functools
+import io
+import itertools
 import logging
+from multiprocessing.pool import ThreadPool
 from optparse import make_option
 import os
+import time
 
 from django.core.management import BaseCommand, CommandError
+from django.db.models import Prefetch
+from oscar.core.loading import get_model
+import requests
+from threadlocals.threadlocals import get_current_request, set_thread_variable
 
+from ecommerce.core.constants import ENROLLMENT_CODE_PRODUCT_CLASS_NAME, SEAT_PRODUCT_CLASS_NAME
 from ecommerce.courses.models import Course
+from ecommerce.courses.publishers import LMSPublisher
+from ecommerce.extensions.catalogue.utils import initialize_product_attributes
 
 
 logger = logging.getLogger(__name__)
+Product = get_model('catalogue', 'Product')
+ProductAttributeValue = get_model('catalogue', 'ProductAttributeValue')
+
+# Number of courses retrieved, with their products, per query.
+COURSE_BATCH_SIZE = 100
 
 
 class Command(BaseCommand):
@@ -24,6 +41,29 @@ class Command(BaseCommand):
             default=None,
             help='Path to file to read courses from.'
         ),
+        make_option(
+            '--workers',
+            action='store',
+            dest='workers',
+            type='int',
+            default=1,
+            help='Number of courses published concurrently.'
+        ),
+        make_option(
+            '--checkpoint_file',
+            action='store',
+            dest='checkpoint_file',
+            default=None,
+            help='Path to file recording the published courses. Courses it lists are skipped, '
+                 'so that an interrupted run can be resumed.'
+        ),
+        make_option(
+            '--force',
+            action='store_true',
+            dest='force',
+            default=False,
+            help='Publish courses even if their commerce data has not changed since they were last published.'
+        ),
     )
 
     ch = logging.StreamHandler()
@@ -31,20 +71,76 @@ class Command(BaseCommand):
     logger.addHandler(ch)
 
     def handle(self, *args, **options):
-        failed = 0
         course_ids_file = options['course_ids_file']
         if not course_ids_file or not os.path.exists(course_ids_file):
             raise CommandError("Pass the correct absolute path to course ids file as --course_ids_file argument.")
 
+        workers = options['workers']
+        if workers < 1:
+            raise CommandError("The number of workers must be a positive integer.")
+
         with open(course_ids_file, 'r') as file_handler:
-            course_ids = file_handler.readlines()
-            total_courses = len(course_ids)
-            logger.info("Publishing %d courses.", total_courses)
-            for index, course_id in enumerate(course_ids, start=1):
-                try:
-                    course_id = course_id.strip()
-                    course = Course.objects.get(id=course_id)
-                    publishing_error = course.publish_to_lms()
+            course_ids = [course_id.strip() for course_id in file_handler.readlines()]
+
+        checkpoint_file = options['checkpoint_file']
+        published_course_ids = self._read_checkpoint(checkpoint_file)
+        if published_course_ids:
+            course_ids = [course_id for course_id in course_ids if course_id not in published_course_ids]
+            logger.info("Skipping %d courses already published.", len(published_course_ids))
+
+        total_courses = len(course_ids)
+        logger.info("Publishing %d courses.", total_courses)
+
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        # Hashes of the published data are saved from this thread, as the workers do not query the database.
+        publisher = LMSPublisher(session=session, record_hashes=False)
+        publish = functools.partial(self._publish, publisher, options['force'])
+
+        # Worker threads do not share the thread local storage the LMS URLs are resolved from.
+        pool = ThreadPool(workers, initializer=set_thread_variable, initargs=('request', get_current_request()))
+        start = time.time()
+
+        try:
+            failed, latencies, unchanged = self._publish_courses(pool, publish, course_ids, checkpoint_file)
+        finally:
+            pool.close()
+            pool.join()
+
+        if failed:
+            logger.error("Completed publishing courses. %d of %d failed.", failed, total_courses)
+        else:
+            logger.info("All %d courses successfully published.", total_courses)
+
+        self._log_summary(latencies, unchanged, time.time() - start)
+
+    def _publish_courses(self, pool, publish, course_ids, checkpoint_file):
+        """
+        Publish the courses with the worker pool, batch by batch, and record the published ones in the checkpoint file.
+
+        Returns:
+            tuple: the number of courses which failed to publish, the publishing latencies of the published
+                courses, and the number of courses left unchanged.
+        """
+        total_courses = len(course_ids)
+        failed = 0
+        latencies = []
+        unchanged = 0
+
+        with self._open_checkpoint(checkpoint_file) as checkpoint:
+            index = 0
+            for batch in self._iter_batches(course_ids):
+                for course_id, publishing_error, latency, published_hash in pool.imap(publish, batch):
+                    index += 1
+
+                    if published_hash:
+                        latencies.append(latency)
+                        Course.objects.filter(id=course_id).update(published_hash=published_hash)
+                    elif not publishing_error:
+                        unchanged += 1
+
                     if publishing_error:
                         failed += 1
                         logger.error(
@@ -52,12 +148,131 @@ class Command(BaseCommand):
                         )
                     else:
                         logger.info(u"(%d/%d) Successfully published %s.", index, total_courses, course_id)
-                except Course.DoesNotExist:
-                    failed += 1
-                    logger.error(
-                        u"(%d/%d) Failed to publish %s: Course does not exist.", index, total_courses, course_id
-                    )
-        if failed:
-            logger.error("Completed publishing courses. %d of %d failed.", failed, total_courses)
+                        if checkpoint:
+                            checkpoint.write(course_id + '\n')
+                            checkpoint.flush()
+
+        return failed, latencies, unchanged
+
+    def _read_checkpoint(self, checkpoint_file):
+        """ Return the IDs of the courses recorded as published in the checkpoint file. """
+        if not checkpoint_file or not os.path.exists(checkpoint_file):
+            return set()
+
+        with io.open(checkpoint_file, 'r', encoding='utf-8') as file_handler:
+            return set(line.strip() for line in file_handler if line.strip())
+
+    def _open_checkpoint(self, checkpoint_file):
+        """ Open the checkpoint file for appending, or return a placeholder context when there is none. """
+        if checkpoint_file:
+            return io.open(checkpoint_file, 'a', encoding='utf-8')
+        return _NoCheckpoint()
+
+    def _iter_batches(self, course_ids):
+        """
+        Retrieve the courses to publish in batches of COURSE_BATCH_SIZE.
+
+        The seats of each course, their stock records and attributes, and the enrollment code
+        of the course are retrieved with a fixed number of queries per batch, in this thread,
+        so that publishing a course does not query the database.
+
+        Yields:
+            list: (course ID, Course or None, list of seats, enrollment code or None) tuples.
+        """
+        products = Product.objects.select_related('product_class', 'parent__product_class')
+        attribute_values = ProductAttributeValue.objects.select_related('attribute')
+
+        course_ids = iter(course_ids)
+        while True:
+            batch_ids = list(itertools.islice(course_ids, COURSE_BATCH_SIZE))
+            if not batch_ids:
+                return
+
+            courses = Course.objects.filter(id__in=batch_ids).prefetch_related(
+                Prefetch('products', queryset=products),
+                Prefetch('products__attribute_values', queryset=attribute_values),
+                'products__stockrecords'
+            )
+            courses = {course.id: course for course in courses}
+
+            batch = []
+            for course_id in batch_ids:
+                course = courses.get(course_id)
+                seats = []
+                enrollment_code = None
+
+                if course:
+                    for product in course.products.all():
+                        product_class = product.get_product_class()
+                        if product.is_child and product_class.name == SEAT_PRODUCT_CLASS_NAME:
+                            seats.append(product)
+                        elif product_class and product_class.name == ENROLLMENT_CODE_PRODUCT_CLASS_NAME:
+                            enrollment_code = product
+                    initialize_product_attributes(seats)
+
+                batch.append((course_id, course, seats, enrollment_code))
+
+            yield batch
+
+    def _publish(self, publisher, force, item):
+        """
+        Publish a single course.
+
+        Arguments:
+            publisher (LMSPublisher): Publisher shared by the workers.
+            force (bool): Whether to publish the course even if its commerce data has not changed.
+            item (tuple): Course ID, Course or None, seats and enrollment code, as yielded by `_iter_batches`.
+
+        Returns:
+            tuple: course ID, error message or None, the time spent publishing in seconds, and the hash
+                of the published data if the course was published, or None if it was left unchanged.
+        """
+        course_id, course, seats, enrollment_code = item
+        start = time.time()
+        published_hash = None
+
+        if course is None:
+            publishing_error = 'Course does not exist.'
         else:
-            logger.info("All %d courses successfully published.", total_courses)
+            previous_hash = course.published_hash
+            publishing_error = publisher.publish(
+                course, seats=seats, enrollment_code=enrollment_code, force=force
+            )
+            if not publishing_error and (force or course.published_hash != previous_hash):
+                published_hash = course.published_hash
+
+        return course_id, publishing_error, time.time() - start, published_hash
+
+    def _log_summary(self, latencies, unchanged, elapsed):
+        """ Log the publishing throughput, the latency percentiles and the calls saved by unchanged courses. """
+        logger.info(
+            "Published %d courses in %.2f seconds (%.2f courses per second).",
+            len(latencies), elapsed, len(latencies) / elapsed if elapsed else 0
+        )
+
+        if not latencies:
+            logger.info("%d courses were unchanged and not published.", unchanged)
+            return
+
+        latencies = sorted(latencies)
+        logger.info(
+            "Publishing latency: mean %.0f ms, median %.0f ms, 95th percentile %.0f ms, max %.0f ms.",
+            1000 * sum(latencies) / len(latencies),
+            1000 * latencies[len(latencies) // 2],
+            1000 * latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)],
+            1000 * latencies[-1]
+        )
+        logger.info(
+            "%d courses were unchanged and not published, saving about %.2f seconds of LMS calls.",
+            unchanged, unchanged * sum(latencies) / len(latencies)
+        )
+
+
+class _NoCheckpoint(object):
+    """ Context manager standing in for the checkpoint file when none is used. """
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
@@ -0,0 +1,190 @@
+""" This command fills the caches of the data retrieved from the LMS and the Course Catalog Service. """
+from __future__ import unicode_literals
+import datetime
+import logging
+from multiprocessing.pool import ThreadPool
+from optparse import make_option
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Count
+from django.utils import timezone
+from oscar.core.loading import get_class, get_model
+from oscar.test.utils import RequestFactory
+from threadlocals.threadlocals import get_current_request, set_thread_variable
+
+from ecommerce.core.models import SiteConfiguration
+from ecommerce.courses.utils import get_courses_info_from_lms
+from ecommerce.extensions.api.v2.views.vouchers import VoucherViewSet
+
+
+logger = logging.getLogger(__name__)
+Line = get_model('order', 'Line')
+Selector = get_class('partner.strategy', 'Selector')
+Voucher = get_model('voucher', 'Voucher')
+
+
+class Command(BaseCommand):
+    """Warm the caches of the course information, catalog query results and voucher offers."""
+
+    help = 'Fill the caches of the courses purchased most recently and of the active dynamic coupons.'
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--days',
+            action='store',
+            dest='days',
+            type='int',
+            default=30,
+            help='Number of days of orders the most purchased courses are read from.'
+        ),
+        make_option(
+            '--courses',
+            action='store',
+            dest='courses',
+            type='int',
+            default=100,
+            help='Maximum number of most purchased courses warmed per site.'
+        ),
+        make_option(
+            '--workers',
+            action='store',
+            dest='workers',
+            type='int',
+            default=4,
+            help='Number of courses and vouchers warmed concurrently.'
+        ),
+    )
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        if workers < 1:
+            raise CommandError('The number of workers must be a positive integer.')
+
+        since = timezone.now() - datetime.timedelta(days=options['days'])
+        start = time.time()
+        warmed = {'course_info': 0, 'catalog_query': 0, 'voucher_offers': 0}
+        failed = 0
+
+        for site_configuration in SiteConfiguration.objects.select_related('site', 'partner'):
+            request = self._install_request(site_configuration.site)
+            warmed_courses, failed_courses = self._warm_courses(
+                site_configuration.partner, since, options['courses'], workers
+            )
+            warmed['course_info'] += warmed_courses
+            failed += failed_courses
+
+            vouchers = self._get_dynamic_coupon_vouchers(site_configuration.partner)
+            if workers > 1 and len(vouchers) > 1:
+                # Worker threads do not share the thread local storage the request is read from.
+                pool = ThreadPool(
+                    min(workers, len(vouchers)), initializer=set_thread_variable, initargs=('request', request)
+                )
+                try:
+                    results = pool.map(self._warm_voucher_in_thread, vouchers)
+                finally:
+                    pool.close()
+                    pool.join()
+            else:
+                results = [self._warm_voucher(voucher) for voucher in vouchers]
+
+            for catalog_query_keys in results:
+                if catalog_query_keys is None:
+                    failed += 1
+                else:
+                    warmed['catalog_query'] += catalog_query_keys
+                    warmed['voucher_offers'] += 1
+
+        logger.info(
+            'Warmed [%d] course info, [%d] catalog query and [%d] voucher offers cache keys in [%.2f] seconds.',
+            warmed['course_info'], warmed['catalog_query'], warmed['voucher_offers'], time.time() - start
+        )
+        if failed:
+            logger.error('Failed to warm the caches of [%d] courses and vouchers.', failed)
+
+    def _install_request(self, site):
+        """
+        Install a request for the site in the thread local storage.
+
+        The URLs of the LMS and the Course Catalog Service are resolved from the site of the current
+        request, and the voucher offers are computed with the pricing strategy of the request.
+
+        Arguments:
+            site (Site): The site to set.
+
+        Returns:
+            HttpRequest: The request installed.
+        """
+        request = RequestFactory()
+        request.site = site
+        request.user = AnonymousUser()
+        request.strategy = Selector().strategy(request=request)
+        set_thread_variable('request', request)
+        return request
+
+    def _warm_courses(self, partner, since, limit, workers):
+        """
+        Warm the course information of the courses of the partner purchased most since the given date.
+
+        Returns:
+            tuple: Number of courses whose information was warmed, and number of courses which failed.
+        """
+        purchases = Line.objects.filter(
+            partner=partner, order__date_placed__gte=since, product__course__isnull=False
+        ).values('product__course_id').annotate(purchases=Count('id')).order_by('-purchases')[:limit]
+        course_ids = [purchase['product__course_id'] for purchase in purchases]
+        if not course_ids:
+            return 0, 0
+
+        courses = get_courses_info_from_lms(course_ids, max_workers=workers)
+        return len(courses), len(course_ids) - len(courses)
+
+    def _get_dynamic_coupon_vouchers(self, partner):
+        """
+        Retrieve one active voucher of every catalog query of the partner's dynamic coupons.
+
+        The offers of catalog query vouchers are cached per query, so warming the offers of one
+        voucher warms them for all the vouchers sharing its query.
+
+        Returns:
+            list: The vouchers.
+        """
+        now = timezone.now()
+        vouchers = Voucher.objects.filter(
+            start_datetime__lte=now,
+            end_datetime__gte=now,
+            coupon_vouchers__coupon__stockrecords__partner=partner,
+            offers__benefit__range__catalog_query__isnull=False,
+        ).exclude(
+            offers__benefit__range__catalog_query=''
+        ).values_list('id', 'offers__benefit__range__catalog_query').order_by('id')
+
+        voucher_ids = {}
+        for voucher_id, catalog_query in vouchers:
+            voucher_ids.setdefault(catalog_query, voucher_id)
+        return list(Voucher.objects.filter(id__in=voucher_ids.values()).order_by('id'))
+
+    def _warm_voucher(self, voucher):
+        """
+        Warm the catalog query results and the offers of a voucher.
+
+        Returns:
+            int: Number of catalog query cache keys warmed, or None if the caches could not be warmed.
+        """
+        try:
+            products = voucher.offers.first().benefit.range.all_products()
+            if products:
+                VoucherViewSet().get_cached_offers(products, voucher=voucher, request=get_current_request())
+            # The result of the catalog query is cached per course run.
+            return len(set(product.course_id for product in products if product.course_id))
+        except Exception:  # pylint: disable=broad-except
+            logger.exception('Failed to warm the caches of voucher [%s].', voucher.code)
+            return None
+
+    def _warm_voucher_in_thread(self, voucher):
+        """ Warm the caches of a voucher from a worker thread, closing the database connections it opened. """
+        try:
+            return self._warm_voucher(voucher)
+        finally:
+            connections.close_all()
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_auto_20150803_1406'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='published_hash',
+            field=models.CharField(help_text='Hash of the commerce data last published to the LMS.', max_length=40, null=True, editable=False, blank=True),
+        ),
+        migrations.AddField(
+            model_name='historicalcourse',
+            name='published_hash',
+            field=models.CharField(help_text='Hash of the commerce data last published to the LMS.', max_length=40, null=True, editable=False, blank=True),
+        ),
+    ]
@@ -3,7 +3,8 @@ import logging
 
 from django.conf import settings
 from django.db import models, transaction
-from django.db.models import Q, Count
+from django.db.models import Count, Prefetch, Q
+from django.utils.functional import cached_property
 from django.utils.translation import ugettext_lazy as _
 from oscar.core.loading import get_model
 from simple_history.models import HistoricalRecords
@@ -15,17 +16,38 @@ from ecommerce.core.constants import (
     ENROLLMENT_CODE_SWITCH
 )
 from ecommerce.courses.publishers import LMSPublisher
-from ecommerce.extensions.catalogue.utils import generate_sku
+from ecommerce.extensions.catalogue.utils import generate_sku, initialize_product_attributes
 
 logger = logging.getLogger(__name__)
 Category = get_model('catalogue', 'Category')
 Partner = get_model('partner', 'Partner')
 Product = get_model('catalogue', 'Product')
+ProductAttributeValue = get_model('catalogue', 'ProductAttributeValue')
 ProductCategory = get_model('catalogue', 'ProductCategory')
 ProductClass = get_model('catalogue', 'ProductClass')
 StockRecord = get_model('partner', 'StockRecord')
 
 
+class CourseQuerySet(models.QuerySet):
+    def with_seats(self):
+        """
+        Prefetch the parent seat of the courses, its seats, and their stock records and attribute values.
+
+        The seats and type of any number of courses are then read with a fixed number of queries.
+        """
+        parent_seats = Product.objects.filter(product_class__slug='seat', structure=Product.PARENT)
+        attribute_values = ProductAttributeValue.objects.select_related('attribute')
+
+        # Nested lookups are spelled out, as Django does not follow the nested prefetches of a queryset
+        # prefetched to an attribute.
+        return self.prefetch_related(
+            Prefetch('products', queryset=parent_seats, to_attr='_prefetched_parent_seats'),
+            '_prefetched_parent_seats__children',
+            '_prefetched_parent_seats__children__stockrecords',
+            Prefetch('_prefetched_parent_seats__children__attribute_values', queryset=attribute_values),
+        )
+
+
 class Course(models.Model):
     id = models.CharField(null=False, max_length=255, primary_key=True, verbose_name='ID')
     name = models.CharField(null=False, max_length=255)
@@ -36,6 +58,15 @@ class Course(models.Model):
     )
     history = HistoricalRecords()
     thumbnail_url = models.URLField(null=True, blank=True)
+    published_hash = models.CharField(
+        null=True,
+        blank=True,
+        editable=False,
+        max_length=40,
+        help_text=_('Hash of the commerce data last published to the LMS.')
+    )
+
+    objects = CourseQuerySet.as_manager()
 
     def __unicode__(self):
         return unicode(self.id)
@@ -62,10 +93,16 @@ class Course(models.Model):
     def save(self, force_insert=False, force_update=False, using=None, update_fields=None):
         super(Course, self).save(force_insert, force_update, using, update_fields)
         self._create_parent_seat()
+        self.clear_seat_cache()
+
+    def clear_seat_cache(self):
+        """ Forget the seats and type memoized on this instance, so that they are read again. """
+        for attr in ('_prefetched_parent_seats', 'seat_products', 'type'):
+            self.__dict__.pop(attr, None)
 
-    def publish_to_lms(self, access_token=None):
-        """ Publish Course and Products to LMS. """
-        return LMSPublisher().publish(self, access_token=access_token)
+    def publish_to_lms(self, access_token=None, force=False):
+        """ Publish Course and Products to LMS, unless they have not changed since they were last published. """
+        return LMSPublisher().publish(self, access_token=access_token, force=force)
 
     @classmethod
     def is_mode_verified(cls, mode):
@@ -84,7 +121,7 @@ class Course(models.Model):
 
         return mode
 
-    @property
+    @cached_property
     def type(self):
         """ Returns the type of the course (based on the available seat types). """
         seat_types = [getattr(seat.attr, 'certificate_type', '').lower() for seat in self.seat_products]
@@ -100,11 +137,28 @@ class Course(models.Model):
     @property
     def parent_seat_product(self):
         """ Returns the course seat parent Product. """
-        return self.products.get(product_class__slug='seat', structure=Product.PARENT)
+        parent_seats = getattr(self, '_prefetched_parent_seats', None)
+        if parent_seats is None:
+            return self.products.get(product_class__slug='seat', structure=Product.PARENT)
 
-    @property
+        if not parent_seats:
+            raise Product.DoesNotExist
+        return parent_seats[0]
+
+    @cached_property
     def seat_products(self):
-        """ Returns a queryset of course seat Products related to this course. """
+        """
+        Returns a queryset of course seat Products related to this course.
+
+        The queryset is memoized on the course. When the course was retrieved with
+        `Course.objects.with_seats()`, the seats, their stock records and attributes are
+        already loaded.
+        """
+        if getattr(self, '_prefetched_parent_seats', None):
+            seats = self.parent_seat_product.children.all()
+            initialize_product_attributes(seats)
+            return seats
+
         return self.parent_seat_product.children.all().prefetch_related('stockrecords')
 
     def get_course_seat_name(self, certificate_type, id_verification_required):
@@ -154,29 +208,18 @@ class Course(models.Model):
         course_id = unicode(self.id)
 
         if certificate_type == self.certificate_type_for_mode('audit'):
-            # Yields a match if attribute names do not include 'certificate_type'.
-            certificate_type_query = ~Q(attributes__name='certificate_type')
+            # Yields a match if the seat does not have a certificate type.
+            certificate_type_query = Q(seat_attributes__certificate_type__isnull=True)
         else:
-            # Yields a match if attribute with name 'certificate_type' matches provided value.
-            certificate_type_query = Q(
-                attributes__name='certificate_type',
-                attribute_values__value_text=certificate_type
-            )
+            certificate_type_query = Q(seat_attributes__certificate_type=certificate_type)
 
-        id_verification_required_query = Q(
-            attributes__name='id_verification_required',
-            attribute_values__value_boolean=id_verification_required
-        )
+        id_verification_required_query = Q(seat_attributes__id_verification_required=id_verification_required)
 
         if credit_provider is None:
-            # Yields a match if attribute names do not include 'credit_provider'.
-            credit_provider_query = ~Q(attributes__name='credit_provider')
+            # Yields a match if the seat does not have a credit provider.
+            credit_provider_query = Q(seat_attributes__credit_provider__isnull=True)
         else:
-            # Yields a match if attribute with name 'credit_provider' matches provided value.
-            credit_provider_query = Q(
-                attributes__name='credit_provider',
-                attribute_values__value_text=credit_provider
-            )
+            credit_provider_query = Q(seat_attributes__credit_provider=credit_provider)
 
         seats = self.seat_products.filter(certificate_type_query)
         try:
@@ -247,8 +290,7 @@ class Course(models.Model):
 
         if remove_stale_modes and self.certificate_type_for_mode(certificate_type) == 'professional':
             id_verification_required_query = Q(
-                attributes__name='id_verification_required',
-                attribute_values__value_boolean=not id_verification_required
+                seat_attributes__id_verification_required=not id_verification_required
             )
 
             # Delete seats with a different verification requirement, assuming the seats
@@ -258,6 +300,7 @@ class Course(models.Model):
                 orders=0
             ).delete()
 
+        self.clear_seat_cache()
         return seat
 
     @property
@@ -1,4 +1,5 @@
 from __future__ import unicode_literals
+import hashlib
 import json
 import logging
 
@@ -21,6 +22,17 @@ StockRecord = get_model('partner', 'StockRecord')
 class LMSPublisher(object):
     timeout = settings.COMMERCE_API_TIMEOUT
 
+    def __init__(self, session=None, record_hashes=True):
+        """
+        Keyword Arguments:
+            session (requests.Session): Session used to publish commerce data, so that connections can be
+                reused across courses. Defaults to a new connection per course.
+            record_hashes (bool): Whether to save the hash of the published data to the database. When False,
+                the hash is only set on the course, and the caller is responsible for saving it.
+        """
+        self.session = session or requests
+        self.record_hashes = record_hashes
+
     def get_seat_expiration(self, seat):
         if not seat.expires or 'professional' in getattr(seat.attr, 'certificate_type', ''):
             return None
@@ -32,13 +44,19 @@ class LMSPublisher(object):
 
     def serialize_seat_for_commerce_api(self, seat):
         """ Serializes a course seat product to a dict that can be further serialized to JSON. """
-        stock_record = seat.stockrecords.first()
-
-        bulk_sku = None
+        enrollment_code = None
         if getattr(seat.attr, 'certificate_type', '') in ENROLLMENT_CODE_SEAT_TYPES:
             enrollment_code = seat.course.enrollment_code_product
-            if enrollment_code:
-                bulk_sku = enrollment_code.stockrecords.first().partner_sku
+
+        return self._serialize_seat(seat, enrollment_code)
+
+    def _serialize_seat(self, seat, enrollment_code):
+        """ Serializes a course seat product, using the stock records prefetched on the seat and enrollment code. """
+        stock_record = seat.stockrecords.all()[0]
+
+        bulk_sku = None
+        if enrollment_code and getattr(seat.attr, 'certificate_type', '') in ENROLLMENT_CODE_SEAT_TYPES:
+            bulk_sku = enrollment_code.stockrecords.all()[0].partner_sku
 
         return {
             'name': mode_for_seat(seat),
@@ -65,7 +83,12 @@ class LMSPublisher(object):
 
         api.courses(course_id).put(data)
 
-    def publish(self, course, access_token=None):
+    def get_publication_hash(self, url, data):
+        """ Returns a stable hash of the commerce data published to the given Commerce API URL. """
+        content = json.dumps({'url': url, 'data': data}, sort_keys=True)
+        return hashlib.sha1(content).hexdigest()
+
+    def publish(self, course, access_token=None, seats=None, enrollment_code=None, force=False):
         """ Publish course commerce data to LMS.
 
         Uses the Commerce API to publish course modes, prices, and SKUs to LMS. Uses
@@ -76,6 +99,10 @@ class LMSPublisher(object):
 
         Keyword Arguments:
             access_token (str): Access token used when publishing CreditCourse data to the LMS.
+            seats (list): Seats of the course, with their stock records and attributes prefetched.
+                Defaults to the seat products of the course.
+            enrollment_code (Product): Enrollment code product of the course, if any. Only used along with seats.
+            force (bool): Publish the course even if its commerce data has not changed since it was last published.
 
         Returns:
             None, if publish operation succeeded; otherwise, error message.
@@ -93,7 +120,24 @@ class LMSPublisher(object):
 
         name = course.name
         verification_deadline = self.get_course_verification_deadline(course)
-        modes = [self.serialize_seat_for_commerce_api(seat) for seat in course.seat_products]
+        if seats is None:
+            modes = [self.serialize_seat_for_commerce_api(seat) for seat in course.seat_products]
+        else:
+            modes = [self._serialize_seat(seat, enrollment_code) for seat in seats]
+
+        data = {
+            'id': course_id,
+            'name': name,
+            'verification_deadline': verification_deadline,
+            'modes': modes,
+        }
+
+        url = '{}/courses/{}/'.format(commerce_api_url.rstrip('/'), course_id)
+
+        publication_hash = self.get_publication_hash(url, data)
+        if not force and publication_hash == course.published_hash:
+            logger.info(u'Commerce data for [%s] has not changed since it was last published.', course_id)
+            return
 
         has_credit = 'credit' in [mode['name'] for mode in modes]
         if has_credit:
@@ -115,25 +159,17 @@ class LMSPublisher(object):
                 logger.exception(u'Failed to publish CreditCourse for [%s] to LMS.', course_id)
                 return error_message
 
-        data = {
-            'id': course_id,
-            'name': name,
-            'verification_deadline': verification_deadline,
-            'modes': modes,
-        }
-
-        url = '{}/courses/{}/'.format(commerce_api_url.rstrip('/'), course_id)
-
         headers = {
             'Content-Type': 'application/json',
             'X-Edx-Api-Key': settings.EDX_API_KEY
         }
 
         try:
-            response = requests.put(url, data=json.dumps(data), headers=headers, timeout=self.timeout)
+            response = self.session.put(url, data=json.dumps(data), headers=headers, timeout=self.timeout)
             status_code = response.status_code
             if status_code in (200, 201):
                 logger.info(u'Successfully published commerce data for [%s].', course_id)
+                self._record_publication(course, publication_hash)
                 return
             else:
                 logger.error(u'Failed to publish commerce data for [%s] to LMS. Status was [%d]. Body was [%s].',
@@ -146,6 +182,14 @@ class LMSPublisher(object):
 
         return error_message
 
+    def _record_publication(self, course, publication_hash):
+        """ Set the hash of the data last published for the course, saving it unless told otherwise. """
+        course.published_hash = publication_hash
+
+        if self.record_hashes:
+            # The course is not saved, so that no history is recorded and its seats are left alone.
+            type(course).objects.filter(id=course.id).update(published_hash=publication_hash)
+
     def _parse_error(self, response, default_error_message):
         """When validation errors occur during publication, the LMS is expected
          to return an error message.
@@ -0,0 +1,14 @@
+""" Celery tasks of the courses app. """
+from celery import shared_task
+from django.core.management import call_command
+
+
+@shared_task(ignore_result=True)
+def warm_caches(days=30, courses=100, workers=4):
+    """
+    Fill the caches of the courses purchased most recently and of the active dynamic coupons.
+
+    This task is optional: it is only run by workers that add this module to CELERY_IMPORTS, for
+    example on a schedule or after a deployment. See the warm_caches management command.
+    """
+    call_command('warm_caches', days=days, courses=courses, workers=workers)
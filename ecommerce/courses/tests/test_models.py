@@ -46,6 +46,46 @@ class CourseTests(CourseCatalogTestMixin, TestCase):
         # The property should return only the child seats.
         self.assertEqual(set(course.seat_products), set(seats))
 
+    def test_with_seats(self):
+        """ Verify the seats and type of any number of courses are read with a fixed number of queries. """
+        expected_types = {}
+        for __ in range(3):
+            course = CourseFactory()
+            course.create_or_update_seat('honor', False, 0, self.partner)
+            course.create_or_update_seat('verified', True, 50, self.partner)
+            expected_types[course.id] = 'verified'
+        expected_types[CourseFactory().id] = 'audit'
+
+        # Courses, parent seats, seats, stock records and attribute values
+        with self.assertNumQueries(5):
+            courses = list(Course.objects.with_seats())
+            for course in courses:
+                for seat in course.seat_products:
+                    self.assertEqual(seat.stockrecords.all()[0].partner_id, self.partner.id)
+                    self.assertIn(seat.attr.certificate_type, ('honor', 'verified'))
+
+        with self.assertNumQueries(0):
+            self.assertEqual({course.id: course.type for course in courses}, expected_types)
+
+        expected = set(Course.objects.get(id=courses[0].id).seat_products)
+        self.assertEqual(set(courses[0].seat_products), expected)
+
+    def test_seat_products_memoized(self):
+        """ Verify the seats are memoized, and read again once the seats of the course change. """
+        course = CourseFactory()
+        course.create_or_update_seat('honor', False, 0, self.partner)
+
+        seats = course.seat_products
+        self.assertEqual(len(seats), 1)
+        self.assertEqual(course.type, 'audit')
+        with self.assertNumQueries(0):
+            self.assertIs(course.seat_products, seats)
+            self.assertEqual(course.type, 'audit')
+
+        course.create_or_update_seat('verified', True, 50, self.partner)
+        self.assertEqual(len(course.seat_products), 2)
+        self.assertEqual(course.type, 'verified')
+
     @ddt.data(
         ('verified', True),
         ('credit', True),
@@ -277,7 +317,9 @@ class CourseTests(CourseCatalogTestMixin, TestCase):
         seat = course.create_or_update_seat('professional', True, 100, self.partner)
         self.assertEqual(course.type, 'professional')
 
+        # The type is memoized on the course, which only forgets it when its own seats are created or updated.
         seat.delete()
+        course.clear_seat_cache()
         self.assertEqual(course.type, 'verified')
         course.create_or_update_seat('no-id-professional', False, 100, self.partner)
         self.assertEqual(course.type, 'professional')
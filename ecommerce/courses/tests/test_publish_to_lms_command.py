@@ -2,17 +2,19 @@
 """Contains the tests for publish to lms command."""
 
 from __future__ import unicode_literals
+import json
 import logging
 import os
 import tempfile
 
 import ddt
 from django.core.management import call_command, CommandError
+import httpretty
 import mock
-from mock import call
 from testfixtures import LogCapture
 
-from ecommerce.courses.models import Course
+from ecommerce.core.url_utils import get_lms_commerce_api_url
+from ecommerce.courses.publishers import LMSPublisher
 from ecommerce.courses.tests.factories import CourseFactory
 from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
 from ecommerce.tests.testcases import TransactionTestCase
@@ -27,6 +29,7 @@ class PublishCoursesToLMSTests(CourseCatalogTestMixin, TransactionTestCase):
     """Tests the course publish command."""
 
     tmp_file_path = os.path.join(tempfile.gettempdir(), "tmp-testfile.txt")
+    checkpoint_file_path = os.path.join(tempfile.gettempdir(), "tmp-checkpoint.txt")
 
     def setUp(self):
         super(PublishCoursesToLMSTests, self).setUp()
@@ -35,8 +38,9 @@ class PublishCoursesToLMSTests(CourseCatalogTestMixin, TransactionTestCase):
 
     @classmethod
     def tearDownClass(cls):
-        if os.path.exists(cls.tmp_file_path):
-            os.remove(cls.tmp_file_path)
+        for file_path in (cls.tmp_file_path, cls.checkpoint_file_path):
+            if os.path.exists(file_path):
+                os.remove(file_path)
 
     def create_course_ids_file(self, file_path, course_ids):
         """Write the course_ids list to the temp file."""
@@ -44,6 +48,20 @@ class PublishCoursesToLMSTests(CourseCatalogTestMixin, TransactionTestCase):
         with open(file_path, 'w') as temp_file:
             temp_file.write("\n".join(course_ids))
 
+    def assert_publish_logged(self, log_capture, expected):
+        """ Verify the expected messages were logged, followed by the publishing summary. """
+        actual = list(log_capture.actual())
+        self.assertEqual(tuple(actual[:len(expected)]), expected)
+        self.assertTrue(actual[len(expected)][2].startswith('Published '))
+
+    def mock_lms(self, courses):
+        """ Stub the Commerce API of the LMS for the given courses. """
+        self.assertTrue(httpretty.is_enabled(), 'httpretty must be enabled to mock Commerce API calls.')
+
+        for course in courses:
+            url = '{}/courses/{}/'.format(get_lms_commerce_api_url().rstrip('/'), course.id)
+            httpretty.register_uri(httpretty.PUT, url, status=200, body='{}', content_type='application/json')
+
     @ddt.data("", "fake/path")
     def test_invalid_file_path(self, course_ids_file):
         """ Verify command raises the CommandError for invalid file path. """
@@ -75,7 +93,7 @@ class PublishCoursesToLMSTests(CourseCatalogTestMixin, TransactionTestCase):
         )
         with LogCapture(LOGGER_NAME) as lc:
             call_command('publish_to_lms', course_ids_file=self.tmp_file_path)
-            lc.check(*expected)
+            self.assert_publish_logged(lc, expected)
 
     def test_course_publish_successfully(self):
         """ Verify all courses are successfully published."""
@@ -103,13 +121,13 @@ class PublishCoursesToLMSTests(CourseCatalogTestMixin, TransactionTestCase):
                 "All 2 courses successfully published."
             )
         )
-        with mock.patch.object(Course, 'publish_to_lms', autospec=True) as mock_publish:
+        with mock.patch.object(LMSPublisher, 'publish', autospec=True) as mock_publish:
             mock_publish.return_value = None
             with LogCapture(LOGGER_NAME) as lc:
                 call_command('publish_to_lms', course_ids_file=self.tmp_file_path)
-                lc.check(*expected)
+                self.assert_publish_logged(lc, expected)
         # Check that the mocked function was called twice.
-        self.assertListEqual(mock_publish.call_args_list, [call(self.course), call(second_course)])
+        self.assertListEqual([args[1] for args, __ in mock_publish.call_args_list], [self.course, second_course])
 
     def test_course_publish_failed(self):
         """ Verify failed courses are logged."""
@@ -132,12 +150,12 @@ class PublishCoursesToLMSTests(CourseCatalogTestMixin, TransactionTestCase):
                 "Completed publishing courses. 1 of 1 failed."
             )
         )
-        with mock.patch.object(Course, 'publish_to_lms') as mock_publish:
+        with mock.patch.object(LMSPublisher, 'publish') as mock_publish:
             mock_publish.return_value = error_msg
             with LogCapture(LOGGER_NAME) as lc:
                 call_command('publish_to_lms', course_ids_file=self.tmp_file_path)
-                lc.check(*expected)
-            mock_publish.assert_called_once_with()
+                self.assert_publish_logged(lc, expected)
+            mock_publish.assert_called_once_with(self.course, seats=[], enrollment_code=None, force=False)
 
     def test_unicode_file_name(self):
         """ Verify the unicode files name are read correctly."""
@@ -160,11 +178,74 @@ class PublishCoursesToLMSTests(CourseCatalogTestMixin, TransactionTestCase):
                 "All 1 courses successfully published."
             )
         )
-        with mock.patch.object(Course, 'publish_to_lms') as mock_publish:
+        with mock.patch.object(LMSPublisher, 'publish') as mock_publish:
             mock_publish.return_value = None
             with LogCapture(LOGGER_NAME) as lc:
                 call_command('publish_to_lms', course_ids_file=unicode_file)
-                lc.check(*expected)
+                self.assert_publish_logged(lc, expected)
 
-        mock_publish.assert_called_once_with()
+        mock_publish.assert_called_once_with(self.course, seats=[], enrollment_code=None, force=False)
         os.remove(unicode_file)
+
+    @httpretty.activate
+    def test_concurrent_publish(self):
+        """ Verify courses are published concurrently, with their seats retrieved in bulk. """
+        courses = [self.course] + CourseFactory.create_batch(3)
+        for course in courses:
+            course.create_or_update_seat('honor', False, 0, self.partner)
+            course.create_or_update_seat('audit', False, 0, self.partner)
+        self.create_course_ids_file(self.tmp_file_path, [course.id for course in courses])
+        self.mock_lms(courses)
+
+        # The courses and their products are retrieved in bulk, and the hash of each published course saved.
+        with self.assertNumQueries(4 + 2 * len(courses)):
+            call_command('publish_to_lms', course_ids_file=self.tmp_file_path, workers=2)
+
+        published = {}
+        for request in httpretty.httpretty.latest_requests:
+            data = json.loads(request.body)
+            published[data['id']] = sorted(mode['name'] for mode in data['modes'])
+        self.assertEqual(published, {course.id: ['audit', 'honor'] for course in courses})
+
+    @httpretty.activate
+    def test_resume_from_checkpoint(self):
+        """ Verify courses recorded in the checkpoint file are skipped, and published courses are recorded. """
+        second_course = CourseFactory()
+        self.create_course_ids_file(self.tmp_file_path, [self.course.id, second_course.id])
+        self.create_course_ids_file(self.checkpoint_file_path, [self.course.id, ''])
+        self.mock_lms([self.course, second_course])
+
+        with LogCapture(LOGGER_NAME) as lc:
+            call_command(
+                'publish_to_lms', course_ids_file=self.tmp_file_path, checkpoint_file=self.checkpoint_file_path
+            )
+            self.assertEqual(lc.records[0].getMessage(), 'Skipping 1 courses already published.')
+
+        requested_paths = [request.path for request in httpretty.httpretty.latest_requests]
+        self.assertEqual(len(requested_paths), 1)
+        self.assertIn(second_course.id, requested_paths[0])
+
+        with open(self.checkpoint_file_path) as checkpoint:
+            self.assertEqual(checkpoint.read().split(), [self.course.id, second_course.id])
+
+    @httpretty.activate
+    def test_unchanged_courses_not_published(self):
+        """ Verify courses whose commerce data has not changed are only published again when forced. """
+        self.course.create_or_update_seat('verified', True, 50, self.partner)
+        self.mock_lms([self.course])
+
+        call_command('publish_to_lms', course_ids_file=self.tmp_file_path)
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 1)
+
+        with LogCapture(LOGGER_NAME) as lc:
+            call_command('publish_to_lms', course_ids_file=self.tmp_file_path)
+            self.assertEqual(lc.records[-1].getMessage(), '1 courses were unchanged and not published.')
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 1)
+
+        call_command('publish_to_lms', course_ids_file=self.tmp_file_path, force=True)
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 2)
+
+    def test_invalid_workers(self):
+        """ Verify command raises the CommandError for a non-positive number of workers. """
+        with self.assertRaises(CommandError):
+            call_command('publish_to_lms', course_ids_file=self.tmp_file_path, workers=0)
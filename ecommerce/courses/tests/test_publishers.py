@@ -12,6 +12,7 @@ from testfixtures import LogCapture
 from ecommerce.core.constants import ENROLLMENT_CODE_PRODUCT_CLASS_NAME, ENROLLMENT_CODE_SWITCH
 from ecommerce.core.url_utils import get_lms_url, get_lms_commerce_api_url
 from ecommerce.core.tests import toggle_switch
+from ecommerce.courses.models import Course
 from ecommerce.courses.publishers import LMSPublisher
 from ecommerce.courses.tests.factories import CourseFactory
 from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
@@ -139,6 +140,35 @@ class LMSPublisherTests(CourseCatalogTestMixin, TestCase):
         }
         self.assertDictEqual(actual, expected)
 
+    @httpretty.activate
+    def test_unchanged_data_not_published(self):
+        """ Verify commerce data identical to the data last published is only published again when forced. """
+        self._mock_commerce_api(200)
+        course = Course.objects.get(id=self.course.id)
+        self.assertIsNone(self.publisher.publish(course))
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 1)
+
+        published_hash = course.published_hash
+        self.assertIsNotNone(published_hash)
+        course = Course.objects.get(id=self.course.id)
+        self.assertEqual(course.published_hash, published_hash)
+
+        with LogCapture(LOGGER_NAME) as l:
+            self.assertIsNone(self.publisher.publish(course))
+            l.check((
+                LOGGER_NAME, 'INFO',
+                'Commerce data for [{}] has not changed since it was last published.'.format(self.course.id)
+            ))
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 1)
+
+        self.assertIsNone(self.publisher.publish(course, force=True))
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 2)
+
+        # Changes to the commerce data are published.
+        course.name = 'Updated name'
+        self.assertIsNone(self.publisher.publish(course))
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 3)
+
     def test_serialize_seat_for_commerce_api(self):
         """ The method should convert a seat to a JSON-serializable dict consumable by the Commerce API. """
         # Grab the verified seat
@@ -2,24 +2,37 @@ import hashlib
 
 import ddt
 import httpretty
+import mock
 
 from django.core.cache import cache
+from requests.exceptions import ConnectionError
 
+from ecommerce.core.cache_utils import cache_values
 from ecommerce.core.constants import ENROLLMENT_CODE_SWITCH
 from ecommerce.core.tests import toggle_switch
 from ecommerce.core.url_utils import get_lms_url
 from ecommerce.courses.models import Course
 from ecommerce.courses.tests.factories import CourseFactory
 from ecommerce.courses.utils import (
-    get_certificate_type_display_value, get_course_info_from_lms, mode_for_seat
+    get_certificate_type_display_value, get_course_info_from_lms, get_courses_info_from_lms, mode_for_seat
 )
 from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
 from ecommerce.tests.testcases import TestCase
 
 
+def get_course_info_cache_key(course_key):
+    return hashlib.md5('courses_api_detail_{}'.format(course_key)).hexdigest()
+
+
 @httpretty.activate
 @ddt.ddt
 class UtilsTests(CourseCatalogTestMixin, TestCase):
+    def setUp(self):
+        super(UtilsTests, self).setUp()
+        # Course information is cached, and the cache may be full of the values of other tests.
+        cache.clear()
+        self.addCleanup(cache.clear)
+
     @ddt.unpack
     @ddt.data(
         ('', False, 'audit'),
@@ -58,6 +71,34 @@ class UtilsTests(CourseCatalogTestMixin, TestCase):
         cached_course = cache.get(cache_hash)
         self.assertEqual(cached_course, response)
 
+    def test_get_courses_info_from_lms(self):
+        """ Verify only the courses missing from the cache are retrieved, and that they and failures are cached. """
+        cached_course, missing_course, failing_course = CourseFactory(), CourseFactory(), CourseFactory()
+        cache_values({get_course_info_cache_key(cached_course.id): {'name': 'cached'}}, 60)
+        retrieved = []
+
+        def get_course(course_key):
+            retrieved.append(course_key)
+            if course_key == failing_course.id:
+                raise ConnectionError
+            return {'name': 'retrieved'}
+
+        client = mock.Mock()
+        client.courses.side_effect = lambda course_key: mock.Mock(get=lambda: get_course(course_key))
+
+        course_keys = [cached_course.id, missing_course.id, failing_course.id, missing_course.id]
+        expected = {cached_course.id: {'name': 'cached'}, missing_course.id: {'name': 'retrieved'}}
+        with mock.patch('ecommerce.courses.utils.EdxRestApiClient', mock.Mock(return_value=client)):
+            self.assertEqual(get_courses_info_from_lms(course_keys), expected)
+            self.assertEqual(sorted(retrieved), sorted([missing_course.id, failing_course.id]))
+            self.assertEqual(cache.get(get_course_info_cache_key(missing_course.id)), {'name': 'retrieved'})
+            self.assertIsInstance(
+                cache.get('{}:error'.format(get_course_info_cache_key(failing_course.id))), ConnectionError
+            )
+
+            self.assertEqual(get_courses_info_from_lms(course_keys), expected)
+            self.assertEqual(len(retrieved), 2)
+
     @ddt.data(
         ('honor', 'Honor'),
         ('verified', 'Verified'),
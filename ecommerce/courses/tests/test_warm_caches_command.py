@@ -0,0 +1,121 @@
+"""Contains the tests for the warm caches command."""
+from __future__ import unicode_literals
+import datetime
+import hashlib
+
+from django.core.cache import cache
+from django.core.management import call_command, CommandError
+from django.utils import timezone
+import httpretty
+import mock
+from oscar.core.loading import get_model
+from oscar.test import factories
+from testfixtures import LogCapture
+
+from ecommerce.core.tests.decorators import mock_course_catalog_api_client
+from ecommerce.coupons.tests.mixins import CouponMixin, CourseCatalogMockMixin
+from ecommerce.core.url_utils import get_lms_url
+from ecommerce.courses.tasks import warm_caches
+from ecommerce.courses.utils import _get_course_info_cache_key
+from ecommerce.extensions.api.v2.views.vouchers import VoucherViewSet
+from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
+from ecommerce.tests.mixins import LmsApiMockMixin
+from ecommerce.tests.testcases import TestCase
+
+LOGGER_NAME = 'ecommerce.courses.management.commands.warm_caches'
+Voucher = get_model('voucher', 'Voucher')
+
+
+@httpretty.activate
+@mock_course_catalog_api_client
+class WarmCachesCommandTests(CouponMixin, CourseCatalogMockMixin, CourseCatalogTestMixin, LmsApiMockMixin,
+                             TestCase):
+    """Tests the warm caches command."""
+
+    def setUp(self):
+        super(WarmCachesCommandTests, self).setUp()
+        self.course, self.seat = self.create_course_and_seat(partner=self.partner)
+
+    def mock_apis(self):
+        """ Stub the Course API of the LMS and the Course Catalog Service. """
+        self.mock_course_api_response(course=self.course)
+        self.mock_dynamic_catalog_course_runs_api(query='*:*', course_run=self.course)
+
+    def purchase_seat(self):
+        """ Place an order for the seat. """
+        basket = factories.create_basket(empty=True)
+        basket.add_product(self.seat)
+        return factories.create_order(basket=basket)
+
+    def create_dynamic_coupon(self):
+        """ Create an active coupon of the seats of the courses matching a catalog query. """
+        coupon = self.create_coupon(partner=self.partner, catalog_query='*:*', course_seat_types='verified')
+        Voucher.objects.update(end_datetime=timezone.now() + datetime.timedelta(days=1))
+        return coupon
+
+    def assert_warmed(self, course_info, catalog_query, voucher_offers):
+        """ Verify the command warmed the given number of cache keys. """
+        with LogCapture(LOGGER_NAME) as log_capture:
+            call_command('warm_caches', workers=1)
+
+        message = log_capture.records[0].getMessage()
+        self.assertTrue(message.startswith(
+            'Warmed [{}] course info, [{}] catalog query and [{}] voucher offers cache keys in'.format(
+                course_info, catalog_query, voucher_offers
+            )
+        ))
+
+    def test_warm_caches(self):
+        """ Verify the information of the purchased courses and the offers of the dynamic coupons are cached. """
+        self.mock_apis()
+        self.purchase_seat()
+        self.create_dynamic_coupon()
+
+        self.assert_warmed(course_info=1, catalog_query=1, voucher_offers=1)
+        self.assertIsNotNone(cache.get(_get_course_info_cache_key(self.course.id)))
+        self.assertIsNotNone(cache.get(hashlib.md5('voucher_offers_*:*').hexdigest()))
+
+        # The offers of the coupon are now served from the cache.
+        voucher = Voucher.objects.first()
+        with mock.patch.object(VoucherViewSet, 'get_offers') as mock_get_offers:
+            response = self.client.get('/api/v2/vouchers/offers/?code={}'.format(voucher.code))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+        self.assertFalse(mock_get_offers.called)
+
+    def test_old_orders_and_inactive_coupons_skipped(self):
+        """ Verify courses purchased before the period and expired coupons are not warmed. """
+        self.mock_apis()
+        order = self.purchase_seat()
+        order.date_placed = timezone.now() - datetime.timedelta(days=31)
+        order.save()
+        self.create_dynamic_coupon()
+        Voucher.objects.update(end_datetime=timezone.now() - datetime.timedelta(days=1))
+
+        self.assert_warmed(course_info=0, catalog_query=0, voucher_offers=0)
+        self.assertEqual(httpretty.httpretty.latest_requests, [])
+
+    def test_failures_logged(self):
+        """ Verify courses whose information cannot be retrieved are logged, without stopping the command. """
+        self.purchase_seat()
+        httpretty.register_uri(
+            httpretty.GET, get_lms_url('api/courses/v1/courses/{}/'.format(self.course.id)), status=500
+        )
+
+        with LogCapture(LOGGER_NAME) as log_capture:
+            call_command('warm_caches', workers=1)
+
+        self.assertEqual(
+            log_capture.records[-1].getMessage(), 'Failed to warm the caches of [1] courses and vouchers.'
+        )
+
+    def test_invalid_workers(self):
+        """ Verify the number of workers must be positive. """
+        with self.assertRaises(CommandError):
+            call_command('warm_caches', workers=0)
+
+    def test_task(self):
+        """ Verify the task runs the command. """
+        with mock.patch('ecommerce.courses.tasks.call_command') as mock_call_command:
+            warm_caches(days=7)
+        mock_call_command.assert_called_once_with('warm_caches', days=7, courses=100, workers=4)
@@ -1,10 +1,12 @@
 import hashlib
+from multiprocessing.pool import ThreadPool
 
 from django.conf import settings
-from django.core.cache import cache
 from django.utils.translation import ugettext_lazy as _
 from edx_rest_api_client.client import EdxRestApiClient
+import requests
 
+from ecommerce.core.cache_utils import REMOTE_SERVICE_ERRORS, get_many_or_fetch, get_or_fetch
 from ecommerce.core.url_utils import get_lms_url
 
 
@@ -23,16 +25,71 @@ def mode_for_seat(product):
     return mode
 
 
+def _get_course_info_cache_key(course_key):
+    cache_key = 'courses_api_detail_{}'.format(course_key)
+    return hashlib.md5(cache_key).hexdigest()
+
+
 def get_course_info_from_lms(course_key):
     """ Get course information from LMS via the course api and cache """
     api = EdxRestApiClient(get_lms_url('api/courses/v1/'))
-    cache_key = 'courses_api_detail_{}'.format(course_key)
-    cache_hash = hashlib.md5(cache_key).hexdigest()
-    course = cache.get(cache_hash)
-    if not course:  # pragma: no cover
-        course = api.courses(course_key).get()
-        cache.set(cache_hash, course, settings.COURSES_API_CACHE_TIMEOUT)
-    return course
+    return get_or_fetch(
+        _get_course_info_cache_key(course_key),
+        api.courses(course_key).get,
+        settings.COURSES_API_CACHE_TIMEOUT,
+        'course_info'
+    )
+
+
+def get_courses_info_from_lms(course_keys, max_workers=None):
+    """
+    Get the information of several courses from LMS via the course api and cache.
+
+    The cached courses are read with a single cache lookup. The other courses are retrieved
+    concurrently, by up to max_workers threads sharing a pool of connections, and cached together.
+
+    Arguments:
+        course_keys (iterable): Keys of the courses.
+        max_workers (int): Maximum number of courses retrieved concurrently. Defaults to COURSES_API_MAX_WORKERS.
+
+    Returns:
+        dict: Map of the course keys, as strings, to the course information. Courses whose information
+            could not be retrieved from the course API are left out.
+    """
+    course_keys = set(unicode(course_key) for course_key in course_keys)
+    # The LMS URL is resolved from the current request, which is local to this thread.
+    api_url = get_lms_url('api/courses/v1/')
+
+    def fetch(missing_course_keys):
+        workers = min(max_workers or settings.COURSES_API_MAX_WORKERS, len(missing_course_keys))
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        api = EdxRestApiClient(api_url, session=session)
+
+        def get_course(course_key):
+            try:
+                return course_key, api.courses(course_key).get()
+            except REMOTE_SERVICE_ERRORS as error:
+                return course_key, error
+
+        if workers <= 1:
+            return dict(get_course(course_key) for course_key in missing_course_keys)
+
+        pool = ThreadPool(workers)
+        try:
+            return dict(pool.map(get_course, missing_course_keys))
+        finally:
+            pool.terminate()
+
+    courses, __ = get_many_or_fetch(
+        {_get_course_info_cache_key(course_key): course_key for course_key in course_keys},
+        fetch,
+        settings.COURSES_API_CACHE_TIMEOUT,
+        'course_info'
+    )
+    return courses
 
 
 def get_certificate_type_display_value(certificate_type):
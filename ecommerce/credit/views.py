@@ -33,7 +33,7 @@ class Checkout(TemplateView):
     def get_context_data(self, **kwargs):
         context = super(Checkout, self).get_context_data(**kwargs)
 
-        course = get_object_or_404(Course, id=kwargs.get('course_id'))
+        course = get_object_or_404(Course.objects.with_seats(), id=kwargs.get('course_id'))
         context['course'] = course
 
         deadline = self._check_credit_eligibility(self.request.user, kwargs.get('course_id'))
@@ -55,7 +55,8 @@ class Checkout(TemplateView):
                 continue
 
             purchase_info = strategy.fetch_for_product(seat)
-            if purchase_info.availability.is_available_to_buy and seat.stockrecords.filter(partner=partner).exists():
+            has_stock_record = any(stock_record.partner_id == partner.id for stock_record in seat.stockrecords.all())
+            if purchase_info.availability.is_available_to_buy and has_stock_record:
                 credit_seats.append(seat)
 
         if not credit_seats:
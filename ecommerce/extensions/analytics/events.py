@@ -0,0 +1,107 @@
+"""
+In-process pipeline delivering analytics events outside of the request/response cycle.
+
+Events are captured by the caller, pushed to a bounded queue, and handed to their analytics client
+in batches by a background thread, so that request latency does not depend on the analytics path.
+"""
+import logging
+import os
+import Queue
+import threading
+
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class EventPipeline(object):
+    """
+    Bounded queue of analytics events, delivered by a background thread.
+
+    When the queue is full, emitting an event waits up to ANALYTICS_EVENT_QUEUE_TIMEOUT seconds for room,
+    after which the event is dropped and counted as such. Events are delivered synchronously when
+    ANALYTICS_EVENT_QUEUE_SIZE is 0.
+    """
+
+    def __init__(self):
+        self.queue = None
+        self.thread = None
+        self.pid = None
+        self.lock = threading.Lock()
+        self.counts = {'enqueued': 0, 'delivered': 0, 'dropped': 0, 'failed': 0}
+
+    def _count(self, name):
+        with self.lock:
+            self.counts[name] += 1
+
+    def _ensure_started(self):
+        # Threads do not survive forks, so worker processes forked from a parent start their own.
+        if self.thread is not None and self.pid == os.getpid():
+            return
+
+        with self.lock:
+            if self.thread is None or self.pid != os.getpid():
+                self.queue = Queue.Queue(settings.ANALYTICS_EVENT_QUEUE_SIZE)
+                self.thread = threading.Thread(target=self._run, name='analytics-events')
+                self.thread.daemon = True
+                self.thread.start()
+                self.pid = os.getpid()
+
+    def track(self, client, *args, **kwargs):
+        """
+        Emit a call to `client.track` with the given arguments.
+
+        Arguments:
+            client (SegmentClient): Client the event is delivered to.
+
+        Returns:
+            bool: False if the event was dropped; otherwise, True.
+        """
+        if not settings.ANALYTICS_EVENT_QUEUE_SIZE:
+            client.track(*args, **kwargs)
+            return True
+
+        self._ensure_started()
+
+        try:
+            self.queue.put((client, args, kwargs), timeout=settings.ANALYTICS_EVENT_QUEUE_TIMEOUT)
+        except Queue.Full:
+            self._count('dropped')
+            logger.warning('Analytics event queue is full. [%d] events dropped so far.', self.counts['dropped'])
+            return False
+
+        self._count('enqueued')
+        return True
+
+    def flush(self):
+        """ Block until all queued events have been delivered. """
+        if self.queue is not None:
+            self.queue.join()
+
+    def _run(self):
+        batch_size = settings.ANALYTICS_EVENT_BATCH_SIZE
+
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except Queue.Empty:
+                    break
+
+            self._deliver(batch)
+
+    def _deliver(self, batch):
+        for client, args, kwargs in batch:
+            try:
+                client.track(*args, **kwargs)
+                self._count('delivered')
+            except Exception:  # pylint: disable=broad-except
+                self._count('failed')
+                logger.exception('Failed to deliver analytics event.')
+            finally:
+                self.queue.task_done()
+
+
+pipeline = EventPipeline()
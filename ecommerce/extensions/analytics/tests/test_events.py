@@ -0,0 +1,84 @@
+import threading
+
+from django.test import override_settings
+
+from ecommerce.extensions.analytics.events import EventPipeline
+from ecommerce.tests.testcases import TestCase
+
+
+class StubClient(object):
+    """ Analytics client recording the events it receives. Delivery is held until the client is released. """
+
+    def __init__(self, released=True, error=None):
+        self.events = []
+        self.error = error
+        self.receiving = threading.Event()
+        self.release = threading.Event()
+        if released:
+            self.release.set()
+
+    def track(self, *args, **kwargs):
+        self.receiving.set()
+        self.release.wait(5)
+        if self.error:
+            raise self.error
+        self.events.append((args, kwargs))
+
+
+@override_settings(ANALYTICS_EVENT_QUEUE_SIZE=10, ANALYTICS_EVENT_BATCH_SIZE=2, ANALYTICS_EVENT_QUEUE_TIMEOUT=0)
+class EventPipelineTests(TestCase):
+    """ Tests for the analytics event pipeline. """
+
+    def setUp(self):
+        super(EventPipelineTests, self).setUp()
+        self.pipeline = EventPipeline()
+
+    def test_background_delivery(self):
+        """ Verify events are delivered by the background thread, in the order they were emitted. """
+        client = StubClient(released=False)
+        for index in range(5):
+            self.assertTrue(self.pipeline.track(client, 'user', 'Event {}'.format(index), context={'index': index}))
+
+        # Nothing is delivered while the client is busy, but emitting events does not wait for it.
+        self.assertEqual(client.events, [])
+
+        client.release.set()
+        self.pipeline.flush()
+        self.assertEqual(
+            client.events,
+            [(('user', 'Event {}'.format(index)), {'context': {'index': index}}) for index in range(5)]
+        )
+        self.assertEqual(self.pipeline.counts, {'enqueued': 5, 'delivered': 5, 'dropped': 0, 'failed': 0})
+
+    @override_settings(ANALYTICS_EVENT_QUEUE_SIZE=1)
+    def test_full_queue(self):
+        """ Verify events are dropped, and counted, when the queue is full. """
+        client = StubClient(released=False)
+        self.assertTrue(self.pipeline.track(client, 'user', 'Delivering'))
+        client.receiving.wait(5)
+
+        self.assertTrue(self.pipeline.track(client, 'user', 'Queued'))
+        self.assertFalse(self.pipeline.track(client, 'user', 'Dropped'))
+
+        client.release.set()
+        self.pipeline.flush()
+        self.assertEqual([args[1] for args, __ in client.events], ['Delivering', 'Queued'])
+        self.assertEqual(self.pipeline.counts, {'enqueued': 2, 'delivered': 2, 'dropped': 1, 'failed': 0})
+
+    def test_failed_delivery(self):
+        """ Verify events the client fails to deliver are counted, and do not stop the pipeline. """
+        self.pipeline.track(StubClient(error=Exception('clunk')), 'user', 'Failed')
+        client = StubClient()
+        self.pipeline.track(client, 'user', 'Delivered')
+
+        self.pipeline.flush()
+        self.assertEqual(len(client.events), 1)
+        self.assertEqual(self.pipeline.counts, {'enqueued': 2, 'delivered': 1, 'dropped': 0, 'failed': 1})
+
+    @override_settings(ANALYTICS_EVENT_QUEUE_SIZE=0)
+    def test_synchronous_delivery(self):
+        """ Verify events are delivered right away when the queue is disabled. """
+        client = StubClient()
+        self.pipeline.track(client, 'user', 'Event')
+        self.assertEqual(client.events, [(('user', 'Event'), {})])
+        self.assertIsNone(self.pipeline.thread)
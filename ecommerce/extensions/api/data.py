@@ -3,25 +3,33 @@ import logging
 
 from oscar.core.loading import get_model, get_class
 
-from ecommerce.extensions.api import exceptions
 from ecommerce.extensions.api.constants import APIConstants as AC
 
 NoShippingRequired = get_class('shipping.methods', 'NoShippingRequired')
 OrderTotalCalculator = get_class('checkout.calculators', 'OrderTotalCalculator')
-Product = get_model('catalogue', 'Product')
+StockRecord = get_model('partner', 'StockRecord')
 
 
 logger = logging.getLogger(__name__)
 
 
-def get_product(sku):
-    """Retrieve the product corresponding to the provided SKU."""
-    try:
-        return Product.objects.get(stockrecords__partner_sku=sku)
-    except Product.DoesNotExist:
-        raise exceptions.ProductNotFoundError(
-            exceptions.PRODUCT_NOT_FOUND_DEVELOPER_MESSAGE.format(sku=sku)
-        )
+def get_stock_records(skus):
+    """
+    Retrieve the stock records corresponding to the provided SKUs, with their products, in one query.
+
+    The products are selected with their parent and product classes, so that the strategy of a basket
+    can tell whether they are available without further queries.
+
+    Arguments:
+        skus (list): The SKUs.
+
+    Returns:
+        dict: Map of the SKUs found to their stock record.
+    """
+    stock_records = StockRecord.objects.filter(partner_sku__in=skus).select_related(
+        'partner', 'product__product_class', 'product__parent__product_class'
+    )
+    return {stock_record.partner_sku: stock_record for stock_record in stock_records}
 
 
 def get_order_metadata(basket):
@@ -7,3 +7,24 @@ class PageNumberPagination(pagination.PageNumberPagination):
     # NOTE (CCB): This is a hack, necessary until the frontend
     # can properly follow our paginated lists.
     max_page_size = 10000
+
+
+class CursorPagination(pagination.CursorPagination):
+    """
+    Cursor pagination ordered by primary key, whose page size can be set like PageNumberPagination's.
+
+    Pages are read with a range query on the primary key, so deep pages are as fast as the first one.
+    """
+    ordering = 'pk'
+    page_size_query_param = 'page_size'
+    max_page_size = PageNumberPagination.max_page_size
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
@@ -6,6 +6,8 @@ import logging
 
 from dateutil.parser import parse
 from django.db import transaction
+from django.db.models import F, Prefetch
+from django.db.models.query import prefetch_related_objects
 from django.utils.translation import ugettext_lazy as _
 from django.contrib.auth import get_user_model
 from oscar.core.loading import get_model, get_class
@@ -18,6 +20,7 @@ from ecommerce.core.models import Site, SiteConfiguration
 from ecommerce.core.url_utils import get_ecommerce_url
 from ecommerce.courses.models import Course
 from ecommerce.coupons.utils import get_seats_from_query
+from ecommerce.extensions.catalogue.utils import initialize_product_attributes
 from ecommerce.invoice.models import Invoice
 
 logger = logging.getLogger(__name__)
@@ -27,6 +30,8 @@ Benefit = get_model('offer', 'Benefit')
 BillingAddress = get_model('order', 'BillingAddress')
 Catalog = get_model('catalogue', 'Catalog')
 Category = get_model('catalogue', 'Category')
+ConditionalOffer = get_model('offer', 'ConditionalOffer')
+CouponVouchers = get_model('voucher', 'CouponVouchers')
 Line = get_model('order', 'Line')
 Order = get_model('order', 'Order')
 Product = get_model('catalogue', 'Product')
@@ -202,8 +207,18 @@ class CourseSerializer(serializers.HyperlinkedModelSerializer):
         if not include_products:
             self.fields.pop('products', None)
 
+        # Only serialize the requested fields, skipping the cost of the others.
+        fields = kwargs.get('context', {}).pop('fields', None)
+        if fields:
+            for field_name in set(self.fields.keys()) - set(fields):
+                self.fields.pop(field_name)
+
     def get_last_edited(self, obj):
-        return obj.history.latest().history_date.strftime(ISO_8601_FORMAT)
+        # The history of a page of courses can be read in bulk, and passed as a map of course IDs to dates.
+        history_date = self.context.get('last_edited', {}).get(obj.id)
+        if history_date is None:
+            history_date = obj.history.latest().history_date
+        return history_date.strftime(ISO_8601_FORMAT)
 
     def get_products_url(self, obj):
         return reverse('api:v2:course-product-list', kwargs={'parent_lookup_course_id': obj.id},
@@ -398,7 +413,8 @@ class VoucherSerializer(serializers.ModelSerializer):
         return obj.is_available_to_user(user=request.user)
 
     def get_benefit(self, obj):
-        benefit = obj.offers.first().benefit
+        # Equivalent to offers.first(), but reads the offers when they have been prefetched.
+        benefit = min(obj.offers.all(), key=lambda offer: offer.id).benefit
         return BenefitSerializer(benefit).data
 
     def get_redeem_url(self, obj):
@@ -427,6 +443,124 @@ class CouponListSerializer(serializers.ModelSerializer):
         fields = ('id', 'title',)
 
 
+class CouponDataLoader(object):
+    """
+    Load the data CouponSerializer reads for a group of coupons, with a fixed number of queries.
+
+    The data of all the coupons of the group is loaded the first time the data of any of them is read.
+    The data of a coupon outside of the group is loaded on its own.
+    """
+
+    def __init__(self, coupons):
+        self._pending = list(coupons)
+        self._data = {}
+
+    def get_offer(self, coupon):
+        """ Return the first offer of the first voucher of the coupon. """
+        return self._get(coupon)['offer']
+
+    def get_vouchers(self, coupon):
+        """ Return the vouchers of the coupon, with their offers and applications. """
+        return self._get(coupon)['vouchers']
+
+    def get_seats(self, coupon):
+        """ Return the seats of the catalog the coupon applies to, or None for catalog query coupons. """
+        return self._get(coupon)['seats']
+
+    def get_invoice(self, coupon):
+        """ Return the invoice the coupon was ordered with, with its business client, or None. """
+        return self._get(coupon)['invoice']
+
+    def get_history(self, coupon):
+        """ Return the latest historical record of the coupon, with its user. """
+        return self._get(coupon)['history']
+
+    def get_note(self, coupon):
+        """ Return the note of the coupon, or None. """
+        return self._get(coupon)['note']
+
+    def _get(self, coupon):
+        if coupon.id not in self._data:
+            coupons = [pending for pending in self._pending if pending.id != coupon.id] + [coupon]
+            self._pending = []
+            self._load(coupons)
+        return self._data[coupon.id]
+
+    def _load(self, coupons):
+        coupon_ids = [coupon.id for coupon in coupons]
+        prefetch_related_objects(coupons, ['categories', 'product_class', 'stockrecords'])
+
+        offers = ConditionalOffer.objects.select_related('benefit', 'condition__range__catalog').order_by('id')
+        coupon_vouchers = CouponVouchers.objects.filter(coupon_id__in=coupon_ids).prefetch_related(
+            Prefetch('vouchers', queryset=Voucher.objects.order_by('id')),
+            Prefetch('vouchers__offers', queryset=offers),
+            'vouchers__applications',
+        )
+        vouchers = dict(
+            (coupon_voucher.coupon_id, list(coupon_voucher.vouchers.all())) for coupon_voucher in coupon_vouchers
+        )
+        first_offers = dict(
+            (coupon_id, coupon_vouchers_list[0].offers.all()[0])
+            for coupon_id, coupon_vouchers_list in vouchers.items()
+            if coupon_vouchers_list and coupon_vouchers_list[0].offers.all()
+        )
+
+        seats = self._load_seats(set(
+            offer.condition.range.catalog_id for offer in first_offers.values() if offer.condition.range.catalog_id
+        ))
+
+        # The invoices are ordered so that the first invoice of each coupon is kept, like QuerySet.first() does.
+        invoices = Invoice.objects.filter(order__basket__lines__product_id__in=coupon_ids).annotate(
+            coupon_id=F('order__basket__lines__product_id')
+        ).select_related('business_client').order_by('-id')
+        invoices = dict((invoice.coupon_id, invoice) for invoice in invoices)
+
+        history = Product.history.model.objects.filter(id__in=coupon_ids).select_related(
+            'history_user'
+        ).order_by('history_date')
+        history = dict((record.id, record) for record in history)
+
+        notes = dict(ProductAttributeValue.objects.filter(
+            product_id__in=coupon_ids, attribute__code='note'
+        ).values_list('product_id', 'value_text'))
+
+        for coupon_id in coupon_ids:
+            offer = first_offers.get(coupon_id)
+            catalog_id = offer.condition.range.catalog_id if offer else None
+            self._data[coupon_id] = {
+                'offer': offer,
+                'vouchers': vouchers.get(coupon_id, []),
+                'seats': seats.get(catalog_id, []) if catalog_id else None,
+                'invoice': invoices.get(coupon_id),
+                'history': history.get(coupon_id),
+                'note': notes.get(coupon_id),
+            }
+
+    def _load_seats(self, catalog_ids):
+        """ Return a map of catalog IDs to the products of their stock records, in the default product order. """
+        if not catalog_ids:
+            return {}
+
+        stock_records = StockRecord.objects.filter(catalogs__id__in=catalog_ids)
+        product_ids_by_catalog = {}
+        for catalog_id, product_id in stock_records.values_list('catalogs__id', 'product_id'):
+            product_ids_by_catalog.setdefault(catalog_id, set()).add(product_id)
+
+        product_ids = set().union(*product_ids_by_catalog.values())
+        products = list(Product.objects.filter(id__in=product_ids).select_related(
+            'product_class', 'parent__product_class'
+        ).prefetch_related(
+            'stockrecords',
+            Prefetch('attribute_values', queryset=ProductAttributeValue.objects.select_related('attribute')),
+        ))
+        initialize_product_attributes(products)
+
+        return dict(
+            (catalog_id, [product for product in products if product.id in product_ids])
+            for catalog_id, product_ids in product_ids_by_catalog.items()
+        )
+
+
 class CouponSerializer(ProductPaymentInfoMixin, serializers.ModelSerializer):
     """ Serializer for Coupons. """
     coupon_type = serializers.SerializerMethodField()
@@ -442,9 +576,21 @@ class CouponSerializer(ProductPaymentInfoMixin, serializers.ModelSerializer):
     course_seat_types = serializers.SerializerMethodField()
     payment_information = serializers.SerializerMethodField()
 
+    @property
+    def loader(self):
+        """ Data loader shared, through the context, by all the coupons serialized together. """
+        loader = self.context.get('coupon_loader')
+        if loader is None:
+            coupons = self.root.instance
+            if isinstance(coupons, Product):
+                coupons = [coupons]
+            loader = CouponDataLoader(coupons or [])
+            self.context['coupon_loader'] = loader
+        return loader
+
     def retrieve_offer(self, obj):
         """Helper method to retrieve the offer from coupon. """
-        return obj.attr.coupon_vouchers.vouchers.first().offers.first()
+        return self.loader.get_offer(obj)
 
     def get_coupon_type(self, obj):
         offer = self.retrieve_offer(obj)
@@ -453,17 +599,14 @@ class CouponSerializer(ProductPaymentInfoMixin, serializers.ModelSerializer):
         return 'Discount code'
 
     def get_last_edited(self, obj):
-        history = obj.history.latest()
+        history = self.loader.get_history(obj)
         return history.history_user.username, history.history_date
 
     def get_seats(self, obj):
-        offer = self.retrieve_offer(obj)
-        _range = offer.condition.range
         request = self.context['request']
-        if _range.catalog:
-            stockrecords = _range.catalog.stock_records.all()
-            seats = Product.objects.filter(id__in=[sr.product.id for sr in stockrecords])
-        else:
+        seats = self.loader.get_seats(obj)
+        if seats is None:
+            _range = self.retrieve_offer(obj).condition.range
             seats = get_seats_from_query(
                 request.site,
                 _range.catalog_query,
@@ -473,18 +616,18 @@ class CouponSerializer(ProductPaymentInfoMixin, serializers.ModelSerializer):
         return serializer.data
 
     def get_client(self, obj):
-        return Invoice.objects.get(order__basket__lines__product=obj).business_client.name
+        invoice = self.loader.get_invoice(obj)
+        if invoice is None:
+            raise Invoice.DoesNotExist
+        return invoice.business_client.name
 
     def get_vouchers(self, obj):
-        vouchers = obj.attr.coupon_vouchers.vouchers.all()
+        vouchers = self.loader.get_vouchers(obj)
         serializer = VoucherSerializer(vouchers, many=True, context={'request': self.context['request']})
         return serializer.data
 
     def get_note(self, obj):
-        try:
-            return obj.attr.note
-        except AttributeError:
-            return None
+        return self.loader.get_note(obj)
 
     def get_max_uses(self, obj):
         offer = self.retrieve_offer(obj)
@@ -509,7 +652,7 @@ class CouponSerializer(ProductPaymentInfoMixin, serializers.ModelSerializer):
         Currently only invoices are supported, in the event of adding another
         payment processor append it to the response dictionary.
         """
-        invoice = Invoice.objects.filter(order__basket__lines__product=obj).first()
+        invoice = self.loader.get_invoice(obj)
         response = {'Invoice': InvoiceSerializer(invoice).data}
         return response
 
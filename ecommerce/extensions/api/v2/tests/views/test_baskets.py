@@ -6,7 +6,9 @@ import json
 import ddt
 from django.contrib.auth import get_user_model
 from django.core.urlresolvers import reverse
+from django.db import connection
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 import mock
 from oscar.core.loading import get_model
 from oscar.test import factories
@@ -24,6 +26,7 @@ from ecommerce.tests.testcases import TestCase, TransactionTestCase
 
 Basket = get_model('basket', 'Basket')
 Order = get_model('order', 'Order')
+Product = get_model('catalogue', 'Product')
 ShippingEventType = get_model('order', 'ShippingEventType')
 Refund = get_model('refund', 'Refund')
 User = get_user_model()
@@ -167,6 +170,65 @@ class BasketCreateViewTests(BasketCreationMixin, ThrottlingMixin, TransactionTes
             )
         )
 
+    def create_products(self, count):
+        """ Create the given number of paid products, and return their SKUs. """
+        skus = []
+        for index in range(count):
+            sku = 'BULK-SKU-{}'.format(index)
+            factories.ProductFactory(
+                structure='child',
+                parent=self.base_product,
+                stockrecords__partner=self.partner,
+                stockrecords__partner_sku=sku,
+                stockrecords__price_excl_tax=Decimal('10.00'),
+            )
+            skus.append(sku)
+        return skus
+
+    def test_bulk_add_products_queries(self):
+        """ Verify the number of queries made to add products to a basket does not depend on their number. """
+        skus = self.create_products(50)
+        # The first request also authenticates the user, which makes queries of its own.
+        self.assertEqual(self.create_basket(skus=skus[:1]).status_code, 200)
+
+        with CaptureQueriesContext(connection) as single_product_queries:
+            self.assertEqual(self.create_basket(skus=skus[:1]).status_code, 200)
+        with CaptureQueriesContext(connection) as bulk_queries:
+            response = self.create_basket(skus=skus)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(bulk_queries), len(single_product_queries))
+
+        basket = Basket.objects.get(id=response.data['id'])
+        self.assertEqual(
+            sorted(basket.lines.values_list('stockrecord__partner_sku', 'quantity', 'price_excl_tax')),
+            sorted((sku, 1, Decimal('10.00')) for sku in skus)
+        )
+
+    def test_bulk_add_duplicate_products(self):
+        """ Verify a product requested several times is added once, with the number of times it was requested. """
+        response = self.create_basket(skus=[self.PAID_SKU, self.ALTERNATE_PAID_SKU, self.PAID_SKU])
+        self.assertEqual(response.status_code, 200)
+
+        basket = Basket.objects.get(id=response.data['id'])
+        self.assertEqual(
+            list(basket.lines.order_by('id').values_list('product', 'quantity')),
+            [(self.paid_product.id, 2), (Product.objects.get(stockrecords__partner_sku=self.ALTERNATE_PAID_SKU).id, 1)]
+        )
+
+    def test_bulk_add_first_bad_sku_reported(self):
+        """ Verify the first bad SKU of a request is reported, and no product is added to the basket. """
+        skus = self.create_products(5)
+        response = self.create_basket(skus=skus[:2] + [self.BAD_SKU, 'other-bad-sku'] + skus[2:])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data,
+            self._bad_request_dict(
+                api_exceptions.PRODUCT_NOT_FOUND_DEVELOPER_MESSAGE.format(sku=self.BAD_SKU),
+                api_exceptions.PRODUCT_NOT_FOUND_USER_MESSAGE
+            )
+        )
+        self.assertFalse(Basket.objects.get().lines.exists())
+
     def test_no_payment_processor(self):
         """Test that requests for handling payment with a non-existent processor fail."""
         response = self.create_basket(
@@ -4,9 +4,12 @@ import json
 
 from django.conf import settings
 from django.core.urlresolvers import reverse
+from django.db import connection
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from oscar.core.loading import get_model
 
+from ecommerce.core.site_cache import invalidate_site_bundles
 from ecommerce.core.tests import toggle_switch
 from ecommerce.extensions.payment.tests.processors import DummyProcessor
 from ecommerce.tests.testcases import TestCase
@@ -76,3 +79,19 @@ class CheckoutViewTests(TestCase):
         self.assertEqual(response_data['payment_form_data']['transaction_param'], 'test_trans_param')
         self.assertEqual(response_data['payment_page_url'], 'test_processor.edx')
         self.assertEqual(response_data['payment_processor'], 'dummy_with_url')
+
+    @override_settings(
+        PAYMENT_PROCESSORS=['ecommerce.extensions.api.v2.tests.views.test_checkout.DummyProcessorWithUrl']
+    )
+    def test_site_configuration_cached_between_requests(self):
+        """ Verify the site configuration is only resolved by the first checkout request. """
+        toggle_switch(settings.PAYMENT_PROCESSOR_SWITCH_PREFIX + DummyProcessorWithUrl.NAME, True)
+
+        def count_queries():
+            with CaptureQueriesContext(connection) as context:
+                self.assertEqual(self.client.post(self.path, data=self.data).status_code, 200)
+            return len(context.captured_queries)
+
+        invalidate_site_bundles()
+        cold_queries = count_queries()
+        self.assertLess(count_queries(), cold_queries)
@@ -9,6 +9,8 @@ import ddt
 import httpretty
 import pytz
 from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.test import RequestFactory
 from oscar.apps.catalogue.categories import create_from_breadcrumbs
 from oscar.core.loading import get_class, get_model
@@ -19,6 +21,7 @@ from ecommerce.core.tests.decorators import mock_course_catalog_api_client
 from ecommerce.coupons.tests.mixins import CourseCatalogMockMixin, CouponMixin
 from ecommerce.courses.tests.factories import CourseFactory
 from ecommerce.extensions.api.constants import APIConstants as AC
+from ecommerce.extensions.api.serializers import CouponSerializer
 from ecommerce.extensions.api.v2.views.coupons import CouponViewSet
 from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
 from ecommerce.extensions.voucher.models import CouponVouchers
@@ -202,6 +205,44 @@ class CouponViewSetTest(CouponMixin, CourseCatalogTestMixin, TestCase):
         self.assertEqual(note_coupon.attr.note, '𝑵𝑶𝑻𝑬')
         self.assertEqual(note_coupon.title, 'Coupon')
 
+    def test_serializer_query_count(self):
+        """ Verify the number of queries made to serialize coupons does not depend on their number. """
+        self.catalog.stock_records.add(StockRecord.objects.get(product=self.seat))
+        coupon_ids = [
+            self.create_coupon(title='Coupon {}'.format(i), partner=self.partner, catalog=self.catalog, note='Note').id
+            for i in range(3)
+        ]
+        Product.history.filter(id__in=coupon_ids).update(history_user=self.user)
+        request = RequestFactory().get('/')
+        request.user = self.user
+        request.site = self.site
+
+        def serialize(count):
+            coupons = Product.objects.filter(id__in=coupon_ids[:count]).order_by('id')
+            with CaptureQueriesContext(connection) as context:
+                data = CouponSerializer(coupons, many=True, context={'request': request}).data
+            return data, len(context)
+
+        serialize(1)
+        __, single_coupon_queries = serialize(1)
+        data, queries = serialize(3)
+        self.assertEqual(queries, single_coupon_queries)
+
+        self.assertEqual(len(data), 3)
+        for coupon_id, coupon_data in zip(coupon_ids, data):
+            coupon = Product.objects.get(id=coupon_id)
+            self.assertEqual(coupon_data['id'], coupon_id)
+            self.assertEqual(coupon_data['client'], 'Test Client')
+            self.assertEqual(coupon_data['note'], 'Note')
+            self.assertEqual(coupon_data['coupon_type'], 'Enrollment code')
+            self.assertEqual([seat['id'] for seat in coupon_data['seats']], [self.seat.id])
+            self.assertEqual(len(coupon_data['vouchers']), 5)
+            self.assertEqual(coupon_data['last_edited'][1], coupon.history.latest().history_date)
+            self.assertEqual(
+                coupon_data['payment_information']['Invoice']['id'],
+                Invoice.objects.get(order__basket__lines__product=coupon).id
+            )
+
     def test_multi_use_coupon_creation(self):
         """Test that the endpoint supports the creation of multi-usage coupons."""
         max_uses_number = 2
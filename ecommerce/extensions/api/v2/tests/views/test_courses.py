@@ -7,6 +7,8 @@ import mock
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from oscar.core.loading import get_model, get_class
 
 from ecommerce.core.constants import ISO_8601_FORMAT
@@ -104,6 +106,52 @@ class CourseViewSetTests(ProductSerializerMixin, CourseCatalogTestMixin, TestCas
         response = self.client.get(self.list_path)
         self.assertDictEqual(json.loads(response.content), {'count': 0, 'next': None, 'previous': None, 'results': []})
 
+    def test_list_with_cursor(self):
+        """ Verify the view paginates by cursor when a cursor is requested. """
+        courses = [self.course] + [
+            Course.objects.create(id='edX/DemoX/Demo_Course_{}'.format(i), name='Test Course') for i in range(2)
+        ]
+        courses.sort(key=lambda course: course.id)
+
+        response = self.client.get(self.list_path, {'cursor': '', 'page_size': 2})
+        self.assertEqual(response.status_code, 200)
+        content = json.loads(response.content)
+        self.assertNotIn('count', content)
+        self.assertIsNone(content['previous'])
+        self.assertListEqual(content['results'], [self.serialize_course(course) for course in courses[:2]])
+
+        response = self.client.get(content['next'])
+        self.assertEqual(response.status_code, 200)
+        content = json.loads(response.content)
+        self.assertIsNone(content['next'])
+        self.assertListEqual(content['results'], [self.serialize_course(courses[2])])
+
+    def test_list_fields(self):
+        """ Verify the view only returns the requested fields. """
+        response = self.client.get(self.list_path, {'fields': 'id,name'})
+        self.assertEqual(response.status_code, 200)
+        self.assertListEqual(
+            json.loads(response.content)['results'], [{'id': self.course.id, 'name': self.course.name}]
+        )
+
+    def test_list_query_count(self):
+        """ Verify the number of queries made to list courses does not depend on the number of courses. """
+        def count_queries():
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(self.list_path, {'include_products': True})
+            self.assertEqual(response.status_code, 200)
+            return len(context)
+
+        self.course.create_or_update_seat('verified', True, 10, self.partner)
+        # The first request also caches the site configuration.
+        count_queries()
+        initial_count = count_queries()
+
+        for i in range(3):
+            course = Course.objects.create(id='edX/DemoX/Demo_Course_{}'.format(i), name='Test Course')
+            course.create_or_update_seat('verified', True, 10, self.partner)
+        self.assertEqual(count_queries(), initial_count)
+
     def test_create(self):
         """ Verify the view can create a new Course."""
         Course.objects.all().delete()
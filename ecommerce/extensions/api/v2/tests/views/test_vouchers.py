@@ -1,12 +1,14 @@
 from __future__ import unicode_literals
 
 import datetime
+import hashlib
 import json
 import mock
 
 import ddt
 import httpretty
 import pytz
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
 from django.http import Http404
 from opaque_keys.edx.keys import CourseKey
@@ -22,7 +24,7 @@ from ecommerce.coupons.tests.mixins import CourseCatalogMockMixin, CouponMixin
 from ecommerce.coupons.views import get_voucher_and_products_from_code
 from ecommerce.courses.models import Course
 from ecommerce.extensions.api import serializers
-from ecommerce.extensions.api.v2.views.vouchers import VoucherViewSet
+from ecommerce.extensions.api.v2.views.vouchers import VoucherViewSet, _get_offer_chunk_key
 from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
 from ecommerce.extensions.partner.strategy import DefaultStrategy
 from ecommerce.extensions.test.factories import prepare_voucher
@@ -314,6 +316,94 @@ class VoucherViewOffersEndpointTests(
             'voucher_end_date': voucher.end_datetime
         })
 
+    def prepare_catalog_query_voucher(self, course_count, benefit_value=10):
+        """ Create courses matching a catalog query, and a voucher of the seats of the courses matching it. """
+        courses = [self.create_course_and_seat()[0] for __ in range(course_count)]
+        self.mock_dynamic_catalog_course_runs_api(query='*:*', course_run_info={
+            'count': course_count,
+            'results': [{
+                'key': course.id,
+                'title': course.name,
+                'start': '2016-05-01T00:00:00Z',
+                'image': {'src': 'path/to/the/course/image'},
+            } for course in courses],
+        })
+        new_range, __ = Range.objects.get_or_create(catalog_query='*:*', course_seat_types='verified')
+        voucher, __ = prepare_voucher(_range=new_range, benefit_value=benefit_value)
+        return courses, voucher
+
+    @mock_course_catalog_api_client
+    @mock.patch('ecommerce.extensions.api.v2.views.vouchers.OFFER_INDEX_CHUNK_SIZE', 10)
+    def test_offers_paginated_from_index(self):
+        """
+        Verify the offers of catalog query vouchers are paginated from an index cached in chunks,
+        reading only the chunks of the page requested.
+        """
+        courses, voucher = self.prepare_catalog_query_voucher(25)
+        request = self.prepare_offers_listing_request(voucher.code)
+        response = self.endpointView(request)
+        self.assertEqual(response.data['count'], 25)
+
+        request = APIRequestFactory().get('/?code={}&page=3&page_size=5'.format(voucher.code))
+        request.site = self.site
+        request.strategy = DefaultStrategy()
+        with mock.patch('ecommerce.extensions.api.v2.views.vouchers.cache.get_many',
+                        wraps=cache.get_many) as get_many:
+            with mock.patch.object(VoucherViewSet, 'get_offers') as get_offers:
+                # The voucher and its offer are read from the database, and the page from the cache.
+                with self.assertNumQueries(2):
+                    response = self.endpointView(request)
+
+        self.assertEqual(response.data['count'], 25)
+        self.assertEqual([offer['id'] for offer in response.data['results']], [course.id for course in courses[10:15]])
+        self.assertEqual(len(get_many.call_args[0][0]), 1)
+        self.assertFalse(get_offers.called)
+
+    @mock_course_catalog_api_client
+    def test_offers_shared_by_catalog_query(self):
+        """ Verify vouchers of the same catalog query share the offers, with their own benefit and end date. """
+        __, voucher = self.prepare_catalog_query_voucher(1, benefit_value=10)
+        other_voucher = VoucherFactory(code='OTHERCODE')
+        other_voucher.offers.add(ConditionalOfferFactory(
+            name='Other offer', benefit=BenefitFactory(range=voucher.offers.first().benefit.range, value=20)
+        ))
+
+        catalog_requests = len(httpretty.httpretty.latest_requests)
+        for shared_voucher, benefit_value in ((voucher, 10), (other_voucher, 20)):
+            response = self.endpointView(self.prepare_offers_listing_request(shared_voucher.code))
+            offer = response.data['results'][0]
+            self.assertEqual(offer['benefit']['value'], benefit_value)
+            self.assertEqual(offer['voucher_end_date'], shared_voucher.end_datetime)
+
+        # The offers were computed once, from one request for the seats and one for the course runs of the query.
+        self.assertEqual(len(httpretty.httpretty.latest_requests) - catalog_requests, 2)
+
+    @mock_course_catalog_api_client
+    def test_offers_rebuilt_when_chunks_evicted(self):
+        """ Verify the offers are computed again if their chunks were evicted from the cache before the index. """
+        courses, voucher = self.prepare_catalog_query_voucher(2)
+        request = self.prepare_offers_listing_request(voucher.code)
+        self.endpointView(request)
+
+        index_key = hashlib.md5('voucher_offers_*:*').hexdigest()
+        cache.delete(_get_offer_chunk_key(index_key, cache.get(index_key)['version'], 0))
+
+        response = self.endpointView(request)
+        self.assertEqual([offer['id'] for offer in response.data['results']], [course.id for course in courses])
+        response = self.endpointView(request)
+        self.assertEqual([offer['id'] for offer in response.data['results']], [course.id for course in courses])
+
+    @mock_course_catalog_api_client
+    def test_get_offers_queries(self):
+        """ Verify the number of queries made to compute the offers does not depend on the number of seats. """
+        __, voucher = self.prepare_catalog_query_voucher(20)
+        voucher, products = get_voucher_and_products_from_code(voucher.code)
+        request = self.prepare_offers_listing_request(voucher.code)
+
+        with self.assertNumQueries(6):
+            offers = VoucherViewSet().get_offers(products=products, request=request, voucher=voucher)
+        self.assertEqual(len(offers), 20)
+
     def test_get_course_offer_data(self):
         """ Verify that the course offers data is properly formatted. """
         benefit = BenefitFactory()
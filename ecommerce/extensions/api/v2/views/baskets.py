@@ -136,25 +136,33 @@ class BasketCreateView(EdxOrderPlacementMixin, generics.CreateAPIView):
 
             requested_products = request.data.get(AC.KEYS.PRODUCTS)
             if requested_products:
-                for requested_product in requested_products:
+                skus = [requested_product.get(AC.KEYS.SKU) for requested_product in requested_products]
+                # Resolve the requested SKUs to products and stock records at once.
+                stock_records = data_api.get_stock_records([sku for sku in skus if sku])
+                purchase_infos = {}
+                purchases = []
+
+                for sku in skus:
                     # Ensure the requested products exist
-                    sku = requested_product.get(AC.KEYS.SKU)
-                    if sku:
-                        try:
-                            product = data_api.get_product(sku)
-                        except api_exceptions.ProductNotFoundError as error:
-                            return self._report_bad_request(
-                                error.message,
-                                api_exceptions.PRODUCT_NOT_FOUND_USER_MESSAGE
-                            )
-                    else:
+                    if not sku:
                         return self._report_bad_request(
                             api_exceptions.SKU_NOT_FOUND_DEVELOPER_MESSAGE,
                             api_exceptions.SKU_NOT_FOUND_USER_MESSAGE
                         )
 
+                    stock_record = stock_records.get(sku)
+                    if stock_record is None:
+                        return self._report_bad_request(
+                            api_exceptions.PRODUCT_NOT_FOUND_DEVELOPER_MESSAGE.format(sku=sku),
+                            api_exceptions.PRODUCT_NOT_FOUND_USER_MESSAGE
+                        )
+
                     # Ensure the requested products are available for purchase before adding them to the basket
-                    availability = basket.strategy.fetch_for_product(product).availability
+                    if sku not in purchase_infos:
+                        purchase_infos[sku] = basket.strategy.fetch_for_product(
+                            stock_record.product, stockrecord=stock_record
+                        )
+                    availability = purchase_infos[sku].availability
                     if not availability.is_available_to_buy:
                         return self._report_bad_request(
                             api_exceptions.PRODUCT_UNAVAILABLE_DEVELOPER_MESSAGE.format(
@@ -164,7 +172,11 @@ class BasketCreateView(EdxOrderPlacementMixin, generics.CreateAPIView):
                             api_exceptions.PRODUCT_UNAVAILABLE_USER_MESSAGE
                         )
 
-                    basket.add_product(product)
+                    purchases.append((stock_record.product, purchase_infos[sku], 1))
+
+                # The products are only added once they are all known to be available.
+                basket.add_products(purchases)
+                for sku in skus:
                     logger.info('Added product with SKU [%s] to basket [%d]', sku, basket_id)
             else:
                 # If no products were included in the request, we cannot checkout.
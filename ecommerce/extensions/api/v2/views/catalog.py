@@ -48,7 +48,7 @@ class CatalogViewSet(NestedViewSetMixin, ReadOnlyModelViewSet):
                                                  limit=DEFAULT_CATALOG_PAGE_SIZE)['results']
                 course_ids = [result['key'] for result in results]
                 courses = serializers.CourseSerializer(
-                    Course.objects.filter(id__in=course_ids),
+                    Course.objects.filter(id__in=course_ids).with_seats(),
                     many=True,
                     context={'request': request}
                 ).data
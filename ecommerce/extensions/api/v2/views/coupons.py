@@ -24,7 +24,7 @@ from ecommerce.extensions.catalogue.utils import generate_sku, get_or_create_cat
 from ecommerce.extensions.checkout.mixins import EdxOrderPlacementMixin
 from ecommerce.extensions.payment.processors.invoice import InvoicePayment
 from ecommerce.extensions.voucher.models import CouponVouchers
-from ecommerce.extensions.voucher.utils import create_vouchers, update_voucher_offer
+from ecommerce.extensions.voucher.utils import create_vouchers, normalize_voucher_code, update_voucher_offer
 from ecommerce.invoice.models import Invoice
 
 Basket = get_model('basket', 'Basket')
@@ -131,15 +131,11 @@ class CouponViewSet(EdxOrderPlacementMixin, viewsets.ModelViewSet):
             catalog_query = request.data.get(CATALOG_QUERY)
             course_seat_types = request.data.get(COURSE_SEAT_TYPES)
 
-            if code:
-                try:
-                    Voucher.objects.get(code=code)
-                    return Response(
-                        'A coupon with code {code} already exists.'.format(code=code),
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-                except Voucher.DoesNotExist:
-                    pass
+            if code and Voucher.objects.filter(code=normalize_voucher_code(code)).exists():
+                return Response(
+                    'A coupon with code {code} already exists.'.format(code=code),
+                    status=status.HTTP_400_BAD_REQUEST
+                )
 
             invoice_data = self.retrieve_invoice_data(request.data)
 
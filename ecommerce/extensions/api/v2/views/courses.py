@@ -1,4 +1,6 @@
 """HTTP endpoints for interacting with courses."""
+from django.db.models import Max, Prefetch
+from oscar.core.loading import get_model
 from rest_framework import status
 from rest_framework.decorators import detail_route
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
@@ -7,8 +9,13 @@ import waffle
 
 from ecommerce.core.constants import COURSE_ID_REGEX
 from ecommerce.courses.models import Course
+from ecommerce.extensions.api.pagination import CursorPagination
 from ecommerce.extensions.api.v2.views import NonDestroyableModelViewSet
 from ecommerce.extensions.api import serializers
+from ecommerce.extensions.catalogue.utils import initialize_product_attributes
+
+Product = get_model('catalogue', 'Product')
+ProductAttributeValue = get_model('catalogue', 'ProductAttributeValue')
 
 
 class CourseViewSet(NonDestroyableModelViewSet):
@@ -17,6 +24,49 @@ class CourseViewSet(NonDestroyableModelViewSet):
     serializer_class = serializers.CourseSerializer
     permission_classes = (IsAuthenticated, IsAdminUser,)
 
+    @property
+    def paginator(self):
+        """ Paginate with a cursor when one is requested, and by page number otherwise. """
+        if not hasattr(self, '_paginator'):
+            if CursorPagination.cursor_query_param in self.request.query_params:
+                self._paginator = CursorPagination()  # pylint: disable=attribute-defined-outside-init
+            else:
+                self._paginator = super(CourseViewSet, self).paginator  # pylint: disable=attribute-defined-outside-init
+        return self._paginator
+
+    @property
+    def requested_fields(self):
+        """ Names of the fields requested with the fields query parameter, or None to return all fields. """
+        fields = self.request.query_params.get('fields')
+        if not fields:
+            return None
+        return [field.strip() for field in fields.split(',') if field.strip()]
+
+    @property
+    def include_products(self):
+        return bool(self.request.GET.get('include_products', False))
+
+    def _is_requested(self, field_name):
+        fields = self.requested_fields
+        return fields is None or field_name in fields
+
+    def get_queryset(self):
+        queryset = super(CourseViewSet, self).get_queryset()
+
+        if self._is_requested('type'):
+            queryset = queryset.with_seats()
+
+        if self.include_products and self._is_requested('products'):
+            products = Product.objects.select_related('product_class', 'parent__product_class')
+            attribute_values = ProductAttributeValue.objects.select_related('attribute')
+            queryset = queryset.prefetch_related(
+                Prefetch('products', queryset=products),
+                Prefetch('products__attribute_values', queryset=attribute_values),
+                'products__stockrecords',
+            )
+
+        return queryset
+
     def list(self, request, *args, **kwargs):
         """
         List all courses.
@@ -28,8 +78,48 @@ class CourseViewSet(NonDestroyableModelViewSet):
               type: boolean
               paramType: query
               multiple: false
+            - name: fields
+              description: Comma-separated names of the fields to include in the response. All by default.
+              required: false
+              type: string
+              paramType: query
+              multiple: false
+            - name: cursor
+              description: Position of the page to return. Paginates by cursor instead of by page number.
+              required: false
+              type: string
+              paramType: query
+              multiple: false
         """
-        return super(CourseViewSet, self).list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+
+        page = self.paginate_queryset(queryset)
+        courses = list(queryset) if page is None else page
+        self._prepare_courses(courses)
+
+        serializer = self.get_serializer(courses, many=True)
+        if page is None:
+            return Response(serializer.data)
+        return self.get_paginated_response(serializer.data)
+
+    def _prepare_courses(self, courses):
+        """
+        Read the data a page of courses is serialized from in bulk.
+
+        The last edition date of the courses is read in a single query, and the attributes of
+        their products are initialised from the prefetched attribute values.
+        """
+        if self._is_requested('last_edited'):
+            # Course.history.latest() would query the history of each course.
+            HistoricalCourse = Course.history.model
+            self._last_edited = dict(  # pylint: disable=attribute-defined-outside-init
+                HistoricalCourse.objects.filter(
+                    id__in=[course.id for course in courses]
+                ).values_list('id').annotate(history_date=Max('history_date'))
+            )
+
+        if self.include_products and self._is_requested('products'):
+            initialize_product_attributes(product for course in courses for product in course.products.all())
 
     def retrieve(self, request, *args, **kwargs):
         """
@@ -47,7 +137,9 @@ class CourseViewSet(NonDestroyableModelViewSet):
 
     def get_serializer_context(self):
         context = super(CourseViewSet, self).get_serializer_context()
-        context['include_products'] = bool(self.request.GET.get('include_products', False))
+        context['include_products'] = self.include_products
+        context['fields'] = self.requested_fields
+        context['last_edited'] = getattr(self, '_last_edited', {})
         return context
 
     @detail_route(methods=['post'])
@@ -3,6 +3,7 @@ from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
 from rest_framework_extensions.cache.decorators import cache_response
 
+from ecommerce.core.site_cache import get_payment_processors
 from ecommerce.extensions.api import serializers
 
 
@@ -26,4 +27,4 @@ class PaymentProcessorListView(generics.ListAPIView):
 
     def get_queryset(self):
         """Fetch the list of payment processor classes based on Django settings."""
-        return self.request.site.siteconfiguration.get_payment_processors()
+        return get_payment_processors(self.request.site)
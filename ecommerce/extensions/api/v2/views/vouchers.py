@@ -1,6 +1,7 @@
 """HTTP endpoints for interacting with vouchers."""
 import hashlib
 import logging
+import uuid
 
 from django.conf import settings
 from django.core.cache import cache
@@ -15,20 +16,124 @@ from rest_framework.response import Response
 from rest_framework_extensions.decorators import action
 from slumber.exceptions import SlumberBaseException
 
+from ecommerce.core.cache_utils import cache_values, get_or_fetch
 from ecommerce.core.constants import DEFAULT_CATALOG_PAGE_SIZE
 from ecommerce.core.url_utils import get_lms_url
 from ecommerce.courses.models import Course
 from ecommerce.courses.utils import get_course_info_from_lms
-from ecommerce.coupons.views import get_voucher_and_products_from_code
 from ecommerce.extensions.api import exceptions, serializers
 from ecommerce.extensions.api.permissions import IsOffersOrIsAuthenticatedAndStaff
 from ecommerce.extensions.api.v2.views import NonDestroyableModelViewSet
+from ecommerce.extensions.voucher.utils import get_voucher_from_code
 
 
 logger = logging.getLogger(__name__)
 StockRecord = get_model('partner', 'StockRecord')
 Voucher = get_model('voucher', 'Voucher')
 
+# Number of offers cached under each key of an offer index.
+OFFER_INDEX_CHUNK_SIZE = 100
+
+
+def _get_offer_chunk_key(index_key, version, number):
+    return '{}:{}:{}'.format(index_key, version, number)
+
+
+def cache_offer_index(index_key, offers):
+    """
+    Caches offers in chunks of OFFER_INDEX_CHUNK_SIZE, under keys derived from the index key and a new version.
+
+    The chunks are kept for as long as an index cached at the same time can be served, stale values
+    included. The chunks of previous versions are left to expire.
+
+    Arguments:
+        index_key (str): Cache key of the index.
+        offers (list): The offers.
+
+    Returns:
+        dict: The index, to be cached under the index key, with the number of offers and their version.
+    """
+    version = uuid.uuid4().hex
+    timeout = int(settings.COURSES_API_CACHE_TIMEOUT * (1 + settings.REMOTE_CACHE_TTL_JITTER))
+    cache.set_many(
+        {
+            _get_offer_chunk_key(index_key, version, number): offers[start:start + OFFER_INDEX_CHUNK_SIZE]
+            for number, start in enumerate(range(0, len(offers), OFFER_INDEX_CHUNK_SIZE))
+        },
+        timeout + settings.REMOTE_CACHE_STALE_TIMEOUT
+    )
+    return {'count': len(offers), 'version': version}
+
+
+class CachedOffers(object):
+    """
+    Sequence of the offers of a voucher, read from a cached offer index.
+
+    Slicing only reads the chunks of the index the slice falls in, so a page of offers is read in
+    time proportional to the page size, however many offers there are. The offers of an index are
+    shared by the vouchers of a catalog query; the benefit and end date of this voucher are set on
+    the offers read.
+    """
+
+    def __init__(self, index_key, index, voucher, rebuild):
+        """
+        Arguments:
+            index_key (str): Cache key of the index.
+            index (dict): The index, as returned by `cache_offer_index`.
+            voucher (Voucher): Voucher the offers are read for.
+            rebuild (callable): Computes the offers again, without arguments, when their chunks
+                were evicted from the cache before the index.
+        """
+        self.index_key = index_key
+        self.index = index
+        self.voucher = voucher
+        self.rebuild = rebuild
+        self._offers = None
+        self._benefit = None
+
+    def __len__(self):
+        return self.index['count']
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            if item < 0:
+                item += len(self)
+            if not 0 <= item < len(self):
+                raise IndexError('Offer index out of range.')
+            return self[item:item + 1][0]
+
+        start, stop, step = item.indices(len(self))
+        if start >= stop:
+            return []
+
+        numbers = range(start // OFFER_INDEX_CHUNK_SIZE, (stop - 1) // OFFER_INDEX_CHUNK_SIZE + 1)
+        first = numbers[0] * OFFER_INDEX_CHUNK_SIZE
+        offers = self._read_chunks(numbers)
+        if offers is None:
+            logger.warning('Chunks of the offer index [%s] were evicted. Rebuilding it.', self.index_key)
+            self._offers = self.rebuild()
+            self.index = cache_offer_index(self.index_key, self._offers)
+            cache_values({self.index_key: self.index}, settings.COURSES_API_CACHE_TIMEOUT)
+            offers, first = self._offers, 0
+
+        return [self._for_voucher(offer) for offer in offers[start - first:stop - first:step]]
+
+    def _read_chunks(self, numbers):
+        """ Returns the offers of the given chunks, in order, or None if one of them is not cached. """
+        if self._offers is not None:
+            return self._offers[numbers[0] * OFFER_INDEX_CHUNK_SIZE:(numbers[-1] + 1) * OFFER_INDEX_CHUNK_SIZE]
+
+        keys = [_get_offer_chunk_key(self.index_key, self.index['version'], number) for number in numbers]
+        chunks = cache.get_many(keys)
+        if len(chunks) < len(keys):
+            return None
+        return [offer for key in keys for offer in chunks[key]]
+
+    def _for_voucher(self, offer):
+        if self._benefit is None:
+            self._benefit = serializers.BenefitSerializer(self.voucher.offers.all()[0].benefit).data
+        return dict(offer, benefit=self._benefit, voucher_end_date=self.voucher.end_datetime)
+
 
 class VoucherFilter(django_filters.FilterSet):
     """
@@ -67,35 +172,71 @@ class VoucherViewSet(NonDestroyableModelViewSet):
         code = request.GET.get('code', '')
 
         try:
-            voucher, products = get_voucher_and_products_from_code(code)
+            voucher = get_voucher_from_code(code)
         except Voucher.DoesNotExist:
             logger.error('Voucher with code %s not found.', code)
             return Response(status=status.HTTP_400_BAD_REQUEST)
+
+        # The products of catalog query vouchers are only retrieved if their offers are not cached.
+        products = None
+        voucher_range = voucher.offers.all()[0].benefit.range
+        if not voucher_range.catalog_query:
+            products = voucher_range.all_products()
+            if not products:
+                logger.error('No product(s) are associated with this code.')
+                return Response(status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            offers = self.get_cached_offers(products, request, voucher)
         except exceptions.ProductNotFoundError:
             logger.error('No product(s) are associated with this code.')
             return Response(status=status.HTTP_400_BAD_REQUEST)
+        except (ConnectionError, SlumberBaseException, Timeout):
+            logger.error('Could not get course information.')
+            return Response(status=status.HTTP_400_BAD_REQUEST)
+        except Http404:
+            logger.error('Could not get information for product %s.', products[0].title)
+            return Response(status=status.HTTP_404_NOT_FOUND)
+
+        page = self.paginate_queryset(offers)
+        return self.get_paginated_response(page)
+
+    def get_cached_offers(self, products, request, voucher):
+        """
+        Get the course offers associated with the voucher, from an index cached per catalog query.
 
-        query = voucher.offers.first().benefit.range.catalog_query
-        if query:
-            cache_key = 'voucher_offers_{}'.format(query)
+        The offers of catalog query vouchers are cached per query, and the offers of other vouchers per voucher.
+        Stale indexes are served while they are refreshed in the background.
+        Arguments:
+            products (List): List of Products associated with the voucher, or None to retrieve them
+                from the range of the voucher when the offers are not cached
+            request (HttpRequest): Request data
+            voucher (Voucher): Oscar Voucher for which the offers are returned
+        Returns:
+            CachedOffers: Sequence of course offers where each offer is represented by a dictionary
+        Raises:
+            ProductNotFoundError: When no products are associated with the voucher.
+        """
+        voucher_range = voucher.offers.all()[0].benefit.range
+        if voucher_range.catalog_query:
+            cache_key = 'voucher_offers_{}'.format(voucher_range.catalog_query)
         else:
             cache_key = 'voucher_offers_{}'.format(voucher.id)
+        index_key = hashlib.md5(cache_key).hexdigest()
 
-        cache_hash = hashlib.md5(cache_key).hexdigest()
-        offers = cache.get(cache_hash)
-        if not offers:
-            try:
-                offers = self.get_offers(products, request, voucher)
-            except (ConnectionError, SlumberBaseException, Timeout):
-                logger.error('Could not get course information.')
-                return Response(status=status.HTTP_400_BAD_REQUEST)
-            except Http404:
-                logger.error('Could not get information for product %s.', products[0].title)
-                return Response(status=status.HTTP_404_NOT_FOUND)
-            cache.set(cache_hash, offers, settings.COURSES_API_CACHE_TIMEOUT)
+        def get_offers():
+            voucher_products = products or voucher_range.all_products()
+            if not voucher_products:
+                raise exceptions.ProductNotFoundError()
+            return self.get_offers(voucher_products, request, voucher)
 
-        page = self.paginate_queryset(offers)
-        return self.get_paginated_response(page)
+        index = get_or_fetch(
+            index_key,
+            lambda: cache_offer_index(index_key, get_offers()),
+            settings.COURSES_API_CACHE_TIMEOUT,
+            'voucher_offers'
+        )
+        return CachedOffers(index_key, index, voucher, get_offers)
 
     def get_offers(self, products, request, voucher):
         """
@@ -117,30 +258,31 @@ class VoucherViewSet(NonDestroyableModelViewSet):
                 limit=DEFAULT_CATALOG_PAGE_SIZE
             )['results']
 
+            query_results = {result['key']: result for result in query_results}
             course_ids = [product.course_id for product in products]
-            courses = Course.objects.filter(id__in=course_ids)
-            stock_records = StockRecord.objects.filter(product__in=products)
+            courses = {course.id: course for course in Course.objects.filter(id__in=course_ids).with_seats()}
+            stock_records = {
+                stock_record.product_id: stock_record
+                for stock_record in StockRecord.objects.filter(product__in=products)
+            }
             contains_verified_course = (benefit.range.course_seat_types == 'verified')
 
             for product in products:
+                stock_record = stock_records.get(product.id)
                 # Omit unavailable seats from the offer results so that one seat does not cause an
                 # error message for every seat in the query result.
-                if not request.strategy.fetch_for_product(product).availability.is_available_to_buy:
+                purchase_info = request.strategy.fetch_for_product(product, stockrecord=stock_record)
+                if not purchase_info.availability.is_available_to_buy:
                     logger.info('%s is unavailable to buy. Omitting it from the results.', product)
                     continue
                 course_id = product.course_id
-                course_catalog_data = next((result for result in query_results if result['key'] == course_id), None)
+                course_catalog_data = query_results.get(course_id)
 
-                try:
-                    stock_record = stock_records.get(product__id=product.id)
-                except StockRecord.DoesNotExist:
-                    stock_record = None
+                if stock_record is None:
                     logger.error('Stock Record for product %s not found.', product.id)
 
-                try:
-                    course = courses.get(id=course_id)
-                except Course.DoesNotExist:
-                    course = None
+                course = courses.get(course_id)
+                if course is None:
                     logger.error('Course %s not found.', course_id)
 
                 if course_catalog_data and course and stock_record:
@@ -155,7 +297,7 @@ class VoucherViewSet(NonDestroyableModelViewSet):
         else:
             product = products[0]
             course_id = product.course_id
-            course = get_object_or_404(Course, id=course_id)
+            course = get_object_or_404(Course.objects.with_seats(), id=course_id)
             stock_record = get_object_or_404(StockRecord, product__id=product.id)
             course_info = get_course_info_from_lms(course_id)
 
@@ -1,3 +1,5 @@
+from collections import OrderedDict
+
 from django.db import models
 from django.utils.translation import ugettext_lazy as _
 from oscar.apps.basket.abstract_models import AbstractBasket
@@ -45,6 +47,60 @@ class Basket(AbstractBasket):
 
         return basket
 
+    def add_products(self, purchases):
+        """
+        Add several products to the basket, inserting their lines with a single query.
+
+        Unlike `add_product`, lines are not merged with the lines already in the basket, so the
+        products must not be in the basket yet. A product listed several times is added once,
+        with the sum of its quantities.
+
+        Arguments:
+            purchases (list): (product, purchase info, quantity) tuples, where the purchase info is the
+                price and availability data returned by the strategy of the basket for the product.
+
+        Raises:
+            ValueError: If the products do not all have the currency of the basket, or a stock record.
+        """
+        if not self.id:
+            self.save()
+
+        line_model = self.lines.model
+        lines = OrderedDict()
+        price_currency = self.currency
+        for product, purchase_info, quantity in purchases:
+            price_currency = price_currency or purchase_info.price.currency
+            if purchase_info.price.currency != price_currency:
+                raise ValueError((
+                    "Basket lines must all have the same currency. Proposed "
+                    "line has currency %s, while basket has currency %s")
+                    % (purchase_info.price.currency, price_currency))
+
+            if purchase_info.stockrecord is None:
+                raise ValueError((
+                    "Basket lines must all have stock records. Strategy hasn't "
+                    "found any stock record for product %s") % product)
+
+            line_reference = self._create_line_reference(product, purchase_info.stockrecord, None)
+            if line_reference in lines:
+                lines[line_reference].quantity += quantity
+                continue
+
+            lines[line_reference] = line_model(
+                basket=self,
+                line_reference=line_reference,
+                product=product,
+                stockrecord=purchase_info.stockrecord,
+                quantity=quantity,
+                price_excl_tax=purchase_info.price.excl_tax,
+                price_currency=purchase_info.price.currency,
+                price_incl_tax=purchase_info.price.incl_tax if purchase_info.price.is_tax_known else None,
+            )
+
+        line_model.objects.bulk_create(lines.values())
+        self.reset_offer_applications()
+    add_products.alters_data = True
+
     def __unicode__(self):
         return _(u"{id} - {status} basket (owner: {owner}, lines: {num_lines})").format(
             id=self.id,
@@ -113,3 +113,38 @@ class BasketTests(TestCase):
         basket = Basket.create_basket(self.site1, user)
         self.assertEqual(basket.site, self.site1)
         self.assertEqual(basket.owner, user)
+
+    def test_add_products(self):
+        """ Verify the method adds the products in bulk, with the same lines as add_product. """
+        user = factories.UserFactory()
+        products = [factories.ProductFactory(stockrecords__partner=self.partner) for __ in range(2)]
+        basket = Basket.create_basket(self.site1, user)
+        purchases = [
+            (product, basket.strategy.fetch_for_product(product), 1) for product in products + products[:1]
+        ]
+
+        with self.assertNumQueries(2):
+            basket.add_products(purchases)
+
+        expected = Basket.create_basket(self.site1, user)
+        for product, __, quantity in purchases:
+            expected.add_product(product, quantity)
+
+        fields = ('line_reference', 'product', 'stockrecord', 'quantity', 'price_currency', 'price_excl_tax')
+        self.assertEqual(
+            list(basket.lines.order_by('product').values_list(*fields)),
+            list(expected.lines.order_by('product').values_list(*fields))
+        )
+
+    def test_add_products_currency(self):
+        """ Verify the method refuses products whose currency differs from the currency of the basket. """
+        user = factories.UserFactory()
+        product = factories.ProductFactory(stockrecords__partner=self.partner)
+        other_product = factories.ProductFactory(
+            stockrecords__partner=self.partner, stockrecords__price_currency='EUR'
+        )
+        basket = Basket.create_basket(self.site1, user)
+        basket.add_product(product)
+
+        with self.assertRaises(ValueError):
+            basket.add_products([(other_product, basket.strategy.fetch_for_product(other_product), 1)])
@@ -65,26 +65,30 @@ class BasketSingleItemViewTests(CouponMixin, CourseCatalogTestMixin, LmsApiMockM
         Returns a successful Enrollment API response indicating self.user is enrolled in the specified course mode.
         """
         self.assertTrue(httpretty.is_enabled())
-        url = '{host}/{username},{course_id}'.format(
-            host=get_lms_enrollment_api_url(),
-            username=self.user.username,
-            course_id=course_id
+        json_body = json.dumps([{
+            'user': self.user.username,
+            'mode': mode,
+            'is_active': True,
+            'course_details': {'course_id': course_id},
+        }])
+        httpretty.register_uri(
+            httpretty.GET, get_lms_enrollment_api_url(), body=json_body, content_type='application/json'
         )
-        json_body = json.dumps({'mode': mode, 'is_active': True})
-        httpretty.register_uri(httpretty.GET, url, body=json_body, content_type='application/json')
 
     def mock_enrollment_api_success_unenrolled(self, course_id, mode='audit'):
         """
         Returns a successful Enrollment API response indicating self.user is unenrolled in the specified course mode.
         """
         self.assertTrue(httpretty.is_enabled())
-        url = '{host}/{username},{course_id}'.format(
-            host=get_lms_enrollment_api_url(),
-            username=self.user.username,
-            course_id=course_id
+        json_body = json.dumps([{
+            'user': self.user.username,
+            'mode': mode,
+            'is_active': False,
+            'course_details': {'course_id': course_id},
+        }])
+        httpretty.register_uri(
+            httpretty.GET, get_lms_enrollment_api_url(), body=json_body, content_type='application/json'
         )
-        json_body = json.dumps({'mode': mode, 'is_active': False})
-        httpretty.register_uri(httpretty.GET, url, body=json_body, content_type='application/json')
 
     def test_login_required(self):
         """ The view should redirect to login page if the user is not logged in. """
@@ -189,6 +193,22 @@ class BasketSingleItemViewTests(CouponMixin, CourseCatalogTestMixin, LmsApiMockM
         self.assertEqual(response.wsgi_request.path_info, '/basket/single-item/')
         self.assertEqual(response.wsgi_request.GET['sku'], sku)
 
+    @httpretty.activate
+    def test_enrollments_cached(self):
+        """ Verify the enrollments of the student are retrieved from the Enrollment API once per cache timeout. """
+        self.mock_enrollment_api_success_unenrolled(self.course.id)
+        url = '{path}?sku={sku}'.format(path=self.path, sku=self.stock_record.partner_sku)
+
+        for __ in range(3):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 303)
+
+        enrollment_requests = [
+            request for request in httpretty.httpretty.latest_requests
+            if request.path.startswith('/api/enrollment/v1/enrollment')
+        ]
+        self.assertEqual(len(enrollment_requests), 1)
+
     @httpretty.activate
     @ddt.data(ConnectionError, SlumberBaseException, Timeout)
     def test_enrollment_api_failure(self, error):
@@ -364,3 +384,28 @@ class BasketSummaryViewTests(CourseCatalogTestMixin, LmsApiMockMixin, ApiMockMix
         self.assertEqual(response.status_code, 200)
         cached_course_after = cache.get(cache_hash)
         self.assertEqual(cached_course_after['name'], self.course.name)
+
+    def test_course_api_calls(self):
+        """ Verify the courses of the basket are retrieved with one call per course missing from the cache. """
+        basket = factories.BasketFactory(owner=self.user, site=self.site)
+        for __ in range(10):
+            course = CourseFactory()
+            self.mock_course_api_response(course)
+            basket.add_product(self.create_seat(course), 1)
+        self.assertEqual(basket.lines.count(), 10)
+
+        def get_course_api_calls():
+            return [
+                request for request in httpretty.httpretty.latest_requests
+                if request.path.startswith('/api/courses/v1/courses/')
+            ]
+
+        response = self.client.get(self.path)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(get_course_api_calls()), 10)
+        self.assertTrue(all(line_data['course_name'] for __, line_data in response.context['formset_lines_data']))
+
+        httpretty.httpretty.latest_requests = []
+        response = self.client.get(self.path)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(get_course_api_calls()), 0)
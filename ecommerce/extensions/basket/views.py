@@ -11,9 +11,10 @@ from oscar.apps.basket.views import *  # pylint: disable=wildcard-import, unused
 from slumber.exceptions import SlumberBaseException
 
 from ecommerce.core.constants import ENROLLMENT_CODE_PRODUCT_CLASS_NAME, SEAT_PRODUCT_CLASS_NAME
+from ecommerce.core.site_cache import get_payment_processors
 from ecommerce.core.url_utils import get_lms_url
 from ecommerce.coupons.views import get_voucher_and_products_from_code
-from ecommerce.courses.utils import get_certificate_type_display_value, get_course_info_from_lms, mode_for_seat
+from ecommerce.courses.utils import get_certificate_type_display_value, get_courses_info_from_lms, mode_for_seat
 from ecommerce.extensions.analytics.utils import prepare_analytics_data
 from ecommerce.extensions.basket.utils import prepare_basket, get_basket_switch_data
 from ecommerce.extensions.offer.utils import format_benefit_value
@@ -100,32 +101,34 @@ class BasketSummaryView(BasketView):
         is_verification_required = is_bulk_purchase = False
         switch_link_text = partner_sku = ''
 
-        for line in lines:
-            course_key = CourseKey.from_string(line.product.attr.course_key)
+        course_keys = [CourseKey.from_string(line.product.attr.course_key) for line in lines]
+        courses = get_courses_info_from_lms(course_keys)
+        enable_enrollment_codes = self.request.site.siteconfiguration.enable_enrollment_codes
+        switch_product = None
+        applied_benefit = None
+
+        for line, course_key in zip(lines, course_keys):
             course_name = None
             image_url = None
             short_description = None
-            try:
-                course = get_course_info_from_lms(course_key)
+            course = courses.get(unicode(course_key))
+            if course:
                 image_url = get_lms_url(course['media']['course_image']['uri'])
                 short_description = course['short_description']
                 course_name = course['name']
-            except (ConnectionError, SlumberBaseException, Timeout):
-                logger.exception('Failed to retrieve data from Course API for course [%s].', course_key)
+            else:
+                logger.error('Failed to retrieve data from Course API for course [%s].', course_key)
 
             # Set to true if any course in basket has bulk purchase scenario
-            if line.product.get_product_class().name == ENROLLMENT_CODE_PRODUCT_CLASS_NAME and \
-                    self.request.site.siteconfiguration.enable_enrollment_codes:
+            if line.product.get_product_class().name == ENROLLMENT_CODE_PRODUCT_CLASS_NAME and enable_enrollment_codes:
                 is_bulk_purchase = True
-                # Iterate on message storage so all messages are marked as read
-                list(messages.get_messages(self.request))
-
-                # Get variables for alternative basket view
-                switch_link_text, partner_sku = get_basket_switch_data(line.product)
+                # The alternative basket view links to the last enrollment code of the basket
+                switch_product = line.product
 
             if line.has_discount:
-                benefit = self.request.basket.applied_offers().values()[0].benefit
-                benefit_value = format_benefit_value(benefit)
+                if applied_benefit is None:
+                    applied_benefit = self.request.basket.applied_offers().values()[0].benefit
+                benefit_value = format_benefit_value(applied_benefit)
             else:
                 benefit_value = None
 
@@ -140,23 +143,29 @@ class BasketSummaryView(BasketView):
                 'line': line,
             })
 
-            context.update({
-                'analytics_data': prepare_analytics_data(
-                    self.request.user,
-                    self.request.site.siteconfiguration.segment_key,
-                    unicode(course_key)
-                ),
-            })
-
             # Check product attributes to determine if ID verification is required for this basket
             try:
                 is_verification_required = is_verification_required or line.product.attr.id_verification_required
             except AttributeError:
                 pass
 
+        if is_bulk_purchase:
+            # Iterate on message storage so all messages are marked as read
+            list(messages.get_messages(self.request))
+
+            # Get variables for alternative basket view
+            switch_link_text, partner_sku = get_basket_switch_data(switch_product)
+
+        if course_keys:
+            context['analytics_data'] = prepare_analytics_data(
+                self.request.user,
+                self.request.site.siteconfiguration.segment_key,
+                unicode(course_keys[-1])
+            )
+
         context.update({
             'free_basket': context['order_total'].incl_tax == 0,
-            'payment_processors': self.request.site.siteconfiguration.get_payment_processors(),
+            'payment_processors': get_payment_processors(self.request.site),
             'homepage_url': get_lms_url(''),
             'formset_lines_data': zip(formset, lines_data),
             'is_verification_required': is_verification_required,
@@ -0,0 +1,28 @@
+from __future__ import unicode_literals
+import logging
+from optparse import make_option
+
+from django.core.management import BaseCommand
+
+from ecommerce.extensions.catalogue.utils import backfill_seat_attributes
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Rebuild the seat attributes of all products."""
+
+    help = 'Rebuild the denormalized seat attributes of all products from their product attribute values.'
+    option_list = BaseCommand.option_list + (
+        make_option('--batch-size',
+                    action='store',
+                    dest='batch_size',
+                    type='int',
+                    default=500,
+                    help='Number of products whose seat attributes are rebuilt per batch.'),
+    )
+
+    def handle(self, *args, **options):
+        created = backfill_seat_attributes(batch_size=options['batch_size'])
+        logger.info('Rebuilt seat attributes of [%d] products.', created)
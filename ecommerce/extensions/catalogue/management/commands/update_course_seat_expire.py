@@ -1,11 +1,16 @@
 from __future__ import unicode_literals
 import logging
+from multiprocessing.pool import ThreadPool
+import threading
 import time
 from optparse import make_option
 
 from dateutil import parser
 from django.core.management import BaseCommand, CommandError
+from django.db.models import Case, DateTimeField, Value, When
+from django.utils import timezone
 from edx_rest_api_client.client import EdxRestApiClient
+from oscar.core.loading import get_model
 from slumber.exceptions import HttpClientError
 
 from ecommerce.core.url_utils import get_lms_url
@@ -13,6 +18,53 @@ from ecommerce.courses.models import Course
 
 
 logger = logging.getLogger(__name__)
+Product = get_model('catalogue', 'Product')
+
+
+class AdaptiveRateLimiter(object):
+    """
+    Space out the API calls made by several threads, backing off when the API rate-limits them.
+
+    The interval between calls grows every time a call is rate-limited, and shrinks back
+    towards the minimum interval as calls succeed again.
+    """
+
+    def __init__(self, min_interval=0.0, max_interval=60.0):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self._next_call = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """ Block until the next call is allowed. """
+        with self._lock:
+            now = time.time()
+            delay = self._next_call - now
+            self._next_call = max(now, self._next_call) + self.interval
+
+        if delay > 0:
+            time.sleep(delay)
+
+    def throttled(self, pause_time):
+        """
+        Record a rate-limited call, and pause all calls.
+
+        Arguments:
+            pause_time (int): Minimum number of seconds to pause for.
+
+        Returns:
+            float: The number of seconds calls are paused for.
+        """
+        with self._lock:
+            self.interval = min(max(self.interval * 2, pause_time), self.max_interval)
+            self._next_call = max(self._next_call, time.time() + self.interval)
+            return self.interval
+
+    def succeeded(self):
+        """ Record a successful call, speeding up the following calls. """
+        with self._lock:
+            self.interval = max(self.min_interval, self.interval / 2)
 
 
 class Command(BaseCommand):
@@ -25,7 +77,13 @@ class Command(BaseCommand):
                     dest='commit',
                     default=False,
                     help='Save the data to the database. If this is not set, '
-                         'expires date will not be updated'),
+                         'expires date will not be updated, and the seats that would be updated are only logged'),
+        make_option('--workers',
+                    action='store',
+                    dest='workers',
+                    type='int',
+                    default=4,
+                    help='Number of course enrollment pages retrieved concurrently.'),
     )
 
     ch = logging.StreamHandler()
@@ -34,45 +92,132 @@ class Command(BaseCommand):
     enrollment_date_not_found = set()
     pause_time = 5
     max_tries = 5
+    page_size = 50
+    # Number of courses whose seats are read and updated per query. Kept low enough for the
+    # seat IDs of a batch to stay below SQLite's limit of 999 variables per statement.
+    batch_size = 100
+    seats_to_update = ['honor', 'audit', 'no-id-professional', 'professional']
 
     def handle(self, *args, **options):
-        seats_to_update = ['honor', 'audit', 'no-id-professional', 'professional']
         save_to_db = options.get('commit', False)
-        courses_enrollment_info = self._get_courses_enrollment_info()
+        workers = options.get('workers', 4)
+        if workers < 1:
+            raise CommandError('The number of workers must be a positive integer.')
+
+        courses_enrollment_info = self._get_courses_enrollment_info(workers)
 
         if not courses_enrollment_info:
             msg = 'No course enrollment information found.'
             logger.error(msg)
             raise CommandError(msg)
 
-        courses = Course.objects.all().order_by('id')
-        logger.info('[%d] courses found for update.', courses.count())
+        courses_expires = dict(
+            (course_id, self._parse_expires(enrollment_end))
+            for course_id, enrollment_end in courses_enrollment_info.items()
+        )
+
+        logger.info('[%d] courses found for update.', Course.objects.count())
+
+        start = time.time()
+        updated_seats = 0
+        updated_courses = 0
+        for course_ids in self._iter_course_id_batches():
+            seats_by_course = self._get_seats_to_update(course_ids, courses_expires)
+
+            if save_to_db and seats_by_course:
+                self._update_seats(seats_by_course, courses_expires)
+
+            for course_id in course_ids:
+                seat_ids = seats_by_course.get(course_id)
+                if seat_ids:
+                    updated_seats += len(seat_ids)
+                    updated_courses += 1
+                    logger.info(
+                        'Updated expiration date for [%s] seats: [%s]' if save_to_db else
+                        'Expiration date would be updated for [%s] seats: [%s]',
+                        course_id,
+                        ', '.join([str(seat_id) for seat_id in seat_ids]),
+                    )
+
+        elapsed = time.time() - start
+        logger.info(
+            '%s [%d] seats of [%d] courses in [%.2f] seconds ([%.2f] rows per second).',
+            'Updated' if save_to_db else 'Dry run: would have updated',
+            updated_seats, updated_courses, elapsed, updated_seats / elapsed if elapsed else 0
+        )
+
+    def _parse_expires(self, enrollment_end):
+        """ Parse an enrollment end date, which naive dates are assumed to be in the default time zone. """
+        if not enrollment_end:
+            return None
+
+        expires = parser.parse(enrollment_end)
+        if timezone.is_naive(expires):
+            expires = timezone.make_aware(expires, timezone.get_default_timezone())
+        return expires
+
+    def _iter_course_id_batches(self):
+        """ Yield the IDs of all courses, in order, in batches of batch_size. """
+        last_id = ''
+        while True:
+            course_ids = list(
+                Course.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:self.batch_size]
+            )
+            if not course_ids:
+                return
+
+            yield course_ids
+            last_id = course_ids[-1]
+
+    def _get_seats_to_update(self, course_ids, courses_expires):
+        """
+        Retrieve the seats whose expiration date differs from the enrollment end date of their course.
 
-        for course in courses:
-            enrollment_end_date = courses_enrollment_info.get(course.id)
+        Courses without an enrollment end date are logged and skipped.
 
+        Returns:
+            dict: Map of course IDs to the list of IDs of their seats to update.
+        """
+        course_ids_with_expires = []
+        for course_id in course_ids:
             # Only proceed if course enrollment information is present
-            if not enrollment_end_date:
-                logger.error('Enrollment missing for course [%s]', course.id)
-                continue
-
-            if save_to_db:
-                course_seats = course.seat_products.filter(
-                    attributes__name='certificate_type',
-                    attribute_values__value_text__in=seats_to_update
-                )
-                expires = parser.parse(enrollment_end_date)
-                course_seats.update(expires=expires)
-                logger.info(
-                    'Updated expiration date for [%s] seats: [%s]',
-                    course.id,
-                    ', '.join([str(seat.id) for seat in course_seats]),
-                )
-
-    def _get_courses_enrollment_info(self):
+            if courses_expires.get(course_id):
+                course_ids_with_expires.append(course_id)
+            else:
+                logger.error('Enrollment missing for course [%s]', course_id)
+
+        seats = Product.objects.filter(
+            course_id__in=course_ids_with_expires,
+            seat_attributes__certificate_type__in=self.seats_to_update
+        ).order_by('course_id', '-date_created').values_list('id', 'course_id', 'expires')
+
+        seats_by_course = {}
+        for seat_id, course_id, expires in seats:
+            if expires != courses_expires[course_id]:
+                seats_by_course.setdefault(course_id, []).append(seat_id)
+
+        return seats_by_course
+
+    def _update_seats(self, seats_by_course, courses_expires):
+        """ Set the expiration date of the given seats to the enrollment end date of their course in one query. """
+        seat_ids = [seat_id for course_seat_ids in seats_by_course.values() for seat_id in course_seat_ids]
+        expires = Case(
+            *[When(course_id=course_id, then=Value(courses_expires[course_id])) for course_id in seats_by_course],
+            output_field=DateTimeField()
+        )
+        Product.objects.filter(id__in=seat_ids).update(expires=expires)
+
+    def _get_courses_enrollment_info(self, workers):
         """
         Retrieve the enrollment information for all the courses.
 
+        The first page tells how many pages there are; the remaining pages are then retrieved
+        concurrently, with the calls spaced out by a rate limiter that backs off when the API
+        answers with HTTP 429.
+
+        Arguments:
+            workers (int): Number of pages retrieved concurrently.
+
         Returns:
             Dictionary representing the key-value pair (course_key, enrollment_end) of course.
         """
@@ -86,34 +231,69 @@ class Command(BaseCommand):
             )
             return courses_enrollment, api_response['pagination'].get('next', None)
 
-        querystring = {'page_size': 50}
         api = EdxRestApiClient(get_lms_url('api/courses/v1/'))
-        course_enrollments = {}
+        rate_limiter = AdaptiveRateLimiter()
+        start = time.time()
 
-        page = 0
+        def _get_page(page):
+            return _parse_response(self._get_enrollment_page(api, rate_limiter, page))
+
+        response = self._get_enrollment_page(api, rate_limiter, 1)
+        course_enrollments, next_page = _parse_response(response)
+        pages = 1
+
+        num_pages = response['pagination'].get('num_pages')
+        if num_pages and num_pages > 1:
+            pool = ThreadPool(workers)
+            try:
+                for enrollment_info, __ in pool.imap_unordered(_get_page, range(2, num_pages + 1)):
+                    course_enrollments.update(enrollment_info)
+            finally:
+                pool.close()
+                pool.join()
+            pages = num_pages
+        else:
+            # Without the number of pages, the pages can only be followed one after the other.
+            while next_page:
+                pages += 1
+                enrollment_info, next_page = _get_page(pages)
+                course_enrollments.update(enrollment_info)
+
+        logger.debug(
+            'Retrieved enrollment information for [%d] courses from [%d] pages in [%.2f] seconds.',
+            len(course_enrollments), pages, time.time() - start
+        )
+        return course_enrollments
+
+    def _get_enrollment_page(self, api, rate_limiter, page):
+        """
+        Retrieve a page of course enrollment information.
+
+        When the API rate-limits the call, it is retried up to max_tries times, after pausing
+        for at least pause_time seconds.
+
+        Raises:
+            HttpClientError: If the call fails for another reason, or is rate-limited too many times.
+        """
         throttling_attempts = 0
-        next_page = True
-        while next_page:
-            page += 1
-            querystring['page'] = page
+        while True:
+            rate_limiter.wait()
             try:
-                response = api.courses().get(**querystring)
-                throttling_attempts = 0
+                response = api.courses().get(page=page, page_size=self.page_size)
             except HttpClientError as exc:
                 # this is a known limitation; If we get HTTP429, we need to pause execution for a few seconds
                 # before re-requesting the data. raise any other errors
                 if exc.response.status_code == 429 and throttling_attempts < self.max_tries:
+                    pause_time = rate_limiter.throttled(self.pause_time)
                     logger.warning(
                         'API calls are being rate-limited. Waiting for [%d] seconds before retrying...',
-                        self.pause_time
+                        pause_time
                     )
-                    time.sleep(self.pause_time)
-                    page -= 1
                     throttling_attempts += 1
                     logger.info('Retrying [%d]...', throttling_attempts)
                     continue
                 else:
                     raise
-            enrollment_info, next_page = _parse_response(response)
-            course_enrollments.update(enrollment_info)
-        return course_enrollments
+
+            rate_limiter.succeeded()
+            return response
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+from ecommerce.extensions.catalogue.utils import backfill_seat_attributes
+
+
+def populate_seat_attributes(apps, schema_editor):
+    """Populate the seat attributes of the existing products."""
+    backfill_seat_attributes()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalogue', '0019_enrollment_code_idverifyreq_attribute'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeatAttributes',
+            fields=[
+                ('product', models.OneToOneField(related_name='seat_attributes', primary_key=True, serialize=False, to='catalogue.Product')),
+                ('course_key', models.CharField(db_index=True, max_length=255, null=True, blank=True)),
+                ('certificate_type', models.CharField(max_length=255, null=True, blank=True)),
+                ('id_verification_required', models.NullBooleanField()),
+                ('credit_provider', models.CharField(max_length=255, null=True, blank=True)),
+                ('seat_type', models.CharField(max_length=255, null=True, blank=True)),
+            ],
+        ),
+        migrations.AlterIndexTogether(
+            name='seatattributes',
+            index_together=set([('course_key', 'seat_type'), ('course_key', 'certificate_type')]),
+        ),
+        migrations.RunPython(populate_seat_attributes, migrations.RunPython.noop),
+    ]
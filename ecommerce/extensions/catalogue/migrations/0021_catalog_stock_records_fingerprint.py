@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+from ecommerce.extensions.catalogue.utils import backfill_catalog_fingerprints
+
+
+def populate_stock_records_fingerprint(apps, schema_editor):
+    """Compute the fingerprint of the existing catalogs."""
+    backfill_catalog_fingerprints()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalogue', '0020_seat_attributes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='catalog',
+            name='stock_records_fingerprint',
+            field=models.CharField(help_text='Hash of the partner and stock records of the catalog, used to find identical catalogs.', max_length=40, null=True, editable=False, db_index=True, blank=True),
+        ),
+        migrations.RunPython(populate_stock_records_fingerprint, migrations.RunPython.noop),
+    ]
@@ -16,10 +16,49 @@ class ProductAttributeValue(AbstractProductAttributeValue):
     history = HistoricalRecords()
 
 
+class SeatAttributes(models.Model):
+    """
+    Denormalized, indexed copy of the attributes used to look up course seats and enrollment codes.
+
+    Filtering products on these attributes through Oscar's attribute value tables requires a join
+    per attribute. The columns of this model mirror the product attribute values with the same
+    codes, and are kept in sync by the receivers in ecommerce.extensions.catalogue.signals.
+    """
+    ATTRIBUTE_CODES = ('course_key', 'certificate_type', 'id_verification_required', 'credit_provider', 'seat_type',)
+
+    product = models.OneToOneField('catalogue.Product', primary_key=True, related_name='seat_attributes')
+    course_key = models.CharField(max_length=255, null=True, blank=True, db_index=True)
+    certificate_type = models.CharField(max_length=255, null=True, blank=True)
+    id_verification_required = models.NullBooleanField()
+    credit_provider = models.CharField(max_length=255, null=True, blank=True)
+    seat_type = models.CharField(max_length=255, null=True, blank=True)
+
+    class Meta(object):
+        index_together = (
+            ('course_key', 'certificate_type'),
+            ('course_key', 'seat_type'),
+        )
+
+    def __unicode__(self):
+        return u'{product_id}: {course_key} {certificate_type}'.format(
+            product_id=self.product_id,
+            course_key=self.course_key,
+            certificate_type=self.certificate_type or self.seat_type
+        )
+
+
 class Catalog(models.Model):
     name = models.CharField(max_length=255)
     partner = models.ForeignKey('partner.Partner', related_name='catalogs')
     stock_records = models.ManyToManyField('partner.StockRecord', blank=True, related_name='catalogs')
+    stock_records_fingerprint = models.CharField(
+        max_length=40,
+        null=True,
+        blank=True,
+        db_index=True,
+        editable=False,
+        help_text=_('Hash of the partner and stock records of the catalog, used to find identical catalogs.')
+    )
 
     def __unicode__(self):
         return u'{id}: {partner_code}-{catalog_name}'.format(
@@ -0,0 +1,93 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from oscar.core.loading import get_model
+
+from ecommerce.extensions.catalogue.utils import get_catalog_fingerprint, update_catalog_fingerprints
+
+Catalog = get_model('catalogue', 'Catalog')
+ProductAttributeValue = get_model('catalogue', 'ProductAttributeValue')
+SeatAttributes = get_model('catalogue', 'SeatAttributes')
+StockRecord = get_model('partner', 'StockRecord')
+
+
+@receiver(post_save, sender=ProductAttributeValue)
+def update_seat_attributes(*_args, **kwargs):
+    """
+    Copy the saved value of a seat attribute to the seat attributes of its product.
+
+    Product attribute values are saved after the product itself, which is why
+    the product attribute values, rather than the products, are tracked.
+    """
+    attribute_value = kwargs['instance']
+    code = attribute_value.attribute.code
+    if code not in SeatAttributes.ATTRIBUTE_CODES:
+        return
+
+    fields = {code: attribute_value.value}
+    if not SeatAttributes.objects.filter(product_id=attribute_value.product_id).update(**fields):
+        SeatAttributes.objects.create(product_id=attribute_value.product_id, **fields)
+
+
+@receiver(post_delete, sender=ProductAttributeValue)
+def clear_seat_attribute(*_args, **kwargs):
+    """ Clear a deleted seat attribute value from the seat attributes of its product. """
+    attribute_value = kwargs['instance']
+    code = attribute_value.attribute.code
+    if code in SeatAttributes.ATTRIBUTE_CODES:
+        # Rows are never created here, since the product itself may be in the process of being deleted.
+        SeatAttributes.objects.filter(product_id=attribute_value.product_id).update(**{code: None})
+
+
+@receiver(post_save, sender=Catalog)
+def set_catalog_fingerprint(*_args, **kwargs):
+    """
+    Set the fingerprint of a saved catalog.
+
+    Catalogs created without a fingerprint have no stock records yet. The fingerprint of
+    existing catalogs is recomputed, since their partner may have changed.
+    """
+    catalog = kwargs['instance']
+    if kwargs['created']:
+        if catalog.stock_records_fingerprint is not None:
+            return
+        stock_record_ids = []
+    else:
+        stock_record_ids = catalog.stock_records.values_list('id', flat=True)
+
+    catalog.stock_records_fingerprint = get_catalog_fingerprint(catalog.partner_id, stock_record_ids)
+    Catalog.objects.filter(id=catalog.id).update(stock_records_fingerprint=catalog.stock_records_fingerprint)
+
+
+@receiver(m2m_changed, sender=Catalog.stock_records.through)
+def update_catalog_fingerprint(*_args, **kwargs):
+    """ Update the fingerprint of the catalogs whose stock records are changed. """
+    action = kwargs['action']
+    instance = kwargs['instance']
+
+    if not kwargs['reverse']:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            stock_record_ids = instance.stock_records.values_list('id', flat=True)
+            instance.stock_records_fingerprint = get_catalog_fingerprint(instance.partner_id, stock_record_ids)
+            Catalog.objects.filter(id=instance.id).update(stock_records_fingerprint=instance.stock_records_fingerprint)
+        return
+
+    # The stock records of several catalogs are changed from a stock record.
+    if action == 'pre_clear':
+        instance._cleared_catalog_ids = list(instance.catalogs.values_list('id', flat=True))
+    elif action == 'post_clear':
+        update_catalog_fingerprints(instance.__dict__.pop('_cleared_catalog_ids', []))
+    elif action in ('post_add', 'post_remove'):
+        update_catalog_fingerprints(kwargs['pk_set'])
+
+
+@receiver(pre_delete, sender=StockRecord)
+def collect_stock_record_catalogs(*_args, **kwargs):
+    """ Remember the catalogs of a stock record being deleted, whose rows are deleted without m2m_changed. """
+    instance = kwargs['instance']
+    instance._deleted_catalog_ids = list(instance.catalogs.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=StockRecord)
+def update_deleted_stock_record_catalogs(*_args, **kwargs):
+    """ Update the fingerprint of the catalogs of a deleted stock record. """
+    update_catalog_fingerprints(kwargs['instance'].__dict__.pop('_deleted_catalog_ids', []))
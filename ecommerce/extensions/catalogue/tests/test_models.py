@@ -0,0 +1,89 @@
+from __future__ import unicode_literals
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from oscar.core.loading import get_model
+
+from ecommerce.core.constants import ENROLLMENT_CODE_SWITCH
+from ecommerce.core.tests import toggle_switch
+from ecommerce.courses.tests.factories import CourseFactory
+from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
+from ecommerce.tests.testcases import TestCase
+
+Product = get_model('catalogue', 'Product')
+SeatAttributes = get_model('catalogue', 'SeatAttributes')
+
+
+class SeatAttributesTests(CourseCatalogTestMixin, TestCase):
+    def setUp(self):
+        super(SeatAttributesTests, self).setUp()
+        self.course = CourseFactory()
+
+    def assert_seat_attributes(self, seat, **expected):
+        """ Verify the seat attributes of the seat match the expected values. """
+        seat_attributes = SeatAttributes.objects.get(product=seat)
+        for field, value in expected.items():
+            self.assertEqual(getattr(seat_attributes, field), value)
+
+    def test_seat_attributes_synced_on_save(self):
+        """ Verify the seat attributes follow the product attribute values of a seat. """
+        seat = self.course.create_or_update_seat('credit', True, 100, self.partner, credit_provider='MIT')
+        self.assert_seat_attributes(
+            seat,
+            course_key=self.course.id,
+            certificate_type='credit',
+            id_verification_required=True,
+            credit_provider='MIT',
+            seat_type=None
+        )
+
+        seat.attr.credit_provider = 'ASU'
+        seat.save()
+        self.assert_seat_attributes(seat, credit_provider='ASU')
+
+        seat.attr.credit_provider = None
+        seat.save()
+        self.assert_seat_attributes(seat, credit_provider=None, certificate_type='credit')
+
+    def test_enrollment_code_seat_type(self):
+        """ Verify the seat type of enrollment codes is part of the seat attributes. """
+        toggle_switch(ENROLLMENT_CODE_SWITCH, True)
+        self.course.create_or_update_seat('verified', True, 50, self.partner, create_enrollment_code=True)
+        enrollment_code = Product.objects.get(product_class=self.enrollment_code_product_class)
+        self.assert_seat_attributes(
+            enrollment_code, course_key=self.course.id, seat_type='verified', certificate_type=None
+        )
+
+    def test_seat_attributes_deleted_with_product(self):
+        """ Verify deleting a seat deletes its seat attributes. """
+        seat = self.course.create_or_update_seat('verified', True, 50, self.partner)
+        seat.delete()
+        self.assertFalse(SeatAttributes.objects.filter(product_id=seat.id).exists())
+
+    def test_lookup_joins(self):
+        """ Verify looking up a seat through the seat attributes joins a single table, instead of one per attribute. """
+        seat = self.course.create_or_update_seat('verified', True, 50, self.partner)
+
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(
+                Product.objects.get(
+                    seat_attributes__course_key=self.course.id,
+                    seat_attributes__certificate_type='verified',
+                    seat_attributes__id_verification_required=True
+                ),
+                seat
+            )
+        self.assertEqual(context.captured_queries[0]['sql'].count('JOIN'), 1)
+
+        with CaptureQueriesContext(connection) as context:
+            Product.objects.filter(
+                attributes__name='course_key',
+                attribute_values__value_text=self.course.id
+            ).filter(
+                attributes__name='id_verification_required',
+                attribute_values__value_boolean=True
+            ).get(
+                attributes__name='certificate_type',
+                attribute_values__value_text='verified'
+            )
+        self.assertGreater(context.captured_queries[0]['sql'].count('JOIN'), 4)
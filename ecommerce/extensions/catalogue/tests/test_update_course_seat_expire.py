@@ -51,6 +51,13 @@ class UpdateSeatExpireDateTests(CourseCatalogTestMixin, TestCase):
         )
         self.professional_seat = self.course.create_or_update_seat('professional', False, 0, self.partner)
 
+    def assert_logged(self, log_capture, expected, summary):
+        """ Verify the expected messages were logged, followed by the given summary. Debug messages are ignored. """
+        actual = [record for record in log_capture.actual() if record[1] != 'DEBUG']
+        self.assertEqual(actual[:-1], expected)
+        self.assertEqual(actual[-1][:2], (LOGGER_NAME, 'INFO'))
+        self.assertTrue(actual[-1][2].startswith(summary), actual[-1][2])
+
     def mock_courses_api(self, status, body=None):
         """ Mock Courses API with specific status and body. """
         self.assertTrue(httpretty.is_enabled(), 'httpretty must be enabled to mock Course API calls.')
@@ -92,7 +99,7 @@ class UpdateSeatExpireDateTests(CourseCatalogTestMixin, TestCase):
 
         with LogCapture(LOGGER_NAME) as lc:
             call_command('update_course_seat_expire', commit=True)
-            lc.check(*expected)
+            self.assert_logged(lc, expected, 'Updated [2] seats of [1] courses in ')
 
         # Verify course seats have been updated
         for seat in seats_expected_to_update:
@@ -119,11 +126,19 @@ class UpdateSeatExpireDateTests(CourseCatalogTestMixin, TestCase):
                 'INFO',
                 '[1] courses found for update.'
             ),
+            (
+                LOGGER_NAME,
+                'INFO',
+                'Expiration date would be updated for [{}] seats: [{}]'.format(
+                    self.course.id,
+                    ', '.join([str(seat.id) for seat in seats_expected_to_update])
+                )
+            ),
         ]
 
         with LogCapture(LOGGER_NAME) as lc:
             call_command('update_course_seat_expire', commit=False)
-            lc.check(*expected)
+            self.assert_logged(lc, expected, 'Dry run: would have updated [2] seats of [1] courses in ')
 
         # Verify course seats have not been updated
         for seat in seats_expected_to_update:
@@ -177,7 +192,60 @@ class UpdateSeatExpireDateTests(CourseCatalogTestMixin, TestCase):
 
         with LogCapture(LOGGER_NAME) as lc:
             call_command('update_course_seat_expire')
-            lc.check(*expected)
+            self.assert_logged(lc, expected, 'Dry run: would have updated [0] seats of [0] courses in ')
+
+    @httpretty.activate
+    def test_update_only_changed_seats(self):
+        """ Verify seats whose expiration date already matches the enrollment end date are left alone. """
+        self.mock_courses_api(status=200, body=self.course_info)
+        call_command('update_course_seat_expire', commit=True)
+
+        second_course = CourseFactory()
+        second_seat = second_course.create_or_update_seat('audit', False, 0, self.partner)
+        self.course_info['results'].append({'enrollment_end': unicode(self.expire_date), 'course_id': second_course.id})
+        self.mock_courses_api(status=200, body=self.course_info)
+
+        with LogCapture(LOGGER_NAME) as lc:
+            # The courses, their seats, and the seats to update are each retrieved or updated with one query.
+            with self.assertNumQueries(5):
+                call_command('update_course_seat_expire', commit=True)
+            self.assert_logged(
+                lc,
+                [
+                    (LOGGER_NAME, 'INFO', '[2] courses found for update.'),
+                    (
+                        LOGGER_NAME, 'INFO',
+                        'Updated expiration date for [{}] seats: [{}]'.format(second_course.id, second_seat.id)
+                    ),
+                ],
+                'Updated [1] seats of [1] courses in '
+            )
+
+        self.assertEqual(Product.objects.get(id=second_seat.id).expires, self.expire_date)
+
+    @httpretty.activate
+    def test_concurrent_pages(self):
+        """ Verify the pages after the first are retrieved concurrently once their number is known. """
+        courses = [self.course] + CourseFactory.create_batch(2)
+        url = get_lms_url('/api/courses/v1/courses/')
+        responses = []
+        for index, course in enumerate(courses):
+            body = {
+                'pagination': {'num_pages': len(courses), 'next': None},
+                'results': [{'enrollment_end': unicode(self.expire_date), 'course_id': course.id}],
+            }
+            responses.append(httpretty.Response(body=json.dumps(body), content_type=JSON))
+            course.create_or_update_seat('audit', False, 0, self.partner)
+        httpretty.register_uri(httpretty.GET, url, responses=responses)
+
+        call_command('update_course_seat_expire', commit=True, workers=2)
+
+        self.assertEqual(len(httpretty.httpretty.latest_requests), len(courses))
+        requested_pages = sorted(int(request.querystring['page'][0]) for request in httpretty.httpretty.latest_requests)
+        self.assertEqual(requested_pages, [1, 2, 3])
+        for course in courses:
+            for seat in course.seat_products.filter(seat_attributes__certificate_type='audit'):
+                self.assertEqual(seat.expires, self.expire_date)
 
     @httpretty.activate
     @mock.patch(
@@ -190,7 +258,7 @@ class UpdateSeatExpireDateTests(CourseCatalogTestMixin, TestCase):
         new_callable=mock.PropertyMock,
         return_value=1
     )
-    def test_update_course_with_exception(self, mock_max_tries, mock_pause_time):
+    def test_update_course_with_exception(self, mock_pause_time, mock_max_tries):
         """
         Verify that management command logs throttling errors when rate-limit to API
         exceeds.
@@ -213,5 +281,7 @@ class UpdateSeatExpireDateTests(CourseCatalogTestMixin, TestCase):
                 call_command('update_course_seat_expire')
                 lc.check(*expected)
 
+        # The page is retried once, after pausing, before the error is raised.
         self.assertEqual(mock_max_tries.call_count, 2)
-        self.assertEqual(mock_pause_time.call_count, 2)
+        self.assertEqual(mock_pause_time.call_count, 1)
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 2)
@@ -6,14 +6,18 @@ from oscar.core.loading import get_model
 
 from ecommerce.coupons.tests.mixins import CouponMixin
 from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
-from ecommerce.extensions.catalogue.utils import generate_sku, get_or_create_catalog
-from ecommerce.tests.factories import ProductFactory
+from ecommerce.extensions.catalogue.utils import (
+    backfill_catalog_fingerprints, backfill_seat_attributes, generate_sku, get_catalog_fingerprint,
+    get_or_create_catalog
+)
+from ecommerce.tests.factories import PartnerFactory, ProductFactory
 from ecommerce.tests.testcases import TestCase
 
 Benefit = get_model('offer', 'Benefit')
 Catalog = get_model('catalogue', 'Catalog')
 Course = get_model('courses', 'Course')
 Product = get_model('catalogue', 'Product')
+SeatAttributes = get_model('catalogue', 'SeatAttributes')
 StockRecord = get_model('partner', 'StockRecord')
 Voucher = get_model('voucher', 'Voucher')
 
@@ -54,6 +58,19 @@ class UtilsTests(CourseCatalogTestMixin, TestCase):
         actual = generate_sku(product, self.partner)
         self.assertEqual(actual, expected)
 
+    def test_backfill_seat_attributes(self):
+        """Verify the seat attributes of all products are rebuilt from their product attribute values."""
+        expected = SeatAttributes.objects.count()
+        SeatAttributes.objects.all().delete()
+        coupon = ProductFactory()
+
+        self.assertEqual(backfill_seat_attributes(batch_size=1), expected)
+        seat_attributes = SeatAttributes.objects.get(product=self.seat)
+        self.assertEqual(seat_attributes.course_key, COURSE_ID)
+        self.assertEqual(seat_attributes.certificate_type, 'verified')
+        self.assertFalse(seat_attributes.id_verification_required)
+        self.assertFalse(SeatAttributes.objects.filter(product=coupon).exists())
+
     def test_get_or_create_catalog(self):
         """Verify that the proper catalog is fetched."""
         stock_record = self.seat.stockrecords.first()
@@ -83,6 +100,71 @@ class UtilsTests(CourseCatalogTestMixin, TestCase):
         self.assertTrue(created)
         self.assertNotEqual(self.catalog, new_catalog)
         self.assertEqual(Catalog.objects.count(), 2)
+        self.assertEqual(set(new_catalog.stock_records.all()), {stock_record, stock_record_2})
+
+    def test_get_or_create_catalog_queries(self):
+        """Verify catalogs are found with a single query, however many catalogs there are."""
+        stock_record = self.seat.stockrecords.first()
+        self.catalog.stock_records.add(stock_record)
+        Catalog.objects.bulk_create([Catalog(name='Test', partner=self.partner) for __ in range(10)])
+
+        with self.assertNumQueries(1):
+            catalog, created = get_or_create_catalog(
+                name='Test',
+                partner=self.partner,
+                stock_record_ids=[str(stock_record.id)]
+            )
+        self.assertFalse(created)
+        self.assertEqual(catalog, self.catalog)
+
+    def test_get_or_create_catalog_missing_stock_record(self):
+        """Verify no catalog is created for stock records that do not exist."""
+        with self.assertRaises(StockRecord.DoesNotExist):
+            get_or_create_catalog(name='Test', partner=self.partner, stock_record_ids=[0])
+        self.assertEqual(Catalog.objects.count(), 1)
+
+    def test_catalog_fingerprint(self):
+        """Verify the fingerprint of a catalog follows the changes of its stock records."""
+        stock_record = self.seat.stockrecords.first()
+        self.assertEqual(self.catalog.stock_records_fingerprint, get_catalog_fingerprint(self.partner.id, []))
+
+        self.catalog.stock_records.add(stock_record)
+        expected = get_catalog_fingerprint(self.partner.id, [stock_record.id])
+        self.assertEqual(Catalog.objects.get(id=self.catalog.id).stock_records_fingerprint, expected)
+
+        stock_record.catalogs.clear()
+        expected = get_catalog_fingerprint(self.partner.id, [])
+        self.assertEqual(Catalog.objects.get(id=self.catalog.id).stock_records_fingerprint, expected)
+
+        Catalog.objects.all().update(stock_records_fingerprint=None)
+        backfill_catalog_fingerprints(batch_size=1)
+        self.assertEqual(Catalog.objects.get(id=self.catalog.id).stock_records_fingerprint, expected)
+
+    def test_catalog_fingerprint_deleted_stock_record(self):
+        """Verify the fingerprint of a catalog follows the deletion of its stock records."""
+        stock_record = self.seat.stockrecords.first()
+        self.catalog.stock_records.add(stock_record)
+
+        stock_record.delete()
+        expected = get_catalog_fingerprint(self.partner.id, [])
+        self.assertEqual(Catalog.objects.get(id=self.catalog.id).stock_records_fingerprint, expected)
+
+    def test_catalog_fingerprint_changed_partner(self):
+        """Verify the fingerprint of a catalog follows the changes of its partner."""
+        stock_record = self.seat.stockrecords.first()
+        self.catalog.stock_records.add(stock_record)
+        partner = PartnerFactory()
+
+        self.catalog.partner = partner
+        self.catalog.save()
+        expected = get_catalog_fingerprint(partner.id, [stock_record.id])
+        self.assertEqual(Catalog.objects.get(id=self.catalog.id).stock_records_fingerprint, expected)
+
+        catalog, created = get_or_create_catalog(
+            name=self.catalog.name, partner=partner, stock_record_ids=[stock_record.id]
+        )
+        self.assertFalse(created)
+        self.assertEqual(catalog, self.catalog)
 
 
 class CouponUtilsTests(CouponMixin, CourseCatalogTestMixin, TestCase):
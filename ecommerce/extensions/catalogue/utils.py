@@ -1,12 +1,16 @@
 from __future__ import unicode_literals
 
-from hashlib import md5
+from hashlib import md5, sha1
 
+from django.db import transaction
 from oscar.core.loading import get_model
 
 from ecommerce.core.constants import ENROLLMENT_CODE_PRODUCT_CLASS_NAME, SEAT_PRODUCT_CLASS_NAME
 
 Catalog = get_model('catalogue', 'Catalog')
+Product = get_model('catalogue', 'Product')
+ProductAttributeValue = get_model('catalogue', 'ProductAttributeValue')
+SeatAttributes = get_model('catalogue', 'SeatAttributes')
 StockRecord = get_model('partner', 'StockRecord')
 
 
@@ -49,20 +53,155 @@ def generate_sku(product, partner):
     return digest.upper()
 
 
+def get_catalog_fingerprint(partner_id, stock_record_ids):
+    """
+    Return the fingerprint of a catalog of the given partner and stock records.
+
+    Catalogs have the same fingerprint if, and only if, they have the same partner and stock records.
+
+    Arguments:
+        partner_id (int): ID of the partner of the catalog.
+        stock_record_ids (iterable): IDs of the stock records of the catalog.
+
+    Returns:
+        str
+    """
+    stock_record_ids = ','.join(str(stock_record_id) for stock_record_id in sorted(set(stock_record_ids)))
+    return sha1('{}:{}'.format(partner_id, stock_record_ids)).hexdigest()
+
+
+def update_catalog_fingerprints(catalog_ids):
+    """
+    Recompute the fingerprint of the given catalogs from their partner and stock records.
+
+    Arguments:
+        catalog_ids (iterable): IDs of the catalogs to update.
+    """
+    catalog_ids = list(catalog_ids)
+    stock_record_ids = {}
+    for catalog_id, stock_record_id in Catalog.stock_records.through.objects.filter(
+            catalog_id__in=catalog_ids
+    ).values_list('catalog_id', 'stockrecord_id'):
+        stock_record_ids.setdefault(catalog_id, []).append(stock_record_id)
+
+    for catalog_id, partner_id in Catalog.objects.filter(id__in=catalog_ids).values_list('id', 'partner_id'):
+        Catalog.objects.filter(id=catalog_id).update(
+            stock_records_fingerprint=get_catalog_fingerprint(partner_id, stock_record_ids.get(catalog_id, []))
+        )
+
+
+def backfill_catalog_fingerprints(batch_size=500):
+    """
+    Compute the fingerprint of all catalogs, in batches of catalogs.
+
+    Arguments:
+        batch_size (int): Number of catalogs whose fingerprint is computed per batch.
+    """
+    catalog_ids = Catalog.objects.order_by('id').values_list('id', flat=True)
+    last_id = 0
+
+    while True:
+        batch = list(catalog_ids.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            return
+
+        update_catalog_fingerprints(batch)
+        last_id = batch[-1]
+
+
 def get_or_create_catalog(name, partner, stock_record_ids):
     """
     Returns the catalog which has the same name, partner and stock records.
     If there isn't one with that data, creates and returns a new one.
+
+    Catalogs are found by the fingerprint of their partner and stock records.
+
+    Raises:
+        StockRecord.DoesNotExist: If any of the stock records does not exist.
     """
-    catalogs = Catalog.objects.all()
-    stock_records = [StockRecord.objects.get(id=id) for id in stock_record_ids]  # pylint: disable=redefined-builtin
+    stock_record_ids = set(int(stock_record_id) for stock_record_id in stock_record_ids)
+    fingerprint = get_catalog_fingerprint(partner.id, stock_record_ids)
+
+    catalog = Catalog.objects.filter(name=name, partner=partner, stock_records_fingerprint=fingerprint).first()
+    if catalog:
+        return catalog, False
 
-    for catalog in catalogs:
-        if catalog.name == name and catalog.partner == partner:
-            if set(catalog.stock_records.all()) == set(stock_records):
-                return catalog, False
+    if StockRecord.objects.filter(id__in=stock_record_ids).count() != len(stock_record_ids):
+        raise StockRecord.DoesNotExist
 
-    catalog = Catalog.objects.create(name=name, partner=partner)
-    for stock_record in stock_records:
-        catalog.stock_records.add(stock_record)
+    CatalogStockRecord = Catalog.stock_records.through
+    with transaction.atomic():
+        catalog = Catalog.objects.create(name=name, partner=partner, stock_records_fingerprint=fingerprint)
+        CatalogStockRecord.objects.bulk_create([
+            CatalogStockRecord(catalog_id=catalog.id, stockrecord_id=stock_record_id)
+            for stock_record_id in stock_record_ids
+        ])
     return catalog, True
+
+
+def initialize_product_attributes(products):
+    """
+    Initialise the attributes of products from their prefetched attribute values.
+
+    Oscar loads the attributes of a product with a query of its own, even when the attribute values
+    have been prefetched. The products should have been retrieved with their `attribute_values`,
+    and the attribute of each value, prefetched.
+
+    Arguments:
+        products (iterable): Products whose attributes should be initialised.
+    """
+    for product in products:
+        for attribute_value in product.attribute_values.all():
+            setattr(product.attr, attribute_value.attribute.code, attribute_value.value)
+        product.attr.initialised = True
+
+
+def sync_seat_attributes(product_ids):
+    """
+    Rebuild the seat attributes of the given products from their product attribute values.
+
+    Arguments:
+        product_ids (list): IDs of the products whose seat attributes should be rebuilt.
+
+    Returns:
+        int: Number of seat attributes created.
+    """
+    attribute_values = ProductAttributeValue.objects.filter(
+        product_id__in=product_ids,
+        attribute__code__in=SeatAttributes.ATTRIBUTE_CODES
+    ).values_list('product_id', 'attribute__code', 'attribute__type', 'value_text', 'value_boolean')
+
+    seat_attributes = {}
+    for product_id, code, attribute_type, value_text, value_boolean in attribute_values:
+        value = value_boolean if attribute_type == 'boolean' else value_text
+        seat_attributes.setdefault(product_id, SeatAttributes(product_id=product_id))
+        setattr(seat_attributes[product_id], code, value)
+
+    with transaction.atomic():
+        SeatAttributes.objects.filter(product_id__in=product_ids).delete()
+        SeatAttributes.objects.bulk_create(seat_attributes.values())
+
+    return len(seat_attributes)
+
+
+def backfill_seat_attributes(batch_size=500):
+    """
+    Rebuild the seat attributes of all products, in batches of products.
+
+    Arguments:
+        batch_size (int): Number of products whose seat attributes are rebuilt per batch.
+
+    Returns:
+        int: Number of seat attributes created.
+    """
+    product_ids = Product.objects.order_by('id').values_list('id', flat=True)
+    created = 0
+    last_id = 0
+
+    while True:
+        batch = list(product_ids.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            return created
+
+        created += sync_seat_attributes(batch)
+        last_id = batch[-1]
@@ -1,20 +1,24 @@
 import logging
 
 from django.conf import settings
+from django.db.models import Prefetch
 from django.dispatch import receiver
-from oscar.core.loading import get_class
+from oscar.core.loading import get_class, get_model
 from threadlocals import threadlocals
 import waffle
 
 from ecommerce.core.url_utils import get_lms_url
 from ecommerce.courses.utils import mode_for_seat
+from ecommerce.extensions.analytics.events import pipeline
 from ecommerce.extensions.analytics.utils import is_segment_configured, parse_tracking_context, silence_exceptions
+from ecommerce.extensions.catalogue.utils import initialize_product_attributes
 from ecommerce.extensions.checkout.utils import get_provider_data
 from ecommerce.notifications.notifications import send_notification
 
 
 logger = logging.getLogger(__name__)
 post_checkout = get_class('checkout.signals', 'post_checkout')
+ProductAttributeValue = get_model('catalogue', 'ProductAttributeValue')
 
 # Number of orders currently supported for the email notifications
 ORDER_LINE_COUNT = 1
@@ -29,7 +33,16 @@ def track_completed_order(sender, order=None, **kwargs):  # pylint: disable=unus
 
     user_tracking_id, lms_client_id, lms_ip = parse_tracking_context(order.user)
 
-    order.site.siteconfiguration.segment_client.track(
+    # The payload is captured now, while the event is delivered by the analytics pipeline.
+    lines = list(order.lines.select_related(
+        'product__course', 'product__product_class', 'product__parent__product_class'
+    ).prefetch_related(
+        Prefetch('product__attribute_values', queryset=ProductAttributeValue.objects.select_related('attribute'))
+    ))
+    initialize_product_attributes([line.product for line in lines])
+
+    pipeline.track(
+        order.site.siteconfiguration.segment_client,
         user_tracking_id,
         'Completed Order',
         {
@@ -48,7 +61,7 @@ def track_completed_order(sender, order=None, **kwargs):  # pylint: disable=unus
                     'price': str(line.line_price_excl_tax),
                     'quantity': line.quantity,
                     'category': line.product.get_product_class().name,
-                } for line in order.lines.all()
+                } for line in lines
             ],
         },
         context={
@@ -2,10 +2,13 @@
 Tests for the ecommerce.extensions.checkout.mixins module.
 """
 from decimal import Decimal
+import time
 
 from mock import Mock, patch
 from django.core import mail
-from django.test import RequestFactory
+from django.db import connection
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
 from oscar.core.loading import get_model
 from oscar.test import factories
 from oscar.test.newfactories import BasketFactory, ProductFactory, UserFactory
@@ -13,8 +16,10 @@ from testfixtures import LogCapture
 from waffle.models import Sample
 
 from ecommerce.core.models import SegmentClient
+from ecommerce.extensions.analytics.events import pipeline
 from ecommerce.extensions.checkout.exceptions import BasketNotFreeError
 from ecommerce.extensions.checkout.mixins import EdxOrderPlacementMixin
+from ecommerce.extensions.checkout.signals import track_completed_order
 from ecommerce.extensions.fulfillment.status import ORDER
 from ecommerce.extensions.refund.tests.mixins import RefundTestMixin
 from ecommerce.tests.factories import SiteConfigurationFactory
@@ -169,6 +174,45 @@ class EdxOrderPlacementMixinTests(BusinessIntelligenceMixin, RefundTestMixin, Te
         # ensure we logged a warning.
         self.assertTrue(mock_log_exc.called_with("Failed to emit tracking event upon order placement."))
 
+    def test_handle_successful_order_analytics_latency(self, mock_track):
+        """
+        Verify that placing an order does not wait for the tracking event to be delivered.
+        """
+        latency = 0.5
+        mock_track.side_effect = lambda *args, **kwargs: time.sleep(latency)
+
+        with override_settings(ANALYTICS_EVENT_QUEUE_SIZE=10):
+            start = time.time()
+            EdxOrderPlacementMixin().handle_successful_order(self.order)
+            elapsed = time.time() - start
+
+            self.assertLess(elapsed, latency)
+            pipeline.flush()
+
+        self.assert_correct_event(
+            mock_track,
+            self.order,
+            'ecommerce-{}'.format(self.user.id),
+            None,
+            None,
+            self.order.number,
+            self.order.currency,
+            self.order.total_excl_tax
+        )
+
+    def test_track_completed_order_queries(self, mock_track):
+        """
+        Verify that the number of queries made to capture a tracking event does not depend on the number of lines.
+        """
+        def count_queries(order):
+            with CaptureQueriesContext(connection) as context:
+                track_completed_order(None, order=order)
+            return len(context.captured_queries)
+
+        order = self.create_order(multiple_lines=True, status=ORDER.OPEN)
+        self.assertEqual(count_queries(self.order), count_queries(order))
+        self.assertEqual(mock_track.call_count, 2)
+
     def test_handle_successful_async_order(self, __):
         """
         Verify that a Waffle Sample can be used to control async order fulfillment.
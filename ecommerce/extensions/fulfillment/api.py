@@ -89,20 +89,64 @@ def fulfill_order(order, lines):
         return order  # pylint: disable=lost-exception
 
 
-def get_fulfillment_modules():
-    """ Retrieves all fulfillment modules declared in settings. """
-    module_paths = getattr(settings, 'FULFILLMENT_MODULES', [])
-    modules = []
+class FulfillmentModuleRegistry(object):
+    """
+    Registry of the fulfillment modules declared in settings.
+
+    Module classes are imported once, and imported again only when FULFILLMENT_MODULES changes. The modules
+    supporting a line are resolved once per product class, since fulfillment modules support lines based on
+    the class of their product.
+    """
+
+    def __init__(self):
+        self._module_paths = None
+        self._modules = []
+        self._modules_by_product_class = {}
+
+    def _load_modules(self, module_paths):
+        modules = []
+
+        for cls_path in module_paths:
+            try:
+                module_path, _, name = cls_path.rpartition('.')
+                module = getattr(importlib.import_module(module_path), name)
+                modules.append(module)
+            except (ImportError, ValueError, AttributeError):
+                logger.exception("Could not load module at [%s]", cls_path)
+
+        return modules
+
+    def get_modules(self):
+        """ Returns the fulfillment module classes declared in settings. """
+        module_paths = tuple(getattr(settings, 'FULFILLMENT_MODULES', []))
 
-    for cls_path in module_paths:
-        try:
-            module_path, _, name = cls_path.rpartition('.')
-            module = getattr(importlib.import_module(module_path), name)
-            modules.append(module)
-        except (ImportError, ValueError, AttributeError):
-            logger.exception("Could not load module at [%s]", cls_path)
+        if module_paths != self._module_paths:
+            self._modules = self._load_modules(module_paths)
+            self._modules_by_product_class = {}
+            self._module_paths = module_paths
 
-    return modules
+        return list(self._modules)
+
+    def get_modules_for_line(self, line):
+        """ Returns the fulfillment module classes that can fulfill the given Line. """
+        modules = self.get_modules()
+        product = line.product
+        product_class_id = product.parent.product_class_id if product.is_child else product.product_class_id
+
+        if product_class_id not in self._modules_by_product_class:
+            self._modules_by_product_class[product_class_id] = [
+                module for module in modules if module().supports_line(line)
+            ]
+
+        return list(self._modules_by_product_class[product_class_id])
+
+
+registry = FulfillmentModuleRegistry()
+
+
+def get_fulfillment_modules():
+    """ Retrieves all fulfillment modules declared in settings. """
+    return registry.get_modules()
 
 
 def get_fulfillment_modules_for_line(line):
@@ -112,7 +156,7 @@ def get_fulfillment_modules_for_line(line):
     Arguments
         line (Line): Line to be considered for fulfillment.
     """
-    return [module for module in get_fulfillment_modules() if module().supports_line(line)]
+    return registry.get_modules_for_line(line)
 
 
 def revoke_fulfillment_for_refund(refund):
@@ -131,9 +175,8 @@ def revoke_fulfillment_for_refund(refund):
         for refund_line in refund.lines.all():
             refund_line.set_status(REFUND_LINE.COMPLETE)
     else:
-        # TODO (CCB): As our list of product types and fulfillment modules grows, this may become slow,
-        # and should be updated. Runtime is O(n^2).
-        for refund_line in refund.lines.all():
+        # The modules supporting each line are looked up by product class, in constant time.
+        for refund_line in refund.lines.select_related('order_line__product__parent'):
             order_line = refund_line.order_line
             modules = get_fulfillment_modules_for_line(order_line)
 
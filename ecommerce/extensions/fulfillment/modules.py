@@ -5,8 +5,11 @@ in an Order.
 """
 import abc
 import datetime
+import itertools
 import json
 import logging
+import threading
+from multiprocessing.pool import ThreadPool
 
 from django.conf import settings
 from django.core.urlresolvers import reverse
@@ -31,6 +34,45 @@ Range = get_model('offer', 'Range')
 Voucher = get_model('voucher', 'Voucher')
 logger = logging.getLogger(__name__)
 
+_enrollment_api_session = None
+_enrollment_api_session_lock = threading.Lock()
+
+
+def get_enrollment_api_session():
+    """
+    Return the HTTP session shared by all calls to the Enrollment API.
+
+    The session keeps up to ENROLLMENT_FULFILLMENT_POOL_SIZE connections alive, so that
+    enrollments do not pay for a new TCP/TLS handshake each time.
+
+    Returns:
+        requests.Session
+    """
+    global _enrollment_api_session  # pylint: disable=global-statement
+
+    if _enrollment_api_session is None:
+        with _enrollment_api_session_lock:
+            if _enrollment_api_session is None:
+                pool_size = settings.ENROLLMENT_FULFILLMENT_POOL_SIZE
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _enrollment_api_session = session
+
+    return _enrollment_api_session
+
+
+class BulkEnrollmentResult(object):
+    """ Outcome of one of the enrollments of a bulk enrollment request, exposed like the response of a single one. """
+
+    def __init__(self, result):
+        self.status_code = result['status']
+        self._data = result
+
+    def json(self):
+        return self._data
+
 
 class BaseFulfillmentModule(object):  # pragma: no cover
     """
@@ -105,9 +147,7 @@ class EnrollmentFulfillmentModule(BaseFulfillmentModule):
     Allows the enrollment of a student via purchase of a 'seat'.
     """
 
-    def _post_to_enrollment_api(self, data, user):
-        enrollment_api_url = get_lms_enrollment_api_url()
-        timeout = settings.ENROLLMENT_FULFILLMENT_TIMEOUT
+    def _get_enrollment_api_headers(self, user):
         headers = {
             'Content-Type': 'application/json',
             'X-Edx-Api-Key': settings.EDX_API_KEY
@@ -121,7 +161,85 @@ class EnrollmentFulfillmentModule(BaseFulfillmentModule):
         if ip:
             headers['X-Forwarded-For'] = ip
 
-        return requests.post(enrollment_api_url, data=json.dumps(data), headers=headers, timeout=timeout)
+        return headers
+
+    def _invalidate_enrollments(self, user, site):
+        """ Clear the cached enrollments of the user on the order's site, just changed through the Enrollment API. """
+        # Enrollments are cached per site, and none are cached for orders placed without one.
+        if site:
+            user.invalidate_enrollments(site)
+
+    def _send_to_enrollment_api(self, enrollment_api_url, data, headers):
+        timeout = settings.ENROLLMENT_FULFILLMENT_TIMEOUT
+        return get_enrollment_api_session().post(
+            enrollment_api_url, data=json.dumps(data), headers=headers, timeout=timeout
+        )
+
+    def _post_to_enrollment_api(self, data, user):
+        return self._send_to_enrollment_api(get_lms_enrollment_api_url(), data, self._get_enrollment_api_headers(user))
+
+    def _post_enrollments(self, enrollments, user):
+        """ Post the given enrollments to the Enrollment API.
+
+        Enrollments are posted concurrently, by up to ENROLLMENT_FULFILLMENT_MAX_WORKERS threads. The URL and
+        headers are resolved beforehand, since they depend on the current request, which is local to this thread.
+
+        Args:
+            enrollments (List of dicts): Enrollment API request bodies.
+            user (User): User being enrolled.
+
+        Returns:
+            An iterable of (response, error) tuples, in the order of the enrollments. The error is the
+            ConnectionError or Timeout raised while posting the enrollment, if any.
+        """
+        enrollment_api_url = get_lms_enrollment_api_url()
+        headers = self._get_enrollment_api_headers(user)
+
+        def post(data):
+            try:
+                return self._send_to_enrollment_api(enrollment_api_url, data, headers), None
+            except (ConnectionError, Timeout) as error:
+                return None, error
+
+        max_workers = min(settings.ENROLLMENT_FULFILLMENT_MAX_WORKERS, len(enrollments))
+        if max_workers <= 1:
+            return itertools.imap(post, enrollments)
+
+        pool = ThreadPool(max_workers)
+        try:
+            return pool.map(post, enrollments)
+        finally:
+            pool.terminate()
+
+    def _post_enrollment_batch(self, enrollments, user):
+        """ Post the given enrollments to the bulk enrollment endpoint of the LMS, with a single request.
+
+        The endpoint, at ENROLLMENT_FULFILLMENT_BATCH_API_PATH, accepts `{"enrollments": [...]}`, where each
+        item is an Enrollment API request body. It responds with `{"results": [...]}`, holding the `status`
+        and, on failure, the `message` of each enrollment, in the order of the request.
+
+        Args:
+            enrollments (List of dicts): Enrollment API request bodies.
+            user (User): User being enrolled.
+
+        Returns:
+            A list of (BulkEnrollmentResult, None) tuples, in the order of the enrollments, or None if the
+            bulk enrollment endpoint is unavailable.
+        """
+        batch_api_url = get_lms_url(settings.ENROLLMENT_FULFILLMENT_BATCH_API_PATH)
+        headers = self._get_enrollment_api_headers(user)
+
+        try:
+            response = self._send_to_enrollment_api(batch_api_url, {'enrollments': enrollments}, headers)
+            if response.status_code == status.HTTP_200_OK:
+                results = response.json()['results']
+                if len(results) == len(enrollments):
+                    return [(BulkEnrollmentResult(result), None) for result in results]
+        except (ConnectionError, Timeout, ValueError, KeyError, TypeError):
+            pass
+
+        logger.warning('Bulk enrollment endpoint [%s] is unavailable. Enrolling lines one at a time.', batch_api_url)
+        return None
 
     def supports_line(self, line):
         return line.product.get_product_class().name == 'Seat'
@@ -170,6 +288,7 @@ class EnrollmentFulfillmentModule(BaseFulfillmentModule):
 
             return order, lines
 
+        enrollments = []
         for line in lines:
             try:
                 mode = mode_for_seat(line.product)
@@ -207,47 +326,64 @@ class EnrollmentFulfillmentModule(BaseFulfillmentModule):
                         'value': provider
                     }
                 )
-            try:
-                response = self._post_to_enrollment_api(data, user=order.user)
-
-                if response.status_code == status.HTTP_200_OK:
-                    line.set_status(LINE.COMPLETE)
-
-                    audit_log(
-                        'line_fulfilled',
-                        order_line_id=line.id,
-                        order_number=order.number,
-                        product_class=line.product.get_product_class().name,
-                        course_id=course_key,
-                        mode=mode,
-                        user_id=order.user.id,
-                        credit_provider=provider,
-                    )
-                else:
-                    try:
-                        data = response.json()
-                        reason = data.get('message')
-                    except Exception:  # pylint: disable=broad-except
-                        reason = '(No detail provided.)'
-
-                    logger.error(
-                        "Unable to fulfill line [%d] of order [%s] due to a server-side error: %s", line.id,
-                        order.number, reason
-                    )
-                    line.set_status(LINE.FULFILLMENT_SERVER_ERROR)
-            except ConnectionError:
-                logger.error(
-                    "Unable to fulfill line [%d] of order [%s] due to a network problem", line.id, order.number
-                )
-                line.set_status(LINE.FULFILLMENT_NETWORK_ERROR)
-            except Timeout:
-                logger.error(
-                    "Unable to fulfill line [%d] of order [%s] due to a request time out", line.id, order.number
-                )
-                line.set_status(LINE.FULFILLMENT_TIMEOUT_ERROR)
+            enrollments.append((line, mode, course_key, provider, data))
+
+        if enrollments:
+            data = [enrollment[-1] for enrollment in enrollments]
+            responses = None
+
+            if settings.ENROLLMENT_FULFILLMENT_BATCH_API_PATH and len(enrollments) > 1:
+                responses = self._post_enrollment_batch(data, order.user)
+
+            if responses is None:
+                responses = self._post_enrollments(data, order.user)
+
+            for (line, mode, course_key, provider, __), (response, error) in zip(enrollments, responses):
+                self._update_line_status(order, line, mode, course_key, provider, response, error)
+
+            self._invalidate_enrollments(order.user, order.site)
+
         logger.info("Finished fulfilling 'Seat' product types for order [%s]", order.number)
         return order, lines
 
+    def _update_line_status(self, order, line, mode, course_key, provider, response, error):
+        """ Set the status of a line from the outcome of its enrollment, and log it. """
+        if isinstance(error, ConnectionError):
+            logger.error(
+                "Unable to fulfill line [%d] of order [%s] due to a network problem", line.id, order.number
+            )
+            line.set_status(LINE.FULFILLMENT_NETWORK_ERROR)
+        elif isinstance(error, Timeout):
+            logger.error(
+                "Unable to fulfill line [%d] of order [%s] due to a request time out", line.id, order.number
+            )
+            line.set_status(LINE.FULFILLMENT_TIMEOUT_ERROR)
+        elif response.status_code == status.HTTP_200_OK:
+            line.set_status(LINE.COMPLETE)
+
+            audit_log(
+                'line_fulfilled',
+                order_line_id=line.id,
+                order_number=order.number,
+                product_class=line.product.get_product_class().name,
+                course_id=course_key,
+                mode=mode,
+                user_id=order.user.id,
+                credit_provider=provider,
+            )
+        else:
+            try:
+                data = response.json()
+                reason = data.get('message')
+            except Exception:  # pylint: disable=broad-except
+                reason = '(No detail provided.)'
+
+            logger.error(
+                "Unable to fulfill line [%d] of order [%s] due to a server-side error: %s", line.id,
+                order.number, reason
+            )
+            line.set_status(LINE.FULFILLMENT_SERVER_ERROR)
+
     def revoke_line(self, line):
         try:
             logger.info('Attempting to revoke fulfillment of Line [%d]...', line.id)
@@ -264,6 +400,7 @@ class EnrollmentFulfillmentModule(BaseFulfillmentModule):
             }
 
             response = self._post_to_enrollment_api(data, user=line.order.user)
+            self._invalidate_enrollments(line.order.user, line.order.site)
 
             if response.status_code == status.HTTP_200_OK:
                 audit_log(
@@ -396,12 +533,9 @@ class EnrollmentCodeFulfillmentModule(BaseFulfillmentModule):
 
         for line in lines:
             name = 'Enrollment Code Range for {}'.format(line.product.attr.course_key)
-            seat = Product.objects.filter(
-                attributes__name='course_key',
-                attribute_values__value_text=line.product.attr.course_key
-            ).get(
-                attributes__name='certificate_type',
-                attribute_values__value_text=line.product.attr.seat_type
+            seat = Product.objects.get(
+                seat_attributes__course_key=line.product.attr.course_key,
+                seat_attributes__certificate_type=line.product.attr.seat_type
             )
             _range, created = Range.objects.get_or_create(name=name)
             if created:
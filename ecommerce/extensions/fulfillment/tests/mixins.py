@@ -1,3 +1,9 @@
+import BaseHTTPServer
+import json
+import SocketServer
+import threading
+import time
+
 from oscar.test import factories
 
 from ecommerce.extensions.fulfillment.status import ORDER, LINE
@@ -24,3 +30,92 @@ class FulfillmentTestMixin(object):
         """
         self.assertEqual(order.status, ORDER.COMPLETE)
         self.assertSetEqual(set(order.lines.values_list('status', flat=True)), set([LINE.COMPLETE]))
+
+
+class EnrollmentApiStub(object):
+    """
+    Local HTTP server standing in for the LMS Enrollment API.
+
+    Each request is answered after the given latency, and its path and body are recorded. Requests to
+    BATCH_PATH are treated as bulk enrollments, and answered with the result of each enrollment, unless
+    a batch status other than 200 is given. The status of an enrollment can be set per course.
+    The server handles requests on separate threads, so that concurrent requests overlap.
+
+    Usage:
+        with EnrollmentApiStub(latency=0.5) as stub:
+            ...  # Post enrollments to stub.url
+    """
+    ENROLLMENT_PATH = '/api/enrollment/v1/enrollment'
+    BATCH_PATH = '/api/enrollment/v1/bulk_enrollment'
+
+    def __init__(self, latency=0, status=200, batch_status=200, course_statuses=None):
+        self.latency = latency
+        self.status = status
+        self.batch_status = batch_status
+        self.course_statuses = course_statuses or {}
+        self.requests = []
+        self.server = None
+
+    @property
+    def base_url(self):
+        return 'http://{}:{}'.format(*self.server.server_address)
+
+    @property
+    def url(self):
+        return self.base_url + self.ENROLLMENT_PATH
+
+    def get_requests(self, path):
+        """ Return the bodies of the requests made to the given path. """
+        return [body for request_path, body in self.requests if request_path == path]
+
+    def respond(self, path, data):
+        """ Return the status and body of the response to a request. """
+        if path == self.BATCH_PATH:
+            if self.batch_status != 200:
+                return self.batch_status, {}
+
+            results = []
+            for enrollment in data['enrollments']:
+                course_status = self.course_statuses.get(enrollment['course_details']['course_id'], self.status)
+                result = {'status': course_status}
+                if course_status != 200:
+                    result['message'] = 'Enrollment failed.'
+                results.append(result)
+            return 200, {'results': results}
+
+        return self.course_statuses.get(data['course_details']['course_id'], self.status), {}
+
+    def __enter__(self):
+        stub = self
+
+        class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):  # pylint: disable=invalid-name
+                data = json.loads(self.rfile.read(int(self.headers.getheader('content-length', 0))))
+                stub.requests.append((self.path, data))
+                time.sleep(stub.latency)
+
+                status, body = stub.respond(self.path, data)
+                body = json.dumps(body)
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):  # pylint: disable=arguments-differ
+                pass
+
+        class Server(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+            daemon_threads = True
+
+        self.server = Server(('127.0.0.1', 0), Handler)
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
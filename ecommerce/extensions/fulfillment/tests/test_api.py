@@ -1,6 +1,7 @@
 """Tests for the Fulfillment API"""
 import ddt
 from django.test.utils import override_settings
+from django.utils import importlib
 from mock import patch
 from nose.tools import raises
 from testfixtures import LogCapture
@@ -10,7 +11,7 @@ from ecommerce.extensions.fulfillment.api import get_fulfillment_modules, get_fu
     revoke_fulfillment_for_refund
 from ecommerce.extensions.fulfillment.status import ORDER, LINE
 from ecommerce.extensions.fulfillment.tests.mixins import FulfillmentTestMixin
-from ecommerce.extensions.fulfillment.tests.modules import FakeFulfillmentModule
+from ecommerce.extensions.fulfillment.tests.modules import FakeFulfillmentModule, FulfillmentNothingModule
 from ecommerce.extensions.refund.status import REFUND, REFUND_LINE
 from ecommerce.extensions.refund.tests.factories import RefundFactory
 from ecommerce.tests.testcases import TestCase
@@ -91,6 +92,35 @@ class FulfillmentApiTests(FulfillmentTestMixin, TestCase):
         actual = get_fulfillment_modules_for_line(line)
         self.assertEqual(actual, [FakeFulfillmentModule])
 
+    @override_settings(FULFILLMENT_MODULES=['ecommerce.extensions.fulfillment.tests.modules.FakeFulfillmentModule'])
+    def test_get_fulfillment_modules_imported_once(self):
+        """
+        Verify the modules are only imported again when the setting changes.
+        """
+        with patch('ecommerce.extensions.fulfillment.api.importlib.import_module', wraps=importlib.import_module) as m:
+            for __ in range(10):
+                self.assertEqual(get_fulfillment_modules(), [FakeFulfillmentModule])
+            self.assertLessEqual(m.call_count, 1)
+
+            path = 'ecommerce.extensions.fulfillment.tests.modules.FulfillmentNothingModule'
+            with override_settings(FULFILLMENT_MODULES=[path]):
+                self.assertEqual(get_fulfillment_modules(), [FulfillmentNothingModule])
+
+    @override_settings(FULFILLMENT_MODULES=['ecommerce.extensions.fulfillment.tests.modules.FakeFulfillmentModule',
+                                            'ecommerce.extensions.fulfillment.tests.modules.FulfillmentNothingModule'])
+    def test_get_fulfillment_modules_for_line_dispatch(self):
+        """
+        Verify the modules supporting lines are resolved once per product class, no matter how many lines
+        are routed.
+        """
+        line = self.order.lines.first()
+        get_fulfillment_modules()
+
+        with patch.object(FakeFulfillmentModule, 'supports_line', return_value=True) as supports_line:
+            for __ in range(100):
+                self.assertEqual(get_fulfillment_modules_for_line(line), [FakeFulfillmentModule])
+            self.assertLessEqual(supports_line.call_count, 1)
+
     @override_settings(FULFILLMENT_MODULES=['ecommerce.extensions.fulfillment.tests.modules.FakeFulfillmentModule'])
     def test_revoke_fulfillment_for_refund(self):
         """
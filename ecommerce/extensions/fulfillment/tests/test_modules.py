@@ -1,10 +1,12 @@
 """Tests of the Fulfillment API's fulfillment modules."""
 import datetime
 import json
+import time
 
 import ddt
 import httpretty
 import mock
+from django.core.cache import cache
 from django.test import override_settings
 from oscar.core.loading import get_class, get_model
 from oscar.test import factories
@@ -21,10 +23,10 @@ from ecommerce.courses.tests.factories import CourseFactory
 from ecommerce.courses.utils import mode_for_seat
 from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
 from ecommerce.extensions.fulfillment.modules import (
-    CouponFulfillmentModule, EnrollmentCodeFulfillmentModule, EnrollmentFulfillmentModule
+    CouponFulfillmentModule, EnrollmentCodeFulfillmentModule, EnrollmentFulfillmentModule, get_enrollment_api_session
 )
 from ecommerce.extensions.fulfillment.status import LINE
-from ecommerce.extensions.fulfillment.tests.mixins import FulfillmentTestMixin
+from ecommerce.extensions.fulfillment.tests.mixins import EnrollmentApiStub, FulfillmentTestMixin
 from ecommerce.extensions.voucher.models import OrderLineVouchers
 from ecommerce.extensions.voucher.utils import create_vouchers
 from ecommerce.tests.testcases import TestCase
@@ -156,13 +158,26 @@ class EnrollmentFulfillmentModuleTests(CourseCatalogTestMixin, FulfillmentTestMi
         EnrollmentFulfillmentModule().fulfill_product(self.order, list(self.order.lines.all()))
         self.assertEqual(LINE.FULFILLMENT_CONFIGURATION_ERROR, self.order.lines.all()[0].status)
 
-    @mock.patch('requests.post', mock.Mock(side_effect=ConnectionError))
+    @httpretty.activate
+    def test_enrollment_module_fulfill_invalidates_enrollments(self):
+        """ Verify fulfillment clears the cached enrollments of the user, which no longer reflect the LMS. """
+        httpretty.register_uri(httpretty.POST, get_lms_enrollment_api_url(), status=200, body='{}', content_type=JSON)
+        self.order.site = self.site
+        self.order.save()
+        cache_key = self.user._get_enrollments_cache_key(self.site)  # pylint: disable=protected-access
+        cache.set(cache_key, {}, 60)
+        self.addCleanup(cache.clear)
+
+        EnrollmentFulfillmentModule().fulfill_product(self.order, list(self.order.lines.all()))
+        self.assertIsNone(cache.get(cache_key))
+
+    @mock.patch('requests.Session.post', mock.Mock(side_effect=ConnectionError))
     def test_enrollment_module_network_error(self):
         """Test that lines receive a network error status if a fulfillment request experiences a network error."""
         EnrollmentFulfillmentModule().fulfill_product(self.order, list(self.order.lines.all()))
         self.assertEqual(LINE.FULFILLMENT_NETWORK_ERROR, self.order.lines.all()[0].status)
 
-    @mock.patch('requests.post', mock.Mock(side_effect=Timeout))
+    @mock.patch('requests.Session.post', mock.Mock(side_effect=Timeout))
     def test_enrollment_module_request_timeout(self):
         """Test that lines receive a timeout error status if a fulfillment request times out."""
         EnrollmentFulfillmentModule().fulfill_product(self.order, list(self.order.lines.all()))
@@ -368,6 +383,122 @@ class EnrollmentFulfillmentModuleTests(CourseCatalogTestMixin, FulfillmentTestMi
             self.assertEqual(exp.request.headers.get('x-edx-ga-client-id'), '123.123')
             self.assertEqual(exp.request.headers.get('x-forwarded-for'), '11.22.33.44')
 
+    def create_multi_seat_order(self, seat_count):
+        """ Create an order for seats of different courses. """
+        basket = BasketFactory()
+        for index in range(seat_count):
+            course = Course.objects.create(id='edX/DemoX/Demo_Course_{}'.format(index), name='Demo Course')
+            basket.add_product(course.create_or_update_seat(self.certificate_type, False, 100, self.partner), 1)
+        return factories.create_order(number=3, basket=basket, user=self.user)
+
+    def fulfill_with_stub(self, order, latency):
+        """ Fulfill the lines of an order against a local Enrollment API, and return the time it took. """
+        with EnrollmentApiStub(latency=latency) as stub:
+            with mock.patch('ecommerce.extensions.fulfillment.modules.get_lms_enrollment_api_url',
+                            mock.Mock(return_value=stub.url)):
+                start = time.time()
+                EnrollmentFulfillmentModule().fulfill_product(order, list(order.lines.all()))
+                elapsed = time.time() - start
+
+        self.assertEqual(len(stub.get_requests(stub.ENROLLMENT_PATH)), order.lines.count())
+        self.assertSetEqual(set(order.lines.values_list('status', flat=True)), {LINE.COMPLETE})
+        return elapsed
+
+    @override_settings(ENROLLMENT_FULFILLMENT_MAX_WORKERS=4)
+    def test_concurrent_enrollment(self):
+        """ Verify the lines of an order are enrolled concurrently, in about the time taken by the slowest line. """
+        latency = 0.5
+        order = self.create_multi_seat_order(4)
+
+        with LogCapture(LOGGER_NAME) as l:
+            elapsed = self.fulfill_with_stub(order, latency)
+
+            # Audit logs are written in the order of the lines.
+            l.check(*[
+                (
+                    LOGGER_NAME,
+                    'INFO',
+                    'line_fulfilled: course_id="{}", credit_provider="None", mode="{}", order_line_id="{}", '
+                    'order_number="{}", product_class="Seat", user_id="{}"'.format(
+                        line.product.attr.course_key, self.certificate_type, line.id, order.number, self.user.id
+                    )
+                ) for line in order.lines.all()
+            ])
+
+        self.assertLess(elapsed, latency * 2)
+
+    def test_sequential_enrollment(self):
+        """ Verify the lines of an order are enrolled one at a time by default. """
+        latency = 0.2
+        order = self.create_multi_seat_order(3)
+        self.assertGreaterEqual(self.fulfill_with_stub(order, latency), latency * 3)
+
+    def fulfill_batch_with_stub(self, order, **stub_kwargs):
+        """ Fulfill the lines of an order against a local LMS with a bulk enrollment endpoint, and return the stub. """
+        with EnrollmentApiStub(**stub_kwargs) as stub:
+            with mock.patch('ecommerce.extensions.fulfillment.modules.get_lms_url', lambda path: stub.base_url + path):
+                with mock.patch('ecommerce.extensions.fulfillment.modules.get_lms_enrollment_api_url',
+                                mock.Mock(return_value=stub.url)):
+                    with override_settings(ENROLLMENT_FULFILLMENT_BATCH_API_PATH=stub.BATCH_PATH):
+                        EnrollmentFulfillmentModule().fulfill_product(order, list(order.lines.all()))
+        return stub
+
+    def test_batch_enrollment(self):
+        """ Verify the lines of an order are enrolled with a single bulk request, and their statuses are set
+        from the result of each enrollment. """
+        order = self.create_multi_seat_order(3)
+        lines = list(order.lines.all())
+        failed_line = lines[1]
+
+        with LogCapture(LOGGER_NAME) as l:
+            stub = self.fulfill_batch_with_stub(
+                order, course_statuses={failed_line.product.attr.course_key: 400}
+            )
+            l.check(*[
+                (
+                    LOGGER_NAME,
+                    'INFO',
+                    'line_fulfilled: course_id="{}", credit_provider="None", mode="{}", order_line_id="{}", '
+                    'order_number="{}", product_class="Seat", user_id="{}"'.format(
+                        line.product.attr.course_key, self.certificate_type, line.id, order.number, self.user.id
+                    )
+                ) for line in lines if line != failed_line
+            ])
+
+        self.assertEqual(stub.get_requests(stub.ENROLLMENT_PATH), [])
+        batch_requests = stub.get_requests(stub.BATCH_PATH)
+        self.assertEqual(len(batch_requests), 1)
+        self.assertEqual(
+            [enrollment['course_details']['course_id'] for enrollment in batch_requests[0]['enrollments']],
+            [line.product.attr.course_key for line in lines]
+        )
+        self.assertEqual(
+            [line.status for line in order.lines.all()],
+            [LINE.COMPLETE, LINE.FULFILLMENT_SERVER_ERROR, LINE.COMPLETE]
+        )
+
+    @ddt.data(404, 503)
+    def test_batch_enrollment_fallback(self, batch_status):
+        """ Verify the lines of an order are enrolled one at a time if the bulk enrollment endpoint is unavailable. """
+        order = self.create_multi_seat_order(2)
+        stub = self.fulfill_batch_with_stub(order, batch_status=batch_status)
+
+        self.assertEqual(len(stub.get_requests(stub.BATCH_PATH)), 1)
+        self.assertEqual(len(stub.get_requests(stub.ENROLLMENT_PATH)), 2)
+        self.assertSetEqual(set(order.lines.values_list('status', flat=True)), {LINE.COMPLETE})
+
+    def test_batch_enrollment_single_line(self):
+        """ Verify orders with a single line are not enrolled through the bulk enrollment endpoint. """
+        stub = self.fulfill_batch_with_stub(self.order)
+
+        self.assertEqual(stub.get_requests(stub.BATCH_PATH), [])
+        self.assertEqual(len(stub.get_requests(stub.ENROLLMENT_PATH)), 1)
+        self.assertEqual(self.order.lines.get().status, LINE.COMPLETE)
+
+    def test_enrollment_api_session(self):
+        """ Verify the Enrollment API connections are pooled by a single session. """
+        self.assertIs(get_enrollment_api_session(), get_enrollment_api_session())
+
     def test_voucher_usage(self):
         """
         Test that using a voucher applies offer discount to reduce order price
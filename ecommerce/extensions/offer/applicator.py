@@ -0,0 +1,20 @@
+from oscar.apps.offer.applicator import Applicator as CoreApplicator
+
+
+class Applicator(CoreApplicator):
+    def apply_offers(self, basket, offers):
+        # Ranges defined by a catalog query check each product against the Course Catalog Service.
+        # Resolve all of the basket's products at once for every range, instead of once per product
+        # as the offers are applied.
+        products = [line.product for line in basket.all_lines()]
+        if products:
+            ranges = {}
+            for offer in offers:
+                for product_range in (offer.condition.range, offer.benefit.range):
+                    if product_range:
+                        ranges[product_range.id] = product_range
+
+            for product_range in ranges.values():
+                product_range.prefetch_catalog_query_results(products)
+
+        super(Applicator, self).apply_offers(basket, offers)
@@ -2,11 +2,12 @@
 import hashlib
 
 from django.conf import settings
-from django.core.cache import cache
 from django.db import models
 from oscar.apps.offer.abstract_models import AbstractRange
+from slumber.exceptions import HttpClientError, HttpServerError
 from threadlocals.threadlocals import get_current_request
 
+from ecommerce.core.cache_utils import REMOTE_SERVICE_ERRORS, cache_values, get_many_or_fetch
 from ecommerce.coupons.utils import get_seats_from_query
 
 
@@ -15,25 +16,80 @@ class Range(AbstractRange):
     catalog_query = models.CharField(max_length=255, blank=True, null=True)
     course_seat_types = models.CharField(max_length=255, blank=True, null=True)
 
+    def _get_catalog_query_cache_key(self, course_run_id):
+        cache_key = 'catalog_query_contains [{}] [{}]'.format(self.catalog_query, course_run_id)
+        return hashlib.md5(cache_key).hexdigest()
+
     def run_catalog_query(self, product):
         """
         Retrieve the results from running the query contained in catalog_query field.
         """
-        cache_key = 'catalog_query_contains [{}] [{}]'.format(self.catalog_query, product.course_id)
-        cache_hash = hashlib.md5(cache_key).hexdigest()
-        response = cache.get(cache_hash)
-        if not response:  # pragma: no cover
-            request = get_current_request()
-            try:
-                response = request.site.siteconfiguration.course_catalog_api_client.course_runs.contains.get(
-                    query=self.catalog_query,
-                    course_run_ids=product.course_id
-                )
-                cache.set(cache_hash, response, settings.COURSES_API_CACHE_TIMEOUT)
-            except:  # pylint: disable=bare-except
-                raise Exception('Could not contact Course Catalog Service.')
-
-        return response
+        return self.run_catalog_query_for_course_runs([product.course_id])[product.course_id]
+
+    def run_catalog_query_for_course_runs(self, course_run_ids):
+        """
+        Retrieve the results from running the query contained in catalog_query field for many course runs.
+
+        Results are cached per course run. Course runs missing from the cache are
+        resolved with a single call to the Course Catalog Service, whose failures to
+        respond are cached for a short time too. Other errors are raised uncached.
+
+        Arguments:
+            course_run_ids (Iterable[str]): IDs of the course runs to check.
+
+        Returns:
+            dict: Maps each course run ID to the Course Catalog Service response for that course run.
+        """
+        request = get_current_request()
+
+        def fetch(missing_course_run_ids):  # pragma: no cover
+            response = request.site.siteconfiguration.course_catalog_api_client.course_runs.contains.get(
+                query=self.catalog_query,
+                course_run_ids=','.join(sorted(missing_course_run_ids))
+            )
+            return {
+                course_run_id: {'course_runs': {course_run_id: response['course_runs'].get(course_run_id, False)}}
+                for course_run_id in missing_course_run_ids
+            }
+
+        responses, errors = get_many_or_fetch(
+            {self._get_catalog_query_cache_key(course_run_id): course_run_id
+             for course_run_id in set(course_run_ids)},
+            fetch,
+            settings.COURSES_API_CACHE_TIMEOUT,
+            'catalog_query',
+            errors=REMOTE_SERVICE_ERRORS + (HttpClientError, HttpServerError)
+        )
+        if errors:
+            raise Exception('Could not contact Course Catalog Service.')
+
+        return responses
+
+    def _cache_catalog_query_responses(self, responses):
+        cache_values(
+            {self._get_catalog_query_cache_key(course_run_id): response
+             for course_run_id, response in responses.items()},
+            settings.COURSES_API_CACHE_TIMEOUT
+        )
+
+    def _is_catalog_query_seat(self, product):
+        certificate_type = getattr(product.attr, 'certificate_type', None)
+        return bool(certificate_type) and certificate_type.lower() in self.course_seat_types
+
+    def prefetch_catalog_query_results(self, products):
+        """
+        Resolve whether the catalog query contains many products at once.
+
+        This fills the cache used by contains_product, so that evaluating each of
+        the products afterwards does not require a call to the Course Catalog Service.
+
+        Arguments:
+            products (Iterable[Product]): Products that will be evaluated against this range.
+        """
+        if self.catalog_query and self.course_seat_types:
+            course_run_ids = [product.course_id for product in products if self._is_catalog_query_seat(product)]
+            if course_run_ids:
+                self.run_catalog_query_for_course_runs(course_run_ids)
 
     def contains_product(self, product):
         if self.catalog_query and self.course_seat_types:
@@ -59,6 +115,11 @@ class Range(AbstractRange):
         request = get_current_request()
         if self.catalog_query and self.course_seat_types:
             products = get_seats_from_query(request.site, self.catalog_query, self.course_seat_types)
+            # Every product returned by the query is contained in it, so contains_product
+            # does not need to ask the Course Catalog Service about them again.
+            self._cache_catalog_query_responses(
+                {product.course_id: {'course_runs': {product.course_id: True}} for product in products}
+            )
             return products + list(super(Range, self).all_products())  # pylint: disable=bad-super-call
         if self.catalog:
             catalog_products = [record.product for record in self.catalog.stock_records.all()]
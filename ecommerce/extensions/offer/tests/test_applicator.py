@@ -0,0 +1,32 @@
+from oscar.core.loading import get_class, get_model
+from oscar.test import factories
+
+from ecommerce.coupons.tests.mixins import CourseCatalogMockMixin
+from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
+from ecommerce.tests.testcases import TestCase
+
+Applicator = get_class('offer.utils', 'Applicator')
+Benefit = get_model('offer', 'Benefit')
+Condition = get_model('offer', 'Condition')
+ConditionalOffer = get_model('offer', 'ConditionalOffer')
+
+
+class ApplicatorTests(CourseCatalogTestMixin, CourseCatalogMockMixin, TestCase):
+    def test_apply_offers_resolves_catalog_query_once(self):
+        """ Verify the catalog query of an offer's range is resolved once for all products in the basket. """
+        seats = [self.create_course_and_seat(partner=self.partner)[1] for __ in range(5)]
+        stub = self.mock_catalog_contains_stub([seat.course_id for seat in seats[:2]])
+
+        product_range = factories.RangeFactory(catalog_query='key:applicator', course_seat_types='verified')
+        condition = factories.ConditionFactory(range=product_range, type=Condition.COUNT, value=1)
+        benefit = factories.BenefitFactory(range=product_range, type=Benefit.PERCENTAGE, value=100)
+        offer = factories.ConditionalOfferFactory(condition=condition, benefit=benefit)
+
+        basket = factories.BasketFactory(owner=self.create_user(), site=self.site)
+        for seat in seats:
+            basket.add_product(seat)
+
+        Applicator().apply_offers(basket, [offer])
+
+        self.assertEqual(len(stub.calls), 1)
+        self.assertEqual(len(basket.offer_applications), 1)
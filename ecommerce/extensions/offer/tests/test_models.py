@@ -6,6 +6,7 @@ from django.core.cache import cache
 from django.test import RequestFactory
 from oscar.core.loading import get_model
 from oscar.test import factories
+from requests.exceptions import ConnectionError
 
 from ecommerce.core.tests.decorators import mock_course_catalog_api_client
 from ecommerce.coupons.tests.mixins import CourseCatalogMockMixin, CouponMixin
@@ -121,3 +122,83 @@ class RangeTests(CouponMixin, CourseCatalogTestMixin, CourseCatalogMockMixin, Te
         self.range.course_seat_types = 'verified'
         self.assertEqual(len(self.range.all_products()), 2)
         self.assertTrue(seat in self.range.all_products())
+
+    def test_run_catalog_query_for_course_runs(self):
+        """
+        run_catalog_query_for_course_runs() should resolve all uncached course runs with a single call
+        and cache the result of every course run.
+        """
+        stub = self.mock_catalog_contains_stub(['course-v1:org+course+1', 'course-v1:org+course+2'])
+        self.range.catalog_query = 'key:batched'
+        course_run_ids = ['course-v1:org+course+1', 'course-v1:org+course+2', 'course-v1:org+course+3']
+
+        responses = self.range.run_catalog_query_for_course_runs(course_run_ids)
+        self.assertEqual(len(stub.calls), 1)
+        self.assertEqual(stub.calls[0], ('key:batched', sorted(course_run_ids)))
+        self.assertTrue(responses['course-v1:org+course+1']['course_runs']['course-v1:org+course+1'])
+        self.assertFalse(responses['course-v1:org+course+3']['course_runs']['course-v1:org+course+3'])
+
+        for course_run_id in course_run_ids:
+            cache_key = 'catalog_query_contains [{}] [{}]'.format('key:batched', course_run_id)
+            self.assertEqual(cache.get(hashlib.md5(cache_key).hexdigest()), responses[course_run_id])
+
+        # Only course runs missing from the cache are sent to the Course Catalog Service.
+        self.range.run_catalog_query_for_course_runs(course_run_ids + ['course-v1:org+course+4'])
+        self.assertEqual(len(stub.calls), 2)
+        self.assertEqual(stub.calls[1], ('key:batched', ['course-v1:org+course+4']))
+
+    def test_run_catalog_query_for_course_runs_errors(self):
+        """
+        run_catalog_query_for_course_runs() should cache the failures of the Course Catalog Service only,
+        and raise any other error uncached.
+        """
+        self.range.catalog_query = 'key:errors'
+
+        with mock.patch('ecommerce.extensions.offer.models.get_current_request', mock.Mock(return_value=None)):
+            for __ in range(2):
+                with self.assertRaises(AttributeError):
+                    self.range.run_catalog_query_for_course_runs(['course-v1:org+course+1'])
+
+        stub = self.mock_catalog_contains_stub([])
+        with mock.patch.object(stub, 'get', side_effect=ConnectionError) as get:
+            for __ in range(2):
+                with self.assertRaisesRegexp(Exception, 'Could not contact Course Catalog Service.'):
+                    self.range.run_catalog_query_for_course_runs(['course-v1:org+course+1'])
+            self.assertEqual(get.call_count, 1)
+
+    def test_prefetch_catalog_query_results(self):
+        """
+        prefetch_catalog_query_results() should let contains_product evaluate many products
+        with a single call to the Course Catalog Service.
+        """
+        seats = [self.create_course_and_seat()[1] for __ in range(3)]
+        audit_course, audit_seat = self.create_course_and_seat(seat_type='audit')
+        stub = self.mock_catalog_contains_stub([seats[0].course_id, seats[1].course_id, audit_course.id])
+        self.range.catalog_query = 'key:prefetched'
+        self.range.course_seat_types = 'verified'
+
+        self.range.prefetch_catalog_query_results(seats + [audit_seat, self.product])
+        self.assertEqual(len(stub.calls), 1)
+        self.assertEqual(stub.calls[0][1], sorted(seat.course_id for seat in seats))
+
+        self.assertTrue(self.range.contains_product(seats[0]))
+        self.assertTrue(self.range.contains_product(seats[1]))
+        self.assertFalse(self.range.contains_product(seats[2]))
+        self.assertFalse(self.range.contains_product(audit_seat))
+        self.assertEqual(len(stub.calls), 1)
+
+    @httpretty.activate
+    @mock_course_catalog_api_client
+    def test_query_range_all_products_fills_cache(self):
+        """
+        all_products() should cache the products it returns as contained by the catalog query.
+        """
+        course, seat = self.create_course_and_seat()
+        self.mock_dynamic_catalog_course_runs_api(query='key:all', course_run=course)
+        self.range.catalog_query = 'key:all'
+        self.range.course_seat_types = 'verified'
+        self.assertIn(seat, self.range.all_products())
+
+        stub = self.mock_catalog_contains_stub([])
+        self.assertTrue(self.range.contains_product(seat))
+        self.assertEqual(stub.calls, [])
@@ -5,6 +5,8 @@ from django.utils.translation import ugettext_lazy as _
 from oscar.core.loading import get_model
 from oscar.templatetags.currency_filters import currency
 
+from ecommerce.extensions.offer.applicator import Applicator  # pylint: disable=unused-import
+
 Benefit = get_model('offer', 'Benefit')
 
 
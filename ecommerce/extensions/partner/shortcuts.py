@@ -1,3 +1,6 @@
+from ecommerce.core.site_cache import get_site_bundle
+
+
 def get_partner_for_site(request):
     """ Returns the Partner associated with the request. """
-    return request.site.siteconfiguration.partner
+    return get_site_bundle(request.site).partner
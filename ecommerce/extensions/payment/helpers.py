@@ -8,6 +8,10 @@ from django.utils import importlib
 
 from ecommerce.extensions.payment import exceptions
 
+# Payment processor classes, by path, and by name for each value of the PAYMENT_PROCESSORS setting.
+_processor_classes = {}
+_processor_classes_by_name = {}
+
 
 def get_processor_class(path):
     """Return the payment processor class at the specified path.
@@ -23,8 +27,12 @@ def get_processor_class(path):
         AttributeError: If the module located at the parsed module path
             does not contain a class with the parsed class name.
     """
-    module_path, _, class_name = path.rpartition('.')
-    processor_class = getattr(importlib.import_module(module_path), class_name)
+    processor_class = _processor_classes.get(path)
+
+    if processor_class is None:
+        module_path, _, class_name = path.rpartition('.')
+        processor_class = getattr(importlib.import_module(module_path), class_name)
+        _processor_classes[path] = processor_class
 
     return processor_class
 
@@ -56,11 +64,18 @@ def get_processor_class_by_name(name):
     Raises:
         ProcessorNotFoundError: If no payment processor with the given name exists.
     """
-    for path in settings.PAYMENT_PROCESSORS:
-        processor_class = get_processor_class(path)
-
-        if name == processor_class.NAME:
-            return processor_class
+    processor_paths = tuple(settings.PAYMENT_PROCESSORS)
+    processor_classes = _processor_classes_by_name.get(processor_paths)
+
+    if processor_classes is None:
+        processor_classes = {}
+        for path in reversed(processor_paths):
+            processor_class = get_processor_class(path)
+            processor_classes[processor_class.NAME] = processor_class
+        _processor_classes_by_name[processor_paths] = processor_classes
+
+    if name in processor_classes:
+        return processor_classes[name]
 
     raise exceptions.ProcessorNotFoundError(
         exceptions.PROCESSOR_NOT_FOUND_DEVELOPER_MESSAGE.format(name=name)
@@ -1,6 +1,7 @@
 from django.dispatch import receiver, Signal
 
 from ecommerce.courses.utils import mode_for_seat
+from ecommerce.extensions.analytics.events import pipeline
 from ecommerce.extensions.analytics.utils import is_segment_configured, parse_tracking_context, silence_exceptions
 
 
@@ -20,7 +21,8 @@ def track_completed_refund(sender, refund=None, **kwargs):  # pylint: disable=un
     # Ecommerce transaction reversal, performed by emitting an event which is the inverse of an
     # order completion event emitted previously.
     # See: https://support.google.com/analytics/answer/1037443?hl=en
-    refund.order.site.siteconfiguration.segment_client.track(
+    pipeline.track(
+        refund.order.site.siteconfiguration.segment_client,
         user_tracking_id,
         'Completed Order',
         {
@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
 import httpretty
-from django.db import IntegrityError
+import mock
+from django.db import IntegrityError, connection
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils.translation import ugettext_lazy as _
 from oscar.templatetags.currency_filters import currency
 from oscar.test.factories import *  # pylint:disable=wildcard-import,unused-wildcard-import
@@ -14,7 +16,7 @@ from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
 from ecommerce.extensions.fulfillment.modules import CouponFulfillmentModule
 from ecommerce.extensions.fulfillment.status import LINE
 from ecommerce.extensions.voucher.utils import (
-    create_vouchers, generate_coupon_report, get_voucher_discount_info, update_voucher_offer
+    create_vouchers, generate_coupon_report, get_voucher_discount_info, get_voucher_from_code, update_voucher_offer
 )
 from ecommerce.tests.mixins import LmsApiMockMixin
 from ecommerce.tests.testcases import TestCase
@@ -24,6 +26,7 @@ Benefit = get_model('offer', 'Benefit')
 Catalog = get_model('catalogue', 'Catalog')
 CouponVouchers = get_model('voucher', 'CouponVouchers')
 Order = get_model('order', 'Order')
+OrderLineVouchers = get_model('voucher', 'OrderLineVouchers')
 Product = get_model('catalogue', 'Product')
 ProductCategory = get_model('catalogue', 'ProductCategory')
 ProductClass = get_model('catalogue', 'ProductClass')
@@ -177,6 +180,81 @@ class UtilTests(CouponMixin, CourseCatalogMockMixin, CourseCatalogTestMixin, Lms
         self.assertEqual(voucher.start_datetime, datetime.date(2015, 10, 1))
         self.assertEqual(voucher.usage, Voucher.SINGLE_USE)
 
+    def count_voucher_creation_queries(self, quantity):
+        """ Create the given quantity of vouchers and return the number of queries made. """
+        with CaptureQueriesContext(connection) as context:
+            vouchers = create_vouchers(
+                benefit_type=Benefit.PERCENTAGE,
+                benefit_value=100.00,
+                catalog=self.catalog,
+                coupon=self.coupon,
+                end_datetime=datetime.date(2015, 10, 30),
+                name="Test voucher",
+                quantity=quantity,
+                start_datetime=datetime.date(2015, 10, 1),
+                voucher_type=Voucher.SINGLE_USE
+            )
+        self.assertEqual(len(vouchers), quantity)
+        self.assertEqual(len(set(voucher.code for voucher in vouchers)), quantity)
+        return len(context.captured_queries)
+
+    @mock.patch('ecommerce.extensions.voucher.utils.VOUCHER_BATCH_SIZE', 10)
+    def test_create_vouchers_query_count(self):
+        """
+        Verify the number of queries made when creating vouchers grows with
+        the number of batches and not with the number of vouchers.
+        """
+        # The first call creates the offer, which is reused afterwards.
+        self.count_voucher_creation_queries(1)
+
+        single_batch = self.count_voucher_creation_queries(1)
+        self.assertEqual(self.count_voucher_creation_queries(10), single_batch)
+
+        two_batches = self.count_voucher_creation_queries(20)
+        per_batch = two_batches - single_batch
+        self.assertGreater(per_batch, 0)
+        self.assertEqual(self.count_voucher_creation_queries(100), single_batch + 9 * per_batch)
+
+    @mock.patch('ecommerce.extensions.voucher.utils.VOUCHER_BATCH_SIZE', 3)
+    def test_create_multi_offer_vouchers(self):
+        """ Verify each multi-use voucher is associated with its own offer across batches. """
+        vouchers = create_vouchers(
+            benefit_type=Benefit.PERCENTAGE,
+            benefit_value=100.00,
+            catalog=self.catalog,
+            coupon=self.coupon,
+            end_datetime=datetime.date(2015, 10, 30),
+            name="Test voucher",
+            quantity=7,
+            start_datetime=datetime.date(2015, 10, 1),
+            voucher_type=Voucher.MULTI_USE,
+            max_uses=2
+        )
+
+        offers = [voucher.offers.get() for voucher in vouchers]
+        self.assertEqual(len(set(offers)), 7)
+        for number, offer in enumerate(offers[1:], start=1):
+            self.assertTrue(offer.name.endswith('[{}]'.format(number)))
+        self.assertEqual(self.coupon.coupon_vouchers.get().vouchers.filter(id__in=[v.id for v in vouchers]).count(), 7)
+
+    def test_created_vouchers_saved(self):
+        """ Verify the vouchers created in bulk are marked as saved, so they can be added to relations. """
+        vouchers = create_vouchers(
+            benefit_type=Benefit.PERCENTAGE,
+            benefit_value=100.00,
+            catalog=self.catalog,
+            coupon=self.coupon,
+            end_datetime=datetime.date(2015, 10, 30),
+            name="Test voucher",
+            quantity=2,
+            start_datetime=datetime.date(2015, 10, 1),
+            voucher_type=Voucher.SINGLE_USE
+        )
+
+        order_line_vouchers = OrderLineVouchers.objects.create(line=create_order().lines.first())
+        order_line_vouchers.vouchers.add(*vouchers)
+        self.assertEqual(order_line_vouchers.vouchers.count(), 2)
+
     @override_settings(VOUCHER_CODE_LENGTH=VOUCHER_CODE_LENGTH)
     def test_regenerate_voucher_code(self):
         """
@@ -210,6 +288,69 @@ class UtilTests(CouponMixin, CourseCatalogMockMixin, CourseCatalogTestMixin, Lms
             )
             self.assertTrue(Voucher.objects.filter(code__iexact=voucher[0].code).exists())
 
+    def test_used_voucher_codes_replaced(self):
+        """ Verify generated codes that are already used are replaced when the vouchers are inserted. """
+        existing_voucher = VoucherFactory(code='USED')
+        voucher_data = dict(
+            benefit_type=Benefit.PERCENTAGE,
+            benefit_value=100.00,
+            catalog=self.catalog,
+            coupon=self.coupon,
+            end_datetime=datetime.date(2015, 10, 30),
+            name='Test voucher',
+            start_datetime=datetime.date(2015, 10, 1),
+            voucher_type=Voucher.SINGLE_USE
+        )
+
+        with mock.patch('ecommerce.extensions.voucher.utils._generate_code_string', side_effect=['USED', 'NEW']):
+            vouchers = create_vouchers(quantity=1, **voucher_data)
+        self.assertEqual([voucher.code for voucher in vouchers], ['NEW'])
+        self.assertEqual(Voucher.objects.get(code='USED'), existing_voucher)
+
+        with self.assertRaises(IntegrityError):
+            create_vouchers(quantity=1, code='used', **voucher_data)
+
+    def test_create_vouchers_unrelated_integrity_error(self):
+        """ Verify errors unrelated to the codes of the vouchers are raised without retrying. """
+        with mock.patch.object(Voucher.objects, 'bulk_create', side_effect=IntegrityError) as bulk_create:
+            with self.assertRaises(IntegrityError):
+                create_vouchers(
+                    benefit_type=Benefit.PERCENTAGE,
+                    benefit_value=100.00,
+                    catalog=self.catalog,
+                    coupon=self.coupon,
+                    end_datetime=datetime.date(2015, 10, 30),
+                    name='Test voucher',
+                    quantity=1,
+                    start_datetime=datetime.date(2015, 10, 1),
+                    voucher_type=Voucher.SINGLE_USE
+                )
+        self.assertEqual(bulk_create.call_count, 1)
+
+    def test_get_voucher_from_code(self):
+        """ Verify vouchers are retrieved by their code, in any case, with their offers. """
+        voucher = create_vouchers(
+            benefit_type=Benefit.PERCENTAGE,
+            benefit_value=100.00,
+            catalog=self.catalog,
+            coupon=self.coupon,
+            end_datetime=datetime.date(2015, 10, 30),
+            name='Test voucher',
+            quantity=1,
+            start_datetime=datetime.date(2015, 10, 1),
+            voucher_type=Voucher.SINGLE_USE,
+            code='Code'
+        )[0]
+
+        product_range = voucher.offers.get().benefit.range
+        with self.assertNumQueries(2):
+            retrieved = get_voucher_from_code(' code ')
+            self.assertEqual(retrieved.offers.all()[0].benefit.range, product_range)
+        self.assertEqual(retrieved, voucher)
+
+        with self.assertRaises(Voucher.DoesNotExist):
+            get_voucher_from_code('unknown')
+
     @override_settings(VOUCHER_CODE_LENGTH=0)
     def test_nonpositive_voucher_code_length(self):
         """
@@ -305,6 +446,7 @@ class UtilTests(CouponMixin, CourseCatalogMockMixin, CourseCatalogTestMixin, Lms
 
         self.mock_course_api_response(course=self.course)
         field_names, rows = generate_coupon_report(self.coupon_vouchers)
+        rows = list(rows)
 
         self.assertEqual(field_names, [
             'Coupon Name',
@@ -355,6 +497,7 @@ class UtilTests(CouponMixin, CourseCatalogMockMixin, CourseCatalogTestMixin, Lms
         )
 
         __, rows = generate_coupon_report(self.coupon_vouchers)
+        rows = list(rows)
 
         inactive_coupon_row = rows[1]
         self.assertEqual(inactive_coupon_row['Coupon Name'], coupon_name)
@@ -367,6 +510,7 @@ class UtilTests(CouponMixin, CourseCatalogMockMixin, CourseCatalogTestMixin, Lms
         query_coupon = self.create_catalog_coupon(catalog_query=catalog_query)
         query_coupon.history.all().update(history_user=self.user)
         field_names, rows = generate_coupon_report([query_coupon.attr.coupon_vouchers])
+        rows = list(rows)
 
         empty_fields = (
             'Coupon Type',
@@ -456,6 +600,7 @@ class UtilTests(CouponMixin, CourseCatalogMockMixin, CourseCatalogTestMixin, Lms
         vouchers = coupon.attr.coupon_vouchers.vouchers.all()
         self.use_voucher('TEST', vouchers[0], self.user)
         __, rows = generate_coupon_report([coupon.attr.coupon_vouchers])
+        rows = list(rows)
 
         # rows[0] - first voucher header row
         # rows[1] - first voucher row with usage information
@@ -465,6 +610,28 @@ class UtilTests(CouponMixin, CourseCatalogMockMixin, CourseCatalogTestMixin, Lms
         self.assertEqual(rows[1]['Redeemed By Username'], self.user.username)
         self.assertEqual(rows[2]['Redemption Count'], 0)
 
+    def count_coupon_report_queries(self, quantity):
+        """ Create a coupon with the given quantity of vouchers, redeem two of them and
+        return the number of queries made while generating its report. """
+        coupon = self.create_coupon(
+            title='Test report {}'.format(quantity),
+            catalog=self.catalog,
+            quantity=quantity
+        )
+        coupon.history.all().update(history_user=self.user)
+        vouchers = coupon.attr.coupon_vouchers.vouchers.all()
+        self.use_voucher('TEST{}-1'.format(quantity), vouchers[0], self.user)
+        self.use_voucher('TEST{}-2'.format(quantity), vouchers[1], self.user)
+
+        with CaptureQueriesContext(connection) as context:
+            __, rows = generate_coupon_report([coupon.attr.coupon_vouchers])
+            self.assertEqual(len(list(rows)), quantity + 2)
+        return len(context.captured_queries)
+
+    def test_generate_coupon_report_query_count(self):
+        """ Verify the number of queries made by the coupon report does not grow with the number of vouchers. """
+        self.assertEqual(self.count_coupon_report_queries(20), self.count_coupon_report_queries(2))
+
     def test_generate_coupon_report_for_used_query_coupon(self):
         """Test that used query coupon voucher reports which course was it used for."""
         catalog_query = '*:*'
@@ -476,6 +643,7 @@ class UtilTests(CouponMixin, CourseCatalogMockMixin, CourseCatalogTestMixin, Lms
         voucher.offers.first().condition.range.add_product(self.verified_seat)
         self.use_voucher('TESTORDER4', voucher, self.user)
         field_names, rows = generate_coupon_report([query_coupon.attr.coupon_vouchers])
+        rows = list(rows)
 
         self.assertIn('Redeemed For Course ID', field_names)
         self.assertIn('Redeemed By Username', field_names)
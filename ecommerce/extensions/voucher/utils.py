@@ -2,11 +2,14 @@
 import base64
 import datetime
 import hashlib
+import itertools
 import logging
 import uuid
 
 from django.conf import settings
 from django.core.urlresolvers import reverse
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch
 from django.utils.translation import ugettext_lazy as _
 from opaque_keys.edx.keys import CourseKey
 from oscar.core.loading import get_model
@@ -23,6 +26,7 @@ Benefit = get_model('offer', 'Benefit')
 Condition = get_model('offer', 'Condition')
 ConditionalOffer = get_model('offer', 'ConditionalOffer')
 CouponVouchers = get_model('voucher', 'CouponVouchers')
+Line = get_model('order', 'Line')
 Order = get_model('order', 'Order')
 Product = get_model('catalogue', 'Product')
 ProductCategory = get_model('catalogue', 'ProductCategory')
@@ -31,6 +35,14 @@ StockRecord = get_model('partner', 'StockRecord')
 Voucher = get_model('voucher', 'Voucher')
 VoucherApplication = get_model('voucher', 'VoucherApplication')
 
+# Number of vouchers created or read per query when creating vouchers and generating
+# coupon reports. Kept below SQLite's limit of 999 variables per statement so that IN
+# lookups work on every backend.
+VOUCHER_BATCH_SIZE = 500
+
+# Number of times a batch of vouchers with generated codes is inserted, when some of its codes are already used.
+MAX_CODE_GENERATION_ATTEMPTS = 100
+
 
 def _get_voucher_status(voucher, offer):
     """Retrieve the status of a voucher.
@@ -76,45 +88,90 @@ def _get_discount_info(discount_data):
     return None, None, None
 
 
-def _get_info_for_coupon_report(coupon, voucher):
-    offer = voucher.offers.all().first()
-    if offer.condition.range.catalog:
-        coupon_stockrecord = StockRecord.objects.get(product=coupon)
-        invoiced_amount = currency(coupon_stockrecord.price_excl_tax)
-        seat_stockrecord = offer.condition.range.catalog.stock_records.first()
-        course_id = seat_stockrecord.product.attr.course_key
-        course_organization = CourseKey.from_string(course_id).org
-        price = currency(seat_stockrecord.price_excl_tax)
-        discount_data = get_voucher_discount_info(offer.benefit, seat_stockrecord.price_excl_tax)
-    else:
-        # Note (multi-courses): Need to account for multiple seats.
-        catalog_query = offer.condition.range.catalog_query
-        course_seat_types = offer.condition.range.course_seat_types
-        course_id = None
-        coupon_stockrecord = None
-        invoiced_amount = None
-        seat_stockrecord = None
-        course_organization = None
-        price = None
-        discount_data = None
-
-    history = coupon.history.first()
-    coupon_type, discount_percentage, discount_amount = _get_discount_info(discount_data)
-    status = _get_voucher_status(voucher, offer)
-    path = '{path}?code={code}'.format(path=reverse('coupons:offer'), code=voucher.code)
-    url = get_ecommerce_url(path)
-    author = history.history_user.full_name.encode('utf8')
+def _get_coupon_info_for_report(coupon):
+    """
+    Retrieve the coupon report data shared by all vouchers of a coupon.
+
+    Arguments:
+        coupon (Product): Coupon product.
+
+    Returns:
+        dict
+    """
+    history = coupon.history.select_related('history_user').first()
+    client = Invoice.objects.select_related('business_client').get(order__basket__lines__product=coupon).business_client
 
     try:
         note = coupon.attr.note.encode('utf8')
     except AttributeError:
         note = ''
 
-    product_categories = ProductCategory.objects.filter(product=coupon)
-    if product_categories:
-        category_names = ', '.join([pc.category.name for pc in product_categories])
-    else:
-        category_names = ''
+    product_categories = ProductCategory.objects.filter(product=coupon).select_related('category')
+    category_names = ', '.join([pc.category.name for pc in product_categories])
+
+    return {
+        'Client': client.name.encode('utf8'),
+        'Category': category_names,
+        'Note': note,
+        'Created By': history.history_user.full_name.encode('utf8'),
+        'Create Date': history.history_date.strftime("%b %d, %y"),
+    }
+
+
+def _get_range_info_for_report(coupon, product_range):
+    """
+    Retrieve the coupon report data shared by all vouchers whose offers use the same range.
+
+    Arguments:
+        coupon (Product): Coupon product.
+        product_range (Range): Range of the voucher offer condition.
+
+    Returns:
+        dict: Report data.
+        Decimal: Price of the seat the range applies to, None for catalog query ranges.
+    """
+    if product_range.catalog:
+        coupon_stockrecord = StockRecord.objects.get(product=coupon)
+        seat_stockrecord = product_range.catalog.stock_records.select_related('product').first()
+        course_id = seat_stockrecord.product.attr.course_key
+        range_data = {
+            'Course ID': course_id,
+            'Organization': CourseKey.from_string(course_id).org,
+            'Price': currency(seat_stockrecord.price_excl_tax),
+            'Invoiced Amount': currency(coupon_stockrecord.price_excl_tax),
+        }
+        return range_data, seat_stockrecord.price_excl_tax
+
+    # Note (multi-courses): Need to account for multiple seats.
+    range_data = {
+        'Catalog Query': product_range.catalog_query,
+        'Course Seat Types': product_range.course_seat_types,
+        'Price': None,
+        'Invoiced Amount': None,
+    }
+    return range_data, None
+
+
+def _get_info_for_coupon_report(coupon_info, range_info, offer_path, voucher, offer):
+    """
+    Retrieve the coupon report data of a voucher.
+
+    Arguments:
+        coupon_info (dict): Coupon data, as returned by _get_coupon_info_for_report.
+        range_info (tuple): Range data, as returned by _get_range_info_for_report.
+        offer_path (str): Path of the coupon offer page.
+        voucher (Voucher)
+        offer (Offer): Offer associated with the voucher.
+
+    Returns:
+        dict
+    """
+    range_data, seat_price = range_info
+    discount_data = get_voucher_discount_info(offer.benefit, seat_price) if seat_price is not None else None
+    coupon_type, discount_percentage, discount_amount = _get_discount_info(discount_data)
+    status = _get_voucher_status(voucher, offer)
+    path = '{path}?code={code}'.format(path=offer_path, code=voucher.code)
+    url = get_ecommerce_url(path)
 
     # Set the max_uses_count for single-use vouchers to 1,
     # for other usage limitations (once per customer and multi-use)
@@ -135,41 +192,116 @@ def _get_info_for_coupon_report(coupon, voucher):
         'Code': voucher.code,
         'Coupon Type': coupon_type,
         'URL': url,
-        'Category': category_names,
-        'Note': note,
-        'Price': price,
-        'Invoiced Amount': invoiced_amount,
         'Discount Percentage': discount_percentage,
         'Discount Amount': discount_amount,
         'Status': status,
-        'Created By': author,
-        'Create Date': history.history_date.strftime("%b %d, %y"),
         'Coupon Start Date': voucher.start_datetime.strftime("%b %d, %y"),
         'Coupon Expiry Date': voucher.end_datetime.strftime("%b %d, %y"),
         'Maximum Coupon Usage': max_uses_count,
         'Redemption Count': redemption_count,
+        'Order Number': '',
+        'Redeemed By Username': '',
     }
-
-    if course_id:
-        coupon_data['Course ID'] = course_id
-        coupon_data['Organization'] = course_organization
-    else:
-        coupon_data['Catalog Query'] = catalog_query
-        coupon_data['Course Seat Types'] = course_seat_types
+    coupon_data.update(coupon_info)
+    coupon_data.update(range_data)
 
     return coupon_data
 
 
+def _iter_report_vouchers(coupon_voucher):
+    """
+    Iterate over the vouchers of a coupon in chunks of VOUCHER_BATCH_SIZE.
+
+    Each chunk is fetched by keyset pagination on the voucher id, together with the
+    offers, benefits, ranges, applications and orders the report needs, so that the
+    number of queries per chunk is fixed no matter how many vouchers a coupon has.
+
+    Arguments:
+        coupon_voucher (CouponVouchers)
+
+    Yields:
+        Voucher
+    """
+    vouchers = coupon_voucher.vouchers.order_by('id').prefetch_related(
+        Prefetch('offers', queryset=ConditionalOffer.objects.select_related(
+            'benefit', 'condition__range__catalog'
+        ).order_by('id')),
+        Prefetch('applications', queryset=VoucherApplication.objects.select_related('user', 'order').order_by('id')),
+        Prefetch('applications__order__lines', queryset=Line.objects.select_related('product').order_by('id')),
+    )
+    last_id = 0
+
+    while True:
+        chunk = list(vouchers.filter(id__gt=last_id)[:VOUCHER_BATCH_SIZE])
+        if not chunk:
+            return
+
+        for voucher in chunk:
+            yield voucher
+        last_id = chunk[-1].id
+
+
+def _generate_coupon_report_rows(coupon_vouchers):
+    """
+    Lazily generate coupon report rows.
+
+    Coupon and range data shared by many vouchers is fetched once and reused.
+
+    Args:
+        coupon_vouchers (List[CouponVouchers]): List of coupon_vouchers the report should be generated for
+
+    Yields:
+        dict
+    """
+    offer_path = reverse('coupons:offer')
+
+    for coupon_voucher in coupon_vouchers:
+        coupon = coupon_voucher.coupon
+        coupon_info = _get_coupon_info_for_report(coupon)
+        range_info = {}
+
+        for voucher in _iter_report_vouchers(coupon_voucher):
+            offer = voucher.offers.all()[0]
+            product_range = offer.condition.range
+            if product_range.id not in range_info:
+                range_info[product_range.id] = _get_range_info_for_report(coupon, product_range)
+
+            row = _get_info_for_coupon_report(coupon_info, range_info[product_range.id], offer_path, voucher, offer)
+            yield row
+
+            if voucher.num_orders > 0:
+                for application in voucher.applications.all():
+                    redemption_user_username = application.user.username
+                    redemption_course_id = application.order.lines.all()[0].product.course_id
+
+                    new_row = row.copy()
+
+                    if 'Catalog Query' in new_row:
+                        new_row['Redeemed For Course ID'] = redemption_course_id
+
+                    new_row.update({
+                        'Status': _('Redeemed'),
+                        'Order Number': application.order.number,
+                        'Redeemed By Username': redemption_user_username,
+                        'Maximum Coupon Usage': 1,
+                        'Redemption Count': 1,
+                    })
+
+                    yield new_row
+
+
 def generate_coupon_report(coupon_vouchers):
     """
     Generate coupon report data
 
+    Rows are generated lazily, so the report can be streamed without holding all of it in memory.
+
     Args:
         coupon_vouchers (List[CouponVouchers]): List of coupon_vouchers the report should be generated for
 
     Returns:
         List[str]
-        List[dict]
+        Iterator[dict]
     """
 
     field_names = [
@@ -199,42 +331,14 @@ def generate_coupon_report(coupon_vouchers):
         _('Coupon Start Date'),
         _('Coupon Expiry Date'),
     ]
-    rows = []
-
-    for coupon_voucher in coupon_vouchers:
-        coupon = coupon_voucher.coupon
-        client = Invoice.objects.get(order__basket__lines__product=coupon).business_client.name
-
-        for voucher in coupon_voucher.vouchers.all():
-            row = _get_info_for_coupon_report(coupon, voucher)
+    rows = _generate_coupon_report_rows(coupon_vouchers)
 
-            for item in ('Order Number', 'Redeemed By Username',):
-                row[item] = ''
-
-            row['Client'] = client.encode('utf8')
-            rows.append(row)
-            if voucher.num_orders > 0:
-                voucher_applications = VoucherApplication.objects.filter(voucher=voucher)
-                for application in voucher_applications:
-                    redemption_user_username = application.user.username
-                    redemption_course_id = application.order.lines.first().product.course_id
-
-                    new_row = row.copy()
-
-                    if 'Catalog Query' in new_row:
-                        new_row['Redeemed For Course ID'] = redemption_course_id
+    # The columns depend on the type of the coupon, which is only known once the first row is generated.
+    first_row = next(rows, None)
+    if first_row is not None:
+        rows = itertools.chain([first_row], rows)
 
-                    new_row.update({
-                        'Status': _('Redeemed'),
-                        'Order Number': application.order.number,
-                        'Redeemed By Username': redemption_user_username,
-                        'Maximum Coupon Usage': 1,
-                        'Redemption Count': 1,
-                    })
-
-                    rows.append(new_row)
-
-    if 'Catalog Query' in rows[0]:
+    if first_row and 'Catalog Query' in first_row:
         field_names.remove('Course ID')
         field_names.remove('Organization')
     else:
@@ -289,6 +393,37 @@ def _get_or_create_offer(
     return offer
 
 
+def normalize_voucher_code(code):
+    """
+    Return the code as it is saved: voucher codes are case insensitive, and saved in upper case.
+
+    Looking vouchers up by their normalized code is an exact match, which uses the unique index
+    on the code, whereas a case-insensitive match cannot.
+    """
+    return code.strip().upper()
+
+
+def get_voucher_from_code(code):
+    """
+    Retrieve the voucher with the given code, in any case.
+
+    The offers of the voucher, ordered by ID, are prefetched with their benefit, condition and range.
+
+    Args:
+        code (str): Voucher code.
+
+    Raises:
+        Voucher.DoesNotExist: When no voucher has the code.
+
+    Returns:
+        Voucher
+    """
+    offers = ConditionalOffer.objects.select_related('benefit__range', 'condition__range').order_by('id')
+    return Voucher.objects.prefetch_related(Prefetch('offers', queryset=offers)).get(
+        code=normalize_voucher_code(code)
+    )
+
+
 def _generate_code_string(length):
     """
     Create a string of random characters of specified length
@@ -307,46 +442,140 @@ def _generate_code_string(length):
 
     h = hashlib.sha256()
     h.update(uuid.uuid4().get_bytes())
-    voucher_code = base64.b32encode(h.digest())[0:length]
-    if Voucher.objects.filter(code__iexact=voucher_code).exists():
-        return _generate_code_string(length)
+    return base64.b32encode(h.digest())[0:length]
+
+
+def _generate_code_strings(length, quantity):
+    """
+    Create a list of distinct random voucher codes.
+
+    The codes are not checked against the existing vouchers: collisions are caught by the
+    unique index on the voucher code when the vouchers are inserted.
+
+    Args:
+        length (int): Defines the length of each randomly generated string.
+        quantity (int): Number of codes to generate.
+
+    Raises:
+        ValueError raised if length is less than one.
+
+    Returns:
+        List[str]
+    """
+    codes = set()
+    while len(codes) < quantity:
+        codes.add(_generate_code_string(length))
+    return list(codes)
+
+
+def _insert_vouchers(codes, regenerate_codes, **voucher_fields):
+    """
+    Insert vouchers with the given codes in a single query.
+
+    The vouchers are inserted optimistically: if any of the codes is already used, the insert is
+    rolled back, and retried with new codes in place of the used ones, up to
+    MAX_CODE_GENERATION_ATTEMPTS times.
 
-    return voucher_code
+    Args:
+        codes (List[str]): Codes of the vouchers.
+        regenerate_codes (bool): Whether the codes were generated, and can be replaced when already used.
+        **voucher_fields: Values of the other fields of the vouchers.
 
+    Raises:
+        IntegrityError: If a code is already used and cannot be replaced, or the insert fails for another reason.
 
-def _create_new_voucher(code, coupon, end_datetime, name, offer, start_datetime, voucher_type):
+    Returns:
+        List[Voucher]
+    """
+    attempts = 1
+    while True:
+        vouchers = [Voucher(code=code, **voucher_fields) for code in codes]
+        try:
+            with transaction.atomic():
+                Voucher.objects.bulk_create(vouchers)
+            return vouchers
+        except IntegrityError:
+            if not regenerate_codes or attempts >= MAX_CODE_GENERATION_ATTEMPTS:
+                raise
+
+            used_codes = set(Voucher.objects.filter(code__in=codes).values_list('code', flat=True))
+            if not used_codes:
+                # The insert failed for another reason than the codes, which retrying would not fix.
+                raise
+
+        attempts += 1
+        logger.warning('[%d] generated voucher codes are already used. Retrying with new codes.', len(used_codes))
+
+        new_codes = set(codes) - used_codes
+        while len(new_codes) < len(codes):
+            new_codes.add(_generate_code_string(settings.VOUCHER_CODE_LENGTH))
+        codes = list(new_codes)
+
+
+def _create_new_vouchers(code, coupon, end_datetime, name, offers, quantity, start_datetime, voucher_type):
     """
-    Creates a voucher.
+    Creates vouchers in bulk.
 
-    If randomly generated voucher code already exists, new code will be generated and reverified.
+    Vouchers, along with their offer and coupon associations, are written in batches
+    of VOUCHER_BATCH_SIZE, so the number of queries grows with the number of batches
+    rather than the number of vouchers.
 
     Args:
-        code (str): Code associated with vouchers. If not provided, one will be generated.
-        coupon (Product): Coupon product associated with voucher.
+        code (str): Code associated with vouchers. If not provided, unique codes will be generated.
+        coupon (Product): Coupon product associated with vouchers.
         end_datetime (datetime): Voucher end date.
         name (str): Voucher name.
-        offer (Offer): Offer associated with voucher.
+        offers (List[Offer]): Offers associated with vouchers. If more than one is provided,
+                              each voucher is associated with the offer at the same position.
+        quantity (int): Number of vouchers to be created.
         start_datetime (datetime): Voucher start date.
         voucher_type (str): Voucher usage.
 
     Returns:
-        Voucher
+        List[Voucher]
     """
-    voucher_code = code or _generate_code_string(settings.VOUCHER_CODE_LENGTH)
-
-    voucher = Voucher.objects.create(
-        name=name,
-        code=voucher_code,
-        usage=voucher_type,
-        start_datetime=start_datetime,
-        end_datetime=end_datetime
-    )
-    voucher.offers.add(offer)
+    if code:
+        codes = [normalize_voucher_code(code)] * quantity
+    else:
+        codes = _generate_code_strings(settings.VOUCHER_CODE_LENGTH, quantity)
 
     coupon_voucher, __ = CouponVouchers.objects.get_or_create(coupon=coupon)
-    coupon_voucher.vouchers.add(voucher)
+    VoucherOffers = Voucher.offers.through
+    CouponVouchersVouchers = CouponVouchers.vouchers.through
+    vouchers = []
 
-    return voucher
+    for start in range(0, quantity, VOUCHER_BATCH_SIZE):
+        batch_vouchers = _insert_vouchers(
+            codes[start:start + VOUCHER_BATCH_SIZE],
+            regenerate_codes=not code,
+            name=name,
+            usage=voucher_type,
+            start_datetime=start_datetime,
+            end_datetime=end_datetime
+        )
+
+        # Bulk inserts neither populate primary keys nor mark the instances as saved, so the ids
+        # of the new vouchers are read back by code and their state is updated accordingly.
+        batch_codes = [voucher.code for voucher in batch_vouchers]
+        voucher_ids = dict(Voucher.objects.filter(code__in=batch_codes).values_list('code', 'id'))
+        for voucher in batch_vouchers:
+            voucher.id = voucher_ids[voucher.code]
+            voucher._state.adding = False  # pylint: disable=protected-access
+            voucher._state.db = Voucher.objects.db  # pylint: disable=protected-access
+
+        VoucherOffers.objects.bulk_create([
+            VoucherOffers(
+                voucher_id=voucher.id,
+                conditionaloffer_id=offers[start + index].id if len(offers) > 1 else offers[0].id
+            ) for index, voucher in enumerate(batch_vouchers)
+        ])
+        CouponVouchersVouchers.objects.bulk_create([
+            CouponVouchersVouchers(couponvouchers_id=coupon_voucher.id, voucher_id=voucher.id)
+            for voucher in batch_vouchers
+        ])
+        vouchers.extend(batch_vouchers)
+
+    return vouchers
 
 
 def create_vouchers(
@@ -384,7 +613,6 @@ def create_vouchers(
             List[Voucher]
     """
     logger.info("Creating [%d] vouchers product [%s]", quantity, coupon.id)
-    vouchers = []
     offers = []
 
     if _range:
@@ -418,19 +646,17 @@ def create_vouchers(
         )
         offers.append(offer)
 
-    for i in range(quantity):
-        voucher = _create_new_voucher(
+    with transaction.atomic():
+        return _create_new_vouchers(
+            code=code,
             coupon=coupon,
             end_datetime=end_datetime,
-            offer=offers[i] if multi_offer else offers[0],
+            name=name,
+            offers=offers,
+            quantity=quantity,
             start_datetime=start_datetime,
-            voucher_type=voucher_type,
-            code=code,
-            name=name
+            voucher_type=voucher_type
         )
-        vouchers.append(voucher)
-
-    return vouchers
 
 
 def get_voucher_discount_info(benefit, price):
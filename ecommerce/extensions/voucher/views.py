@@ -1,6 +1,7 @@
 import csv
+import itertools
 
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 from django.utils.text import slugify
 from django.utils.translation import ugettext_lazy as _
 from django.views.generic import View
@@ -14,6 +15,13 @@ CouponVouchers = get_model('voucher', 'CouponVouchers')
 Product = get_model('catalogue', 'Product')
 
 
+class Echo(object):
+    """File-like object that returns written values instead of buffering them, for streaming CSV rows."""
+
+    def write(self, value):
+        return value
+
+
 class CouponReportCSVView(StaffOnlyMixin, View):
     """Generates coupon report and returns it in CSV format."""
 
@@ -30,13 +38,11 @@ class CouponReportCSVView(StaffOnlyMixin, View):
 
         field_names, rows = generate_coupon_report(coupons_vouchers)
 
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename={}'.format(filename)
-
-        writer = csv.DictWriter(response, fieldnames=field_names)
-        writer.writeheader()
+        writer = csv.DictWriter(Echo(), fieldnames=field_names)
+        header = writer.writerow(dict(zip(field_names, field_names)))
+        content = itertools.chain([header], (writer.writerow(row) for row in rows))
 
-        for row in rows:
-            writer.writerow(row)
+        response = StreamingHttpResponse(content, content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename={}'.format(filename)
 
         return response
@@ -259,6 +259,16 @@ OSCAR_DASHBOARD_NAVIGATION = [
 # Default timeout for Enrollment API calls
 ENROLLMENT_FULFILLMENT_TIMEOUT = 7
 
+# Maximum number of connections to the Enrollment API kept alive for reuse
+ENROLLMENT_FULFILLMENT_POOL_SIZE = 10
+
+# Maximum number of lines of an order enrolled concurrently. Lines are enrolled one at a time if set to 1.
+ENROLLMENT_FULFILLMENT_MAX_WORKERS = 1
+
+# Path of the LMS bulk enrollment endpoint. If set, the seats of an order are enrolled with a single request,
+# falling back to one request per seat when the endpoint is unavailable.
+ENROLLMENT_FULFILLMENT_BATCH_API_PATH = None
+
 # Coupon code length
 VOUCHER_CODE_LENGTH = 16
 
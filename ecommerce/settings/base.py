@@ -210,6 +210,8 @@ MIDDLEWARE_CLASSES = (
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django_sites_extensions.middleware.CurrentSiteWithDefaultMiddleware',
+    # NOTE: SiteConfigurationMiddleware relies on request.site, and MUST appear AFTER CurrentSiteMiddleware.
+    'ecommerce.core.middleware.SiteConfigurationMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'waffle.middleware.WaffleMiddleware',
     # NOTE: The overridden BasketMiddleware relies on request.site. This middleware
@@ -235,6 +237,19 @@ COMMERCE_API_TIMEOUT = 7
 # Cache course info from course API.
 COURSES_API_CACHE_TIMEOUT = 3600  # Value is in seconds
 
+# Caching of the data retrieved from remote services. See ecommerce.core.cache_utils.
+REMOTE_CACHE_STALE_TIMEOUT = 300  # Seconds values are served stale while being refreshed
+REMOTE_CACHE_ERROR_TIMEOUT = 30  # Seconds failures are cached for
+REMOTE_CACHE_LOCK_TIMEOUT = 10  # Seconds callers wait for a value being retrieved by another caller
+REMOTE_CACHE_TTL_JITTER = 0.1  # Maximum fraction timeouts are randomly lengthened by
+
+# Maximum number of courses retrieved concurrently from the course API, when several courses are needed at once.
+COURSES_API_MAX_WORKERS = 4
+
+# Cache the enrollments of a user, retrieved from the Enrollment API, when checking whether they are
+# already enrolled in a course. The cache is cleared when the user is enrolled by order fulfillment.
+ENROLLMENTS_CACHE_TIMEOUT = 60  # Value is in seconds
+
 # PROVIDER DATA PROCESSING
 PROVIDER_DATA_PROCESSING_TIMEOUT = 15  # Value is in seconds.
 CREDIT_PROVIDER_CACHE_TIMEOUT = 600
@@ -410,6 +425,16 @@ EXTRA_SCOPE = ['permissions']
 # Specify a key to emit events to the corresponding Segment project. `None` disables tracking.
 # See: https://segment.com/docs/libraries/python/
 SEGMENT_KEY = None
+
+# Maximum number of analytics events waiting to be delivered by a background thread.
+# Events are delivered synchronously, during the request, if set to 0.
+ANALYTICS_EVENT_QUEUE_SIZE = 10000
+
+# Maximum number of analytics events handed to the analytics client at once by the background thread.
+ANALYTICS_EVENT_BATCH_SIZE = 100
+
+# Seconds to wait for room in a full analytics event queue before the event is dropped.
+ANALYTICS_EVENT_QUEUE_TIMEOUT = 0
 # END ANALYTICS
 
 
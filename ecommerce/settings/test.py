@@ -66,6 +66,12 @@ EDX_API_KEY = 'replace-me'
 # END ORDER PROCESSING
 
 
+# ANALYTICS
+# Deliver analytics events synchronously, so that tests can verify them right away.
+ANALYTICS_EVENT_QUEUE_SIZE = 0
+# END ANALYTICS
+
+
 # PAYMENT PROCESSING
 PAYMENT_PROCESSOR_CONFIG = {
     'edx': {
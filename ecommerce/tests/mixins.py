@@ -293,6 +293,9 @@ class LmsApiMockMixin(object):
     def setUp(self):
         super(LmsApiMockMixin, self).setUp()
 
+        # The enrollments of users are cached, and user IDs are reused from one test to the next.
+        self.addCleanup(cache.clear)
+
     def mock_course_api_response(self, course=None):
         """ Helper function to register an API endpoint for the course information. """
         course_info = {
@@ -315,23 +318,20 @@ class LmsApiMockMixin(object):
         httpretty.register_uri(httpretty.GET, course_url, body=course_info_json, content_type='application/json')
 
     def mock_enrollment_api(self, request, user, course_id, is_active=True, mode='audit'):
-        """ Returns a successful response indicating self.user is enrolled in the specified course mode. """
-        url = '{host}/enrollment/{username},{course_id}'.format(
-            host=request.site.siteconfiguration.build_lms_url('/api/enrollment/v1'),
-            username=user.username,
-            course_id=course_id
-        )
-        body = json.dumps({'mode': mode, 'is_active': is_active})
+        """ Returns a successful response listing the enrollment of the user in the specified course mode. """
+        url = request.site.siteconfiguration.build_lms_url('/api/enrollment/v1/enrollment')
+        body = json.dumps([{
+            'user': user.username,
+            'mode': mode,
+            'is_active': is_active,
+            'course_details': {'course_id': course_id},
+        }])
         httpretty.register_uri(httpretty.GET, url, body=body, content_type='application/json')
 
-    def mock_enrollment_api_error(self, request, user, course_id, error):
+    def mock_enrollment_api_error(self, request, user, course_id, error):  # pylint: disable=unused-argument
         """ Mock Enrollment api call which raises error when called """
         def callback(request, uri, headers):  # pylint: disable=unused-argument
             raise error
 
-        url = '{host}/enrollment/{username},{course_id}'.format(
-            host=request.site.siteconfiguration.build_lms_url('/api/enrollment/v1'),
-            username=user.username,
-            course_id=course_id
-        )
+        url = request.site.siteconfiguration.build_lms_url('/api/enrollment/v1/enrollment')
         httpretty.register_uri(httpretty.GET, url, body=callback, content_type='application/json')
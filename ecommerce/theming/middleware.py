@@ -6,6 +6,7 @@ Note:
     So it must be added after this middleware in django settings files.
 """
 
+from ecommerce.core.site_cache import get_site_bundle
 from ecommerce.theming.models import SiteTheme
 
 
@@ -15,7 +16,8 @@ class CurrentSiteThemeMiddleware(object):
     """
 
     def process_request(self, request):
-        request.site_theme = SiteTheme.get_theme(request.site)
+        site = getattr(request, 'site', None)
+        request.site_theme = get_site_bundle(site).theme if site else None
 
 
 class ThemePreviewMiddleware(object):